@@ -1,11 +1,18 @@
 """
 Base agent classes and interfaces for the modular AI assistant system.
 """
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from agents.latency import LatencyTracker, DeadlineExceeded, call_with_deadline
+from agents.intents import intent_engine
+from agents.tracing import tracer, current_traceparent
+from agents.metrics import agent_task_duration, agent_tasks
+
 class TaskStatus(Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -19,9 +26,9 @@ class TaskPriority(Enum):
     HIGH = "high"
     URGENT = "urgent"
 
-@dataclass
+@dataclass(slots=True)
 class Task:
-    """Represents a task that can be executed by agents"""
+    """Represents a task that can be executed by agents (slotted: no per-instance __dict__)"""
     id: str
     description: str
     task_type: str
@@ -33,10 +40,12 @@ class Task:
     error_message: Optional[str] = None
     parent_task_id: Optional[str] = None
     created_by: Optional[str] = None
+    # W3C traceparent of the span that created the task, so work on other threads joins its trace
+    trace_parent: Optional[str] = field(default_factory=current_traceparent, compare=False)
 
-@dataclass
+@dataclass(slots=True)
 class AgentResponse:
-    """Standard response format from agents"""
+    """Standard response format from agents (slotted: no per-instance __dict__)"""
     success: bool
     message: str
     data: Optional[Dict[str, Any]] = None
@@ -44,9 +53,42 @@ class AgentResponse:
     requires_clarification: bool = False
     clarification_question: Optional[str] = None
 
+def _instrumented_execute_task(execute_task):
+    """Wrap an execute_task implementation with latency/outcome metrics and a span named after the agent"""
+    def measured(self, task: Task) -> AgentResponse:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = execute_task(self, task)
+            outcome = "success" if response.success else "failure"
+            return response
+        finally:
+            agent_task_duration.observe(time.perf_counter() - started, self.agent_id, task.task_type)
+            agent_tasks.inc(self.agent_id, task.task_type, outcome)
+
+    @functools.wraps(execute_task)
+    def wrapper(self, task: Task) -> AgentResponse:
+        if not tracer.enabled:
+            return measured(self, task)
+        with tracer.span(f"{self.agent_id}.execute_task", parent=task.trace_parent,
+                         task_id=task.id, task_type=task.task_type) as span:
+            response = measured(self, task)
+            span.set_attribute("success", response.success)
+            return response
+    wrapper.__instrumented__ = True
+    return wrapper
+
 class BaseAgent(ABC):
     """Base class for all agents in the system"""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every concrete execute_task is measured and dispatched inside a tracing span
+        execute_task = cls.__dict__.get("execute_task")
+        if execute_task is not None and not getattr(execute_task, "__isabstractmethod__", False) \
+                and not getattr(execute_task, "__instrumented__", False):
+            cls.execute_task = _instrumented_execute_task(execute_task)
+    
     def __init__(self, agent_id: str, name: str, description: str):
         self.agent_id = agent_id
         self.name = name
@@ -73,19 +115,75 @@ class BaseAgent(ABC):
 class PersonaAgent(BaseAgent):
     """Base class for conversational persona agents"""
     
+    # Intent group name -> regex patterns, compiled into the shared intent engine
+    intent_patterns: Dict[str, List[str]] = {}
+    # Intent group name -> example phrasings and optional score thresholds for the vector backend
+    intent_exemplars: Dict[str, List[str]] = {}
+    intent_thresholds: Dict[str, float] = {}
+    
     def __init__(self, agent_id: str, name: str, description: str, personality_type: str):
         super().__init__(agent_id, name, description)
         self.personality_type = personality_type
+        # Optional agents.cache.ResponseCache consulted by generate_response
+        self.response_cache = None
+        # Seconds generate_budgeted_response waits for the LLM before degrading (None = unbounded)
+        self.latency_budget: Optional[float] = None
+        # Start a duplicate LLM request once a call runs past the observed p95
+        self.hedge_requests = False
+        self.latency_tracker = LatencyTracker()
+        # How match_intents detects intents: "regex", "vector" (NumPy classifier) or "hybrid" (either)
+        self.intent_backend = "regex"
         
     @abstractmethod
     def interpret_user_intent(self, user_message: str) -> List[Task]:
         """Interpret user message and create actionable tasks"""
         pass
     
+    def match_intents(self, user_message: str) -> Set[str]:
+        """Return the names of this persona's intent groups found in the message"""
+        intents: Set[str] = set()
+        if self.intent_backend in ("regex", "hybrid"):
+            if not intent_engine.has_scope(self.agent_id):
+                intent_engine.register_scope(self.agent_id, self.intent_patterns)
+            intents |= intent_engine.match_scope(self.agent_id, user_message)
+        if self.intent_backend in ("vector", "hybrid"):
+            # Imported lazily so NumPy is only needed when the vector backend is selected
+            from agents.intent_classifier import get_intent_classifier
+            classifier = get_intent_classifier()
+            if not classifier.has_scope(self.agent_id):
+                classifier.register_scope(self.agent_id, self.intent_exemplars, self.intent_thresholds)
+            intents |= classifier.classify(user_message, scope=self.agent_id)
+        return intents
+    
     @abstractmethod
     def generate_response(self, user_message: str, context: Dict[str, Any] = None) -> str:
         """Generate a conversational response to user message"""
         pass
+    
+    def fallback_response(self, user_message: str) -> str:
+        """Templated non-AI reply used when the LLM is unavailable or too slow"""
+        return f"Hello! As your {self.name}, I understand you're asking about: '{user_message}'. I'll create the appropriate tasks to assist you."
+    
+    def generate_budgeted_response(self, user_message: str, context: Dict[str, Any] = None) -> Tuple[str, bool]:
+        """
+        Generate a response within this persona's latency budget.
+        Returns (response, degraded); degraded is True when the templated fallback was used.
+        """
+        def timed_generate():
+            started = time.monotonic()
+            response = self.generate_response(user_message, context)
+            self.latency_tracker.record(time.monotonic() - started)
+            return response
+        
+        if not self.latency_budget:
+            return timed_generate(), False
+        
+        hedge_after = self.latency_tracker.percentile(95) if self.hedge_requests else None
+        try:
+            response, _ = call_with_deadline(timed_generate, self.latency_budget, hedge_after=hedge_after)
+            return response, False
+        except DeadlineExceeded:
+            return self.fallback_response(user_message), True
 
 class SupervisorAgent(BaseAgent):
     """Base class for supervisor agents that coordinate other agents"""
@@ -118,7 +216,8 @@ class SupervisorAgent(BaseAgent):
         
         task.assigned_agent = capable_agent.agent_id
         task.status = TaskStatus.IN_PROGRESS
-        return capable_agent.execute_task(task)
+        with tracer.span(f"{self.agent_id}.delegate_task", parent=task.trace_parent, agent=capable_agent.agent_id):
+            return capable_agent.execute_task(task)
 
 class PlatformAgent(SupervisorAgent):
     """Base class for platform-specific supervisor agents"""
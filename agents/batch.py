@@ -0,0 +1,187 @@
+"""
+Offline batch processing of JSONL conversations.
+
+Each input line is a record {"persona": ..., "message": ..., "context": {...}}
+(optionally with an "id") that is run through the persona and the supervisor
+exactly like a /conversation request. Records are read lazily and processed on
+a thread or process pool with a bounded number in flight; results stream to an
+output JSONL either in input order or as they complete.
+
+The output file doubles as the checkpoint: every result carries the input line
+number, so a resumed run skips the lines already in the output (dropping a
+partially written last line) and appends the rest.
+"""
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+from agents.pipeline import ConversationPipeline
+from agents.platforms import GitHubPlatformAgent, GmailPlatformAgent, JiraPlatformAgent, CalendarPlatformAgent
+from agents.reflection import ReflectionAgent
+from agents.registry import persona_registry
+from agents.supervisor import HierarchicalSupervisor
+
+def build_pipeline(task_workers: int = 4) -> ConversationPipeline:
+    """Supervisor with all platform agents, reflection and a conversation pipeline"""
+    supervisor = HierarchicalSupervisor()
+    supervisor.register_platform_agent("github", GitHubPlatformAgent())
+    supervisor.register_platform_agent("gmail", GmailPlatformAgent())
+    supervisor.register_platform_agent("jira", JiraPlatformAgent())
+    supervisor.register_platform_agent("calendar", CalendarPlatformAgent())
+    return ConversationPipeline(supervisor, ReflectionAgent(), max_workers=task_workers)
+
+def process_record(pipeline: ConversationPipeline, line: int, record: Dict[str, Any],
+                   default_persona: Optional[str] = None) -> Dict[str, Any]:
+    """Run one record through its persona; failures become an error result instead of raising"""
+    result: Dict[str, Any] = {"line": line, "id": record.get("id"), "persona": record.get("persona", default_persona),
+                              "message": record.get("message")}
+    started = time.perf_counter()
+    try:
+        if not result["persona"] or not isinstance(result["message"], str):
+            raise ValueError("record needs a persona and a message")
+        if result["persona"] not in persona_registry:
+            raise ValueError(f"unknown persona: {result['persona']}")
+        conversation = pipeline.run(persona_registry.get(result["persona"]), result["message"],
+                                    record.get("context"), evaluate_inline=True)
+        result["response"] = conversation.response.message
+        result["degraded"] = conversation.response.data.get("degraded", False)
+        result["tasks"] = [{
+            "task_id": outcome.task.id,
+            "task_type": outcome.task.task_type,
+            "status": outcome.task.status.value,
+            "result": outcome.response.data,
+            "evaluation_score": outcome.evaluation.get("quality_score") if outcome.evaluation else None
+        } for outcome in conversation.task_outcomes]
+        result["error"] = None
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+# Each worker process builds its own agent system once
+_worker_pipeline: Optional[ConversationPipeline] = None
+_worker_default_persona: Optional[str] = None
+
+def _init_worker(task_workers: int, default_persona: Optional[str]):
+    global _worker_pipeline, _worker_default_persona
+    _worker_pipeline = build_pipeline(task_workers)
+    _worker_default_persona = default_persona
+
+def _process_in_worker(line: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    return process_record(_worker_pipeline, line, record, _worker_default_persona)
+
+def read_records(path: str, skip: Optional[Set[int]] = None) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, record) lazily; an unparseable line yields its JSONDecodeError instead of a record"""
+    skip = skip or set()
+    with open(path, encoding="utf-8") as f:
+        for line, text in enumerate(f, start=1):
+            if not text.strip() or line in skip:
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line, e
+
+def completed_lines(output_path: str) -> Set[int]:
+    """Input line numbers already present in an output file, truncating a partially written last line"""
+    if not os.path.exists(output_path):
+        return set()
+    done = set()
+    valid_bytes = 0
+    with open(output_path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(raw)["line"])
+            except (ValueError, KeyError, TypeError):
+                break
+            valid_bytes += len(raw)
+    if valid_bytes < os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return done
+
+def _resolved(result: Dict[str, Any]) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+class BatchProcessor:
+    """Streams a JSONL file of conversation records through the agent system on a worker pool"""
+
+    def __init__(self, workers: int = 4, executor: str = "thread", ordered: bool = True,
+                 max_in_flight: Optional[int] = None, checkpoint_every: int = 100,
+                 task_workers: int = 4, default_persona: Optional[str] = None):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread' or 'process', not {executor!r}")
+        self.workers = workers
+        self.executor = executor
+        self.ordered = ordered
+        self.max_in_flight = max_in_flight or workers * 4
+        self.checkpoint_every = checkpoint_every
+        self.task_workers = task_workers
+        self.default_persona = default_persona
+
+    def _pool(self) -> Tuple[Any, Callable[[int, Dict[str, Any]], Future]]:
+        """The worker pool and a submit(line, record) function for it"""
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                       initargs=(self.task_workers, self.default_persona))
+            return pool, lambda line, record: pool.submit(_process_in_worker, line, record)
+        pipeline = build_pipeline(self.task_workers)
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="batch")
+        return pool, lambda line, record: pool.submit(process_record, pipeline, line, record, self.default_persona)
+
+    def run(self, input_path: str, output_path: str, resume: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Process input_path into output_path and return counts and throughput"""
+        if os.path.exists(output_path) and not resume:
+            raise FileExistsError(f"{output_path} already exists")
+        done = completed_lines(output_path) if resume else set()
+        stats = {"processed": 0, "errors": 0, "skipped": len(done)}
+        started = time.perf_counter()
+
+        pool, submit = self._pool()
+
+        # Futures in submission order; ordered output only ever writes the head of this queue
+        pending: deque = deque()
+        with pool, open(output_path, "a", encoding="utf-8") as out:
+            def write(result: Dict[str, Any]):
+                out.write(json.dumps(result, default=str) + "\n")
+                stats["processed"] += 1
+                stats["errors"] += result["error"] is not None
+                if stats["processed"] % self.checkpoint_every == 0:
+                    out.flush()
+                    os.fsync(out.fileno())
+
+            def drain(block: bool):
+                if self.ordered:
+                    while pending and (pending[0].done() or block):
+                        write(pending.popleft().result())
+                        block = False
+                    return
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED) if block else (
+                    [f for f in pending if f.done()], None)
+                for future in finished:
+                    pending.remove(future)
+                    write(future.result())
+
+            for count, (line, record) in enumerate(read_records(input_path, done)):
+                if limit is not None and count >= limit:
+                    break
+                if isinstance(record, json.JSONDecodeError):
+                    pending.append(_resolved({"line": line, "id": None, "error": f"invalid JSON: {record}"}))
+                elif not isinstance(record, dict):
+                    pending.append(_resolved({"line": line, "id": None, "error": "record must be a JSON object"}))
+                else:
+                    pending.append(submit(line, record))
+                drain(block=len(pending) >= self.max_in_flight)
+            while pending:
+                drain(block=True)
+
+        stats["elapsed_seconds"] = time.perf_counter() - started
+        stats["records_per_second"] = stats["processed"] / stats["elapsed_seconds"] if stats["elapsed_seconds"] else 0.0
+        return stats
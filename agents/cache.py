@@ -0,0 +1,253 @@
+"""
+Response cache for persona LLM answers.
+
+Caches conversational replies keyed on (personality, normalized query, context
+fingerprint) with TTL expiry, LRU eviction and an optional near-duplicate
+lookup backed by a hashed character n-gram similarity index.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Optional, Set, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+CacheKey = Tuple[str, str, str]
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    query = _PUNCTUATION.sub(" ", (query or "").lower())
+    return _WHITESPACE.sub(" ", query).strip()
+
+def fingerprint_context(context: Optional[Dict[str, Any]]) -> str:
+    """Stable short fingerprint of a context dict (empty string for no context)"""
+    if not context:
+        return ""
+    encoded = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+class NgramSimilarityIndex:
+    """
+    Inverted index over hashed character n-grams.
+    Scores candidates with cosine similarity of their n-gram count vectors.
+    """
+
+    def __init__(self, ngram_size: int = 3, num_buckets: int = 1 << 16):
+        self.ngram_size = ngram_size
+        self.num_buckets = num_buckets
+        self._vectors: Dict[Any, Tuple[Dict[int, int], float]] = {}
+        self._postings: Dict[int, Set[Any]] = {}
+
+    def vectorize(self, text: str) -> Dict[int, int]:
+        """Hash the padded character n-grams of text into bucket counts"""
+        padded = f" {text} "
+        n = self.ngram_size
+        vector: Dict[int, int] = {}
+        for i in range(max(1, len(padded) - n + 1)):
+            bucket = zlib.crc32(padded[i:i + n].encode("utf-8")) % self.num_buckets
+            vector[bucket] = vector.get(bucket, 0) + 1
+        return vector
+
+    def add(self, key: Any, text: str):
+        """Index text under key, replacing any previous entry"""
+        self.remove(key)
+        vector = self.vectorize(text)
+        norm = math.sqrt(sum(c * c for c in vector.values()))
+        self._vectors[key] = (vector, norm)
+        for bucket in vector:
+            self._postings.setdefault(bucket, set()).add(key)
+
+    def remove(self, key: Any):
+        """Drop key from the index if present"""
+        entry = self._vectors.pop(key, None)
+        if not entry:
+            return
+        for bucket in entry[0]:
+            keys = self._postings.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[bucket]
+
+    def most_similar(self, text: str, threshold: float,
+                     accept: Optional[Callable[[Any], bool]] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Return (key, score) of the best match at or above threshold.
+        When accept is given only keys for which it returns True are considered.
+        """
+        vector = self.vectorize(text)
+        norm = math.sqrt(sum(c * c for c in vector.values()))
+        if not norm:
+            return None
+
+        dots: Dict[Any, int] = {}
+        rejected: Set[Any] = set()
+        for bucket, count in vector.items():
+            for key in self._postings.get(bucket, ()):
+                if key in rejected:
+                    continue
+                if accept is not None and key not in dots and not accept(key):
+                    rejected.add(key)
+                    continue
+                dots[key] = dots.get(key, 0) + count * self._vectors[key][0][bucket]
+
+        best = None
+        for key, dot in dots.items():
+            score = dot / (norm * self._vectors[key][1])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def __len__(self):
+        return len(self._vectors)
+
+@dataclass
+class _CacheEntry:
+    value: str
+    expires_at: float
+
+class ResponseCache:
+    """
+    Thread-safe TTL + LRU cache for persona responses.
+
+    Entries are keyed on (personality, normalized query, context fingerprint).
+    Turns that invoked tools (e.g. the webcam) are not stored unless tool
+    bypass has been disabled for that personality.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0,
+                 near_duplicate_threshold: Optional[float] = None,
+                 bypass_tool_turns: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.bypass_tool_turns = bypass_tool_turns
+        self._tool_bypass_overrides: Dict[str, bool] = {}
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._index = NgramSimilarityIndex() if near_duplicate_threshold else None
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "tool_bypasses": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def make_key(self, personality: str, query: str, context: Optional[Dict[str, Any]] = None) -> CacheKey:
+        """Build the cache key for a persona turn"""
+        return ((personality or "").lower(), normalize_query(query), fingerprint_context(context))
+
+    def set_tool_bypass(self, personality: str, enabled: bool):
+        """Enable or disable skipping tool-calling turns for one personality"""
+        with self._lock:
+            self._tool_bypass_overrides[personality.lower()] = enabled
+
+    def should_bypass(self, personality: str, used_tools: bool) -> bool:
+        """Check whether a turn must not be cached"""
+        if not used_tools:
+            return False
+        return self._tool_bypass_overrides.get((personality or "").lower(), self.bypass_tool_turns)
+
+    def get(self, personality: str, query: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Return a cached response for the turn, or None on a miss"""
+        key = self.make_key(personality, query, context)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry.value
+                self._drop(key)
+                self._stats["expirations"] += 1
+
+            if self._index is not None and key[1]:
+                match = self._index.most_similar(
+                    key[1],
+                    self.near_duplicate_threshold,
+                    accept=lambda k: k[0] == key[0] and k[2] == key[2] and self._entries[k].expires_at > now
+                )
+                if match is not None:
+                    self._entries.move_to_end(match[0])
+                    self._stats["near_hits"] += 1
+                    return self._entries[match[0]].value
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, personality: str, query: str, response: str,
+            context: Optional[Dict[str, Any]] = None, used_tools: bool = False) -> bool:
+        """Store a response; returns False when the turn was bypassed"""
+        if self.should_bypass(personality, used_tools):
+            with self._lock:
+                self._stats["tool_bypasses"] += 1
+            return False
+
+        key = self.make_key(personality, query, context)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = _CacheEntry(response, time.monotonic() + self.ttl_seconds)
+            if self._index is not None:
+                self._index.add(key, key[1])
+            self._stats["stores"] += 1
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+        return True
+
+    def _drop(self, key: CacheKey):
+        """Remove an entry; caller must hold the lock"""
+        self._entries.pop(key, None)
+        if self._index is not None:
+            self._index.remove(key)
+
+    def clear(self):
+        """Remove all entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            if self._index is not None:
+                self._index = NgramSimilarityIndex()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the overall hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["near_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """
+        Build a cache from RESPONSE_CACHE_* environment variables.
+        Returns None unless RESPONSE_CACHE_ENABLED is set (the cache is opt-in).
+        """
+        if os.getenv("RESPONSE_CACHE_ENABLED", "").lower() not in ("1", "true", "yes"):
+            return None
+        near_duplicate = os.getenv("RESPONSE_CACHE_NEAR_DUPLICATE_THRESHOLD")
+        return cls(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600")),
+            near_duplicate_threshold=float(near_duplicate) if near_duplicate else None,
+            bypass_tool_turns=os.getenv("RESPONSE_CACHE_BYPASS_TOOL_TURNS", "true").lower() in ("1", "true", "yes")
+        )
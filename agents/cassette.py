@@ -0,0 +1,184 @@
+"""
+Record/replay cassettes for calls to external services.
+
+Functions decorated with @recorded(kind) (the Gemini agent run, the Groq vision
+and Whisper calls and ElevenLabs synthesis) go through the global cassette:
+
+    off       call the service (default)
+    record    call the service and append request -> response and latency to the cassette file
+    replay    answer from the cassette only; a request that was never recorded raises CassetteMiss
+    auto      replay what was recorded, call and record the rest
+
+A cassette is a JSONL file (gzip-compressed when the path ends in .gz) with one
+entry per call: {"kind", "key", "response", "latency"}. Bytes responses are
+stored base64 encoded. Requests are matched on the key exactly, or with
+match="normalized" on lowercased, punctuation-free, whitespace-collapsed
+strings. Repeated requests replay their recordings in order, then keep
+returning the last one. Replay is instant unless latency_scale is set
+(1.0 sleeps for the recorded latency).
+
+    CASSETTE_MODE=record CASSETTE_PATH=ci.jsonl.gz python benchmarks/bench_pipeline.py
+    CASSETTE_MODE=replay CASSETTE_PATH=ci.jsonl.gz python -m pytest
+"""
+import base64
+import functools
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.cache import normalize_query
+
+MODES = ("off", "record", "replay", "auto")
+MATCHES = ("exact", "normalized")
+
+class CassetteMiss(LookupError):
+    """A replay-only cassette has no recording for the request"""
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return normalize_query(value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+def file_digest(path: str) -> str:
+    """Content hash of a file, for keying requests that upload it"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Cassette:
+    """Recorded request -> response pairs, keyed by call kind and request key"""
+
+    def __init__(self, path: Optional[str] = None, mode: str = "off", match: str = "exact",
+                 latency_scale: float = 0.0, sleep: Callable[[float], None] = time.sleep):
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.configure(path, mode, match, latency_scale)
+
+    def configure(self, path: Optional[str], mode: str = "off", match: str = "exact", latency_scale: float = 0.0):
+        """Switch mode and file, loading the recordings already in it"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+        if match not in MATCHES:
+            raise ValueError(f"Unknown cassette match: {match} (expected exact or normalized)")
+        if mode != "off" and not path:
+            raise ValueError("A cassette path is required unless the mode is off")
+        with self._lock:
+            self.path = path
+            self.mode = mode
+            self.match = match
+            self.latency_scale = latency_scale
+            self._entries: Dict[str, List[Dict[str, Any]]] = {}
+            self._positions: Dict[str, int] = {}
+            self._stats = {"replayed": 0, "recorded": 0, "misses": 0}
+            if mode != "off" and os.path.exists(path):
+                for entry in self._read():
+                    self._entries.setdefault(self._digest(entry["kind"], entry["key"]), []).append(entry)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode in ("replay", "auto")
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _read(self) -> List[Dict[str, Any]]:
+        with self._open("r") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _digest(self, kind: str, key: Any) -> str:
+        if self.match == "normalized":
+            key = _normalize(key)
+        encoded = json.dumps([kind, key], sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+    def lookup(self, kind: str, key: Any) -> Optional[Dict[str, Any]]:
+        """Next recording for the request (the last one once they are used up), or None"""
+        digest = self._digest(kind, key)
+        with self._lock:
+            entries = self._entries.get(digest)
+            if not entries:
+                return None
+            position = self._positions.get(digest, 0)
+            self._positions[digest] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def record(self, kind: str, key: Any, response: Any, latency: float):
+        entry = {"kind": kind, "key": _encode(key), "response": _encode(response), "latency": round(latency, 6)}
+        with self._lock:
+            self._entries.setdefault(self._digest(kind, entry["key"]), []).append(entry)
+            self._stats["recorded"] += 1
+            with self._open("a") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def call(self, kind: str, key: Any, fn: Callable[[], Any]) -> Any:
+        """Serve fn() from the cassette or call it, according to the mode"""
+        if self.mode == "off":
+            return fn()
+        if self.replaying:
+            entry = self.lookup(kind, _encode(key))
+            if entry is not None:
+                with self._lock:
+                    self._stats["replayed"] += 1
+                if self.latency_scale:
+                    self.sleep(entry["latency"] * self.latency_scale)
+                return _decode(entry["response"])
+            with self._lock:
+                self._stats["misses"] += 1
+            if self.mode == "replay":
+                raise CassetteMiss(f"No {kind} recording for {key!r} in {self.path}")
+        started = time.perf_counter()
+        response = fn()
+        self.record(kind, key, response, time.perf_counter() - started)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, mode=self.mode, match=self.match,
+                        entries=sum(len(entries) for entries in self._entries.values()))
+
+def _cassette_from_env() -> Cassette:
+    return Cassette(os.getenv("CASSETTE_PATH"), os.getenv("CASSETTE_MODE", "off"),
+                    os.getenv("CASSETTE_MATCH", "exact"), float(os.getenv("CASSETTE_LATENCY_SCALE", "0")))
+
+cassette = _cassette_from_env()
+
+def recorded(kind: str, key: Optional[Callable[..., Any]] = None) -> Callable:
+    """
+    Decorator routing calls through the global cassette.
+    key(*args, **kwargs) gives the request key (default: the positional and keyword arguments).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if cassette.mode == "off":
+                return fn(*args, **kwargs)
+            request = key(*args, **kwargs) if key else [list(args), kwargs]
+            return cassette.call(kind, request, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
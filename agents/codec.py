@@ -0,0 +1,296 @@
+"""
+Serialization for Task and AgentResponse.
+
+to_dict/from_dict helpers produce JSON-compatible dicts (enums as their string
+values) and accept either enum members or values when reading back.
+
+encode()/decode() produce a compact binary form for queues, persistence and
+inter-process transfer: one version byte followed by a MessagePack document in
+which tasks and responses are positional arrays (no field names) and enums are
+small integers. The msgpack C extension is used when installed; otherwise a
+built-in encoder writes the same wire format.
+
+    blob = encode([task, response])
+    task, response = decode(blob)
+"""
+import struct
+from typing import Any, Dict
+
+from agents.base import Task, AgentResponse, TaskStatus, TaskPriority
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+CODEC_VERSION = 2
+# Version 1 tasks lack trace_parent and are still accepted
+_READABLE_VERSIONS = (1, 2)
+
+_STATUSES = list(TaskStatus)
+_PRIORITIES = list(TaskPriority)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_PRIORITY_CODES = {priority: code for code, priority in enumerate(_PRIORITIES)}
+
+# First element of an encoded array marking what it holds
+_TASK = 0
+_RESPONSE = 1
+
+class CodecError(ValueError):
+    """Raised for data that cannot be decoded"""
+
+# Dicts
+
+def task_to_dict(task: Task) -> Dict[str, Any]:
+    """JSON-compatible snapshot of a task"""
+    return {
+        "id": task.id,
+        "description": task.description,
+        "task_type": task.task_type,
+        "payload": task.payload,
+        "status": task.status.value,
+        "priority": task.priority.value,
+        "assigned_agent": task.assigned_agent,
+        "result": task.result,
+        "error_message": task.error_message,
+        "parent_task_id": task.parent_task_id,
+        "created_by": task.created_by,
+        "trace_parent": task.trace_parent,
+    }
+
+def task_from_dict(data: Dict[str, Any]) -> Task:
+    """Rebuild a task from task_to_dict output (enum members or values both accepted)"""
+    return Task(
+        id=data["id"],
+        description=data["description"],
+        task_type=data["task_type"],
+        payload=data.get("payload") or {},
+        status=TaskStatus(data.get("status", TaskStatus.PENDING)),
+        priority=TaskPriority(data.get("priority", TaskPriority.MEDIUM)),
+        assigned_agent=data.get("assigned_agent"),
+        result=data.get("result"),
+        error_message=data.get("error_message"),
+        parent_task_id=data.get("parent_task_id"),
+        created_by=data.get("created_by"),
+        trace_parent=data.get("trace_parent"),
+    )
+
+def response_to_dict(response: AgentResponse) -> Dict[str, Any]:
+    """JSON-compatible snapshot of an agent response, including the tasks it created"""
+    return {
+        "success": response.success,
+        "message": response.message,
+        "data": response.data,
+        "tasks_created": [task_to_dict(task) for task in response.tasks_created]
+                         if response.tasks_created is not None else None,
+        "requires_clarification": response.requires_clarification,
+        "clarification_question": response.clarification_question,
+    }
+
+def response_from_dict(data: Dict[str, Any]) -> AgentResponse:
+    """Rebuild an agent response from response_to_dict output (Task objects are kept as is)"""
+    tasks = data.get("tasks_created")
+    return AgentResponse(
+        success=data["success"],
+        message=data["message"],
+        data=data.get("data"),
+        tasks_created=[task if isinstance(task, Task) else task_from_dict(task) for task in tasks]
+                      if tasks is not None else None,
+        requires_clarification=data.get("requires_clarification", False),
+        clarification_question=data.get("clarification_question"),
+    )
+
+# Positional form
+
+def _pack_task(task: Task) -> list:
+    return [_TASK, task.id, task.description, task.task_type, task.payload,
+            _STATUS_CODES[task.status], _PRIORITY_CODES[task.priority], task.assigned_agent,
+            task.result, task.error_message, task.parent_task_id, task.created_by, task.trace_parent]
+
+def _pack_response(response: AgentResponse) -> list:
+    tasks = [_pack_task(task) for task in response.tasks_created] if response.tasks_created is not None else None
+    return [_RESPONSE, response.success, response.message, response.data, tasks,
+            response.requires_clarification, response.clarification_question]
+
+def _to_wire(obj: Any, nested: bool = False) -> list:
+    if isinstance(obj, Task):
+        return _pack_task(obj)
+    if isinstance(obj, AgentResponse):
+        return _pack_response(obj)
+    if isinstance(obj, (list, tuple)) and not nested:
+        return [_to_wire(item, nested=True) for item in obj]
+    raise CodecError(f"can only encode Task, AgentResponse or a list of them, not {type(obj).__name__}")
+
+def _unpack_task(fields: list) -> Task:
+    (_, id, description, task_type, payload, status, priority, assigned_agent,
+     result, error_message, parent_task_id, created_by, *trace_parent) = fields
+    return Task(id, description, task_type, payload, _STATUSES[status], _PRIORITIES[priority],
+                assigned_agent, result, error_message, parent_task_id, created_by,
+                trace_parent[0] if trace_parent else None)
+
+def _unpack_response(fields: list) -> AgentResponse:
+    _, success, message, data, tasks, requires_clarification, clarification_question = fields
+    return AgentResponse(success, message, data,
+                         [_unpack_task(task) for task in tasks] if tasks is not None else None,
+                         requires_clarification, clarification_question)
+
+def _from_wire(obj: Any, nested: bool = False) -> Any:
+    """An object is an array whose first item is its type tag; otherwise a list of objects"""
+    if not isinstance(obj, list) or not obj:
+        if obj == [] and not nested:
+            return []
+        raise CodecError("malformed payload")
+    if obj[0] == _TASK and len(obj) in (12, 13):
+        return _unpack_task(obj)
+    if obj[0] == _RESPONSE and len(obj) == 7:
+        return _unpack_response(obj)
+    if nested:
+        raise CodecError("malformed payload")
+    return [_from_wire(item, nested=True) for item in obj]
+
+# Binary
+
+def encode(obj: Any) -> bytes:
+    """Encode a Task, an AgentResponse or a list of them"""
+    return bytes([CODEC_VERSION]) + _packb(_to_wire(obj))
+
+def decode(blob: bytes) -> Any:
+    """Decode the output of encode()"""
+    if not blob:
+        raise CodecError("empty payload")
+    if blob[0] not in _READABLE_VERSIONS:
+        raise CodecError(f"unsupported codec version {blob[0]} (this build reads {_READABLE_VERSIONS})")
+    return _from_wire(_unpackb(blob, 1))
+
+def _packb(obj: Any) -> bytes:
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(obj, use_bin_type=True)
+    out = bytearray()
+    _pack_into(obj, out)
+    return bytes(out)
+
+def _unpackb(blob: bytes, offset: int) -> Any:
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(memoryview(blob)[offset:], raw=False, strict_map_key=False)
+    try:
+        obj, end = _unpack_from(blob, offset)
+    except (IndexError, struct.error) as e:
+        raise CodecError("truncated payload") from e
+    if end != len(blob):
+        raise CodecError("trailing bytes after payload")
+    return obj
+
+# Built-in MessagePack subset (nil, bool, int, float64, str, bin, array, map)
+
+def _pack_into(obj: Any, out: bytearray):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        elif 0 < obj <= 0xffff:
+            out += b"\xcc" + struct.pack(">B", obj) if obj <= 0xff else b"\xcd" + struct.pack(">H", obj)
+        elif 0 < obj <= 0xffffffffffffffff:
+            out += b"\xce" + struct.pack(">I", obj) if obj <= 0xffffffff else b"\xcf" + struct.pack(">Q", obj)
+        elif -0x80000000 <= obj < 0:
+            out += b"\xd2" + struct.pack(">i", obj)
+        elif -0x8000000000000000 <= obj < 0:
+            out += b"\xd3" + struct.pack(">q", obj)
+        else:
+            raise CodecError(f"integer out of range: {obj}")
+    elif isinstance(obj, float):
+        out += b"\xcb" + struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xa0 | n)
+        elif n < 0x100:
+            out += bytes((0xd9, n))
+        elif n < 0x10000:
+            out += b"\xda" + struct.pack(">H", n)
+        else:
+            out += b"\xdb" + struct.pack(">I", n)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        out += (bytes((0xc4, n)) if n < 0x100 else
+                b"\xc5" + struct.pack(">H", n) if n < 0x10000 else b"\xc6" + struct.pack(">I", n))
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        out += bytes((0x90 | n,)) if n < 16 else (b"\xdc" + struct.pack(">H", n) if n < 0x10000 else b"\xdd" + struct.pack(">I", n))
+        for item in obj:
+            _pack_into(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        out += bytes((0x80 | n,)) if n < 16 else (b"\xde" + struct.pack(">H", n) if n < 0x10000 else b"\xdf" + struct.pack(">I", n))
+        for key, value in obj.items():
+            _pack_into(key, out)
+            _pack_into(value, out)
+    else:
+        raise CodecError(f"cannot encode {type(obj).__name__}")
+
+_FIXED = {0xc0: None, 0xc2: False, 0xc3: True}
+_INTS = {0xcc: ">B", 0xcd: ">H", 0xce: ">I", 0xcf: ">Q", 0xd0: ">b", 0xd1: ">h", 0xd2: ">i", 0xd3: ">q",
+         0xca: ">f", 0xcb: ">d"}
+_LENGTHS = {0xd9: ">B", 0xda: ">H", 0xdb: ">I", 0xc4: ">B", 0xc5: ">H", 0xc6: ">I",
+            0xdc: ">H", 0xdd: ">I", 0xde: ">H", 0xdf: ">I"}
+
+def _unpack_from(blob: bytes, offset: int):
+    """Decode one value at offset; returns (value, next offset)"""
+    tag = blob[offset]
+    offset += 1
+    if tag < 0x80:
+        return tag, offset
+    if tag >= 0xe0:
+        return tag - 0x100, offset
+    if 0xa0 <= tag <= 0xbf:
+        end = offset + (tag & 0x1f)
+        return blob[offset:end].decode("utf-8"), end
+    if 0x90 <= tag <= 0x9f:
+        return _unpack_array(blob, offset, tag & 0x0f)
+    if 0x80 <= tag <= 0x8f:
+        return _unpack_map(blob, offset, tag & 0x0f)
+    if tag in _FIXED:
+        return _FIXED[tag], offset
+    if tag in _INTS:
+        fmt = _INTS[tag]
+        return struct.unpack_from(fmt, blob, offset)[0], offset + struct.calcsize(fmt)
+    if tag in _LENGTHS:
+        fmt = _LENGTHS[tag]
+        n = struct.unpack_from(fmt, blob, offset)[0]
+        offset += struct.calcsize(fmt)
+        if tag in (0xdc, 0xdd):
+            return _unpack_array(blob, offset, n)
+        if tag in (0xde, 0xdf):
+            return _unpack_map(blob, offset, n)
+        end = offset + n
+        if end > len(blob):
+            raise CodecError("truncated payload")
+        chunk = blob[offset:end]
+        return (chunk.decode("utf-8") if tag in (0xd9, 0xda, 0xdb) else bytes(chunk)), end
+    raise CodecError(f"unsupported MessagePack type 0x{tag:02x}")
+
+def _unpack_array(blob: bytes, offset: int, n: int):
+    items = []
+    for _ in range(n):
+        item, offset = _unpack_from(blob, offset)
+        items.append(item)
+    return items, offset
+
+def _unpack_map(blob: bytes, offset: int, n: int):
+    result = {}
+    for _ in range(n):
+        key, offset = _unpack_from(blob, offset)
+        value, offset = _unpack_from(blob, offset)
+        result[key] = value
+    return result, offset
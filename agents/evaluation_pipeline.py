@@ -0,0 +1,169 @@
+"""
+Background evaluation of completed tasks.
+
+Reflection evaluation does not change what the user gets back, so by default
+completed (task, response) pairs are put on a bounded queue and a worker thread
+evaluates them in batches after the response has been sent. Callers that need
+the score in the response can evaluate inline, either for every call
+(mode="inline") or per call (submit(..., inline=True)). `on_evaluated` is called
+with each evaluated batch of (task, response) pairs, e.g. to queue follow-ups.
+
+    evaluator = EvaluationPipeline(reflection_agent)
+    evaluator.submit(task, response)      # returns None immediately
+    evaluator.stats()["lag_seconds"]      # age of the oldest queued evaluation
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.base import Task, AgentResponse
+from agents.reflection import ReflectionAgent
+
+EVALUATION_MODES = ("async", "inline")
+
+class EvaluationPipeline:
+    """Bounded queue of completed tasks evaluated in batches by a background worker"""
+
+    def __init__(self, reflection_agent: ReflectionAgent, mode: str = "async", max_queue: int = 10000,
+                 batch_size: int = 64, batch_wait: float = 0.05,
+                 on_evaluated: Optional[Callable[[List[Tuple[Task, AgentResponse]]], None]] = None):
+        if mode not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode: {mode} (expected async or inline)")
+        self.reflection_agent = reflection_agent
+        self.mode = mode
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.on_evaluated = on_evaluated
+        self._queue: "queue.Queue[Optional[Tuple[float, Task, AgentResponse, Optional[float]]]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "evaluated": 0, "inline": 0, "overflowed": 0, "errors": 0, "batches": 0}
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, task: Task, response: AgentResponse, inline: bool = False,
+               latency: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate a completed task (that took `latency` seconds). Returns the evaluation when
+        it ran inline, otherwise None once the pair is queued. A full queue falls back to
+        inline evaluation.
+        """
+        self._count("submitted")
+        if inline or self.mode == "inline":
+            self._count("inline")
+            return self._evaluate_now(task, response, latency)
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((time.monotonic(), task, response, latency))
+            return None
+        except queue.Full:
+            self._count("overflowed")
+            return self._evaluate_now(task, response, latency)
+
+    def _evaluate_now(self, task: Task, response: AgentResponse, latency: Optional[float]) -> Dict[str, Any]:
+        evaluation = self.reflection_agent.evaluate_task_completion(task, response, latency)
+        self._notify([(task, response)])
+        return evaluation
+
+    def _notify(self, completed: List[Tuple[Task, AgentResponse]]):
+        if self.on_evaluated is None:
+            return
+        try:
+            self.on_evaluated(completed)
+        except Exception:
+            self._count("errors")
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="evaluation-worker", daemon=True)
+                    self._worker.start()
+
+    def _next_batch(self) -> Optional[List[Tuple[float, Task, AgentResponse, Optional[float]]]]:
+        """Block for one item, then collect more for up to batch_wait seconds; None means stop"""
+        first = self._queue.get()
+        if first is None:
+            self._queue.task_done()
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                self._queue.task_done()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            lag = time.monotonic() - batch[0][0]
+            try:
+                completed = [(task, response) for _, task, response, _ in batch]
+                self.reflection_agent.evaluate_batch(completed, [latency for *_, latency in batch])
+                self._count("evaluated", len(batch))
+                self._notify(completed)
+            except Exception:
+                self._count("errors", len(batch))
+            finally:
+                with self._lock:
+                    self._stats["batches"] += 1
+                    self._last_lag = lag
+                    self._max_lag = max(self._max_lag, lag)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def lag(self) -> float:
+        """Seconds the oldest queued evaluation has been waiting (0 when the queue is empty)"""
+        with self._queue.mutex:
+            oldest = next((item for item in self._queue.queue if item is not None), None)
+        return time.monotonic() - oldest[0] if oldest else 0.0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued evaluation has been recorded; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and throughput counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            last_lag, max_lag = self._last_lag, self._max_lag
+        return {
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "lag_seconds": self.lag(),
+            "last_batch_lag_seconds": last_lag,
+            "max_lag_seconds": max_lag,
+            **stats,
+        }
+
+    def shutdown(self, timeout: Optional[float] = 5.0):
+        """Evaluate what is already queued, then stop the worker"""
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        self._queue.put(None)
+        worker.join(timeout)
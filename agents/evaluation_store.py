@@ -0,0 +1,325 @@
+"""
+Columnar store for reflection evaluations.
+
+Each evaluation becomes one row across fixed-width NumPy columns (timestamp,
+task type code, success flag, completeness and quality scores, latency) instead
+of a dict with nested lists. Task types, issues and recommendations are
+interned: rows hold integer codes, and the variable-length issue and
+recommendation lists are kept as flat code arrays with per-row offsets (CSR
+layout). A row costs about 40 bytes.
+
+Queries (percentiles, moving averages, per-type breakdowns, time trends) are
+vectorized over the columns. columns() returns zero-copy views;
+save()/load() write one .npy file per column so a saved store can be memory
+mapped back without copying, and to_npz() bundles the same arrays into one file.
+
+Readers work on a snapshot of the populated views taken under the lock. Writers
+only fill rows past the snapshot or replace arrays (growing, dropping old rows),
+so a query never sees a half-written or shifted row.
+
+With max_rows set the store keeps only the most recent evaluations: once it
+grows past max_rows the oldest quarter is dropped in one shift, so a
+long-running server holds a bounded window.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+class _Interner:
+    """String <-> dense integer code"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = list(values)
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class EvaluationStore:
+    """Append-only columnar evaluation storage with vectorized analytics"""
+
+    COLUMNS = {
+        "timestamp": "float64",
+        "task_type": "int32",
+        "success": "bool",
+        "completeness": "int16",
+        "quality": "int16",
+        "latency": "float32",
+    }
+    NUMERIC = ("completeness", "quality", "latency")
+
+    def __init__(self, initial_capacity: int = 1024, max_rows: Optional[int] = None):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the columnar evaluation store (pip install numpy)")
+        self.max_rows = max_rows
+        self._size = 0
+        self._columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._task_types = _Interner()
+        self._labels = _Interner()
+        # CSR lists: row i's issue codes are issue_codes[issue_offsets[i]:issue_offsets[i + 1]]
+        self._lists = {
+            "issues": (np.zeros(initial_capacity + 1, dtype="int64"), np.zeros(initial_capacity, dtype="int32")),
+            "recommendations": (np.zeros(initial_capacity + 1, dtype="int64"), np.zeros(initial_capacity, dtype="int32")),
+        }
+        self._list_sizes = {"issues": 0, "recommendations": 0}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the populated parts of the columns"""
+        return sum(view.nbytes for view in self._snapshot().values())
+
+    @staticmethod
+    def _grown(array: "np.ndarray", needed: int) -> "np.ndarray":
+        if needed <= len(array):
+            return array
+        grown = np.zeros(max(needed, len(array) * 2), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def append(self, evaluation: Dict[str, Any], timestamp: Optional[float] = None, latency: Optional[float] = None):
+        """Add one evaluation dict (as built by ReflectionAgent)"""
+        self.extend([evaluation], [timestamp if timestamp is not None else time.time()], [latency])
+
+    def extend(self, evaluations: Sequence[Dict[str, Any]], timestamps: Optional[Sequence[float]] = None,
+               latencies: Optional[Sequence[Optional[float]]] = None):
+        """Add several evaluations at once; a missing latency is stored as NaN"""
+        count = len(evaluations)
+        if not count:
+            return
+        now = time.time()
+        timestamps = timestamps if timestamps is not None else [now] * count
+        latencies = latencies if latencies is not None else [None] * count
+        with self._lock:
+            start, end = self._size, self._size + count
+            for name in self._columns:
+                self._columns[name] = self._grown(self._columns[name], end)
+            columns = self._columns
+            columns["timestamp"][start:end] = timestamps
+            columns["task_type"][start:end] = [self._task_types.code(e["task_type"]) for e in evaluations]
+            columns["success"][start:end] = [bool(e["success"]) for e in evaluations]
+            columns["completeness"][start:end] = [e.get("completeness_score", 0) for e in evaluations]
+            columns["quality"][start:end] = [e.get("quality_score", 0) for e in evaluations]
+            columns["latency"][start:end] = [np.nan if value is None else value for value in latencies]
+            for name, key in (("issues", "issues_identified"), ("recommendations", "recommendations")):
+                self._extend_list(name, [[self._labels.code(label) for label in e.get(key, ())] for e in evaluations], start)
+            self._size = end
+            if self.max_rows is not None and end > self.max_rows:
+                self._drop_oldest(end - self.max_rows * 3 // 4)
+
+    @staticmethod
+    def _tail(array: "np.ndarray", start: int, stop: int) -> "np.ndarray":
+        """array[start:stop] moved to the front of a new array of the same capacity"""
+        moved = np.zeros(len(array), dtype=array.dtype)
+        moved[:stop - start] = array[start:stop]
+        return moved
+
+    def _drop_oldest(self, count: int):
+        """Drop the first `count` rows (called with the lock held)"""
+        # Copied into new arrays rather than shifted in place, so snapshots held by readers stay intact
+        n = self._size
+        self._columns = {name: self._tail(column, count, n) for name, column in self._columns.items()}
+        for name, (offsets, codes) in self._lists.items():
+            first, used = int(offsets[count]), self._list_sizes[name]
+            offsets = self._tail(offsets, count, n + 1)
+            offsets[:n - count + 1] -= first
+            self._lists[name] = (offsets, self._tail(codes, first, used))
+            self._list_sizes[name] = used - first
+        self._size = n - count
+
+    def _extend_list(self, name: str, rows: List[List[int]], start: int):
+        offsets, codes = self._lists[name]
+        flat = [code for row in rows for code in row]
+        used = self._list_sizes[name]
+        offsets = self._grown(offsets, start + len(rows) + 1)
+        codes = self._grown(codes, used + len(flat))
+        codes[used:used + len(flat)] = flat
+        offsets[start + 1:start + len(rows) + 1] = used + np.cumsum([len(row) for row in rows])
+        self._lists[name] = (offsets, codes)
+        self._list_sizes[name] = used + len(flat)
+
+    def _snapshot(self) -> Dict[str, "np.ndarray"]:
+        """Views of the populated rows, taken under the lock so they line up with each other"""
+        with self._lock:
+            n = self._size
+            views = {name: column[:n] for name, column in self._columns.items()}
+            for name, (offsets, codes) in self._lists.items():
+                views[f"{name}_offsets"] = offsets[:n + 1]
+                views[f"{name}_codes"] = codes[:self._list_sizes[name]]
+        return views
+
+    def columns(self) -> Dict[str, "np.ndarray"]:
+        """Zero-copy views of the populated columns, plus the CSR issue/recommendation arrays"""
+        return self._snapshot()
+
+    def _mask(self, view: Dict[str, "np.ndarray"], task_type: Optional[str] = None,
+              since: Optional[float] = None) -> "np.ndarray":
+        mask = np.ones(len(view["timestamp"]), dtype=bool)
+        if task_type is not None:
+            code = self._task_types.codes.get(task_type, -1)
+            mask &= view["task_type"] == code
+        if since is not None:
+            mask &= view["timestamp"] >= since
+        return mask
+
+    def _values(self, view: Dict[str, "np.ndarray"], column: str, task_type: Optional[str],
+                since: Optional[float]) -> "np.ndarray":
+        if column not in self.NUMERIC:
+            raise ValueError(f"Unknown column: {column} (expected one of {', '.join(self.NUMERIC)})")
+        values = view[column]
+        if task_type is not None or since is not None:
+            values = values[self._mask(view, task_type, since)]
+        return values[~np.isnan(values)] if column == "latency" else values
+
+    def percentiles(self, column: str = "quality", q: Sequence[float] = (50, 90, 99),
+                    task_type: Optional[str] = None, since: Optional[float] = None) -> Dict[str, float]:
+        """Percentiles of a numeric column, e.g. {"p50": 80.0, "p90": 100.0, "p99": 100.0}"""
+        return self._percentiles(self._snapshot(), column, q, task_type, since)
+
+    def _percentiles(self, view: Dict[str, "np.ndarray"], column: str, q: Sequence[float] = (50, 90, 99),
+                     task_type: Optional[str] = None, since: Optional[float] = None) -> Dict[str, float]:
+        values = self._values(view, column, task_type, since)
+        if not len(values):
+            return {f"p{p:g}": 0.0 for p in q}
+        return {f"p{p:g}": float(v) for p, v in zip(q, np.percentile(values, q))}
+
+    def moving_average(self, column: str = "quality", window: int = 100,
+                       task_type: Optional[str] = None) -> "np.ndarray":
+        """Rolling mean over the last `window` evaluations at every position (shorter at the start)"""
+        values = self._values(self._snapshot(), column, task_type, None).astype("float64")
+        if not len(values):
+            return values
+        sums = np.cumsum(values)
+        sums[window:] = sums[window:] - sums[:-window]
+        return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+    def by_task_type(self, since: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Count, success rate and mean quality/completeness per task type"""
+        return self._by_task_type(self._snapshot(), since)
+
+    def _by_task_type(self, view: Dict[str, "np.ndarray"], since: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        mask = self._mask(view, since=since)
+        codes = view["task_type"][mask]
+        types = len(self._task_types)
+        counts = np.bincount(codes, minlength=types)
+        successes = np.bincount(codes, weights=view["success"][mask], minlength=types)
+        quality = np.bincount(codes, weights=view["quality"][mask], minlength=types)
+        completeness = np.bincount(codes, weights=view["completeness"][mask], minlength=types)
+        breakdown = {}
+        for code in np.flatnonzero(counts):
+            count = counts[code]
+            breakdown[self._task_types.values[code]] = {
+                "count": int(count),
+                "success_rate": float(successes[code] / count * 100),
+                "average_quality": float(quality[code] / count),
+                "average_completeness": float(completeness[code] / count),
+            }
+        return breakdown
+
+    def trend(self, column: str = "quality", bucket_seconds: float = 3600,
+              task_type: Optional[str] = None) -> Dict[str, List[float]]:
+        """Mean of a column per time bucket: {"bucket_start": [...], "mean": [...], "count": [...]}"""
+        if column not in self.NUMERIC:
+            raise ValueError(f"Unknown column: {column} (expected one of {', '.join(self.NUMERIC)})")
+        view = self._snapshot()
+        mask = self._mask(view, task_type)
+        values = view[column][mask].astype("float64")
+        timestamps = view["timestamp"][mask]
+        present = ~np.isnan(values)
+        values, timestamps = values[present], timestamps[present]
+        if not len(values):
+            return {"bucket_start": [], "mean": [], "count": []}
+        buckets = np.floor(timestamps / bucket_seconds).astype("int64")
+        starts, index = np.unique(buckets, return_inverse=True)
+        counts = np.bincount(index)
+        sums = np.bincount(index, weights=values)
+        return {
+            "bucket_start": (starts * bucket_seconds).astype("float64").tolist(),
+            "mean": (sums / counts).tolist(),
+            "count": counts.tolist(),
+        }
+
+    def label_counts(self, kind: str = "issues", top: Optional[int] = None) -> List[tuple]:
+        """Most frequent issues or recommendations as (text, count)"""
+        return self._label_counts(self._snapshot(), kind, top)
+
+    def _label_counts(self, view: Dict[str, "np.ndarray"], kind: str = "issues", top: Optional[int] = None) -> List[tuple]:
+        if kind not in self._lists:
+            raise ValueError(f"Unknown label kind: {kind} (expected issues or recommendations)")
+        codes = view[f"{kind}_codes"]
+        counts = np.bincount(codes, minlength=len(self._labels))
+        order = np.argsort(-counts, kind="stable")
+        ranked = [(self._labels.values[code], int(counts[code])) for code in order if counts[code]]
+        return ranked[:top] if top else ranked
+
+    def _metadata(self) -> Dict[str, Any]:
+        return {"task_types": self._task_types.values, "labels": self._labels.values}
+
+    def to_npz(self, path: str, compressed: bool = False):
+        """Write every column and the string tables to one .npz file"""
+        save = np.savez_compressed if compressed else np.savez
+        save(path, metadata=np.array(json.dumps(self._metadata())), **self.columns())
+
+    def save(self, directory: str):
+        """Write one .npy file per column (plus metadata.json) for memory-mapped loading"""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self.columns().items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(self._metadata(), f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "EvaluationStore":
+        """Load a store written by save() (a directory, memory mapped by default) or to_npz()"""
+        if os.path.isdir(path):
+            with open(os.path.join(path, "metadata.json"), encoding="utf-8") as f:
+                metadata = json.load(f)
+            arrays = {}
+            for filename in os.listdir(path):
+                if filename.endswith(".npy"):
+                    arrays[filename[:-4]] = np.load(os.path.join(path, filename), mmap_mode="c" if mmap else None)
+        else:
+            with np.load(path) as data:
+                metadata = json.loads(str(data["metadata"]))
+                arrays = {name: data[name] for name in data.files if name != "metadata"}
+
+        store = cls(initial_capacity=1)
+        store._size = len(arrays["timestamp"])
+        store._columns = {name: arrays[name] for name in cls.COLUMNS}
+        store._task_types = _Interner(metadata["task_types"])
+        store._labels = _Interner(metadata["labels"])
+        for name in store._lists:
+            store._lists[name] = (arrays[f"{name}_offsets"], arrays[f"{name}_codes"])
+            store._list_sizes[name] = len(arrays[f"{name}_codes"])
+        return store
+
+    def summary(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """Percentiles of quality and latency plus the per-type breakdown"""
+        # One snapshot so every part describes the same rows
+        view = self._snapshot()
+        return {
+            "total_evaluations": int(self._mask(view, since=since).sum()),
+            "quality": self._percentiles(view, "quality", since=since),
+            "latency_seconds": self._percentiles(view, "latency", since=since),
+            "by_task_type": self._by_task_type(view, since=since),
+            "common_issues": self._label_counts(view, "issues", top=5),
+        }
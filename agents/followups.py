@@ -0,0 +1,248 @@
+"""
+Automatic follow-up tasks.
+
+ReflectionAgent.generate_follow_up_tasks suggests follow-ups for completed tasks
+(confirmation emails, delivery tracking, meeting reminders). FollowUpStage
+collects them, drops duplicates of a follow-up already scheduled for the same
+parent or recipient within `dedup_window` seconds, and runs the rest through the
+supervisor in batches from a background thread, holding back tasks for platforms
+that are over their rate limit. Each follow-up is linked to its parent through
+parent_task_id and the chain is kept in the state backend.
+
+    stage = FollowUpStage(supervisor, reflection_agent, rate_limits={"gmail": 5})
+    stage.submit_many([(task, response)])
+    stage.chain(task.id)
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from agents.base import Task, AgentResponse
+from agents.reflection import ReflectionAgent
+from agents.supervisor import HierarchicalSupervisor, TASK_PLATFORM_MAP
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parse "gmail=5,github=2" into per-platform tasks per second"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        platform, _, rate = part.partition("=")
+        limits[platform.strip()] = float(rate)
+    return limits
+
+class TokenBucket:
+    """Allows `rate` events per second with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+class FollowUpStage:
+    """Deduplicates, rate-limits and executes follow-up tasks in batches"""
+
+    def __init__(self, supervisor: HierarchicalSupervisor, reflection_agent: ReflectionAgent,
+                 dedup_window: float = 300.0, rate_limits: Optional[Dict[str, float]] = None,
+                 batch_size: int = 32, max_depth: int = 3, max_pending: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.supervisor = supervisor
+        self.reflection_agent = reflection_agent
+        self.state = supervisor.state
+        self.dedup_window = dedup_window
+        self.batch_size = batch_size
+        self.max_depth = max_depth
+        # Follow-ups beyond this many queued are dropped (and counted) rather than growing the queue
+        self.max_pending = max_pending
+        self.clock = clock
+        self.buckets = {platform: TokenBucket(rate, clock=clock) for platform, rate in (rate_limits or {}).items()}
+        # Dedup key -> expiry, in expiry order
+        self._recent: "OrderedDict[Tuple, float]" = OrderedDict()
+        self._pending: Deque[Task] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._stats = {"generated": 0, "coalesced": 0, "too_deep": 0, "executed": 0, "failed": 0,
+                       "rate_limited": 0, "batches": 0, "dropped": 0}
+
+    @staticmethod
+    def dedup_key(task: Task) -> Tuple:
+        """Follow-ups to the same recipient (or, without one, for the same parent) are duplicates"""
+        payload = task.payload or {}
+        recipient = payload.get("recipient") or payload.get("to")
+        if recipient:
+            return (task.task_type, "recipient", str(recipient), payload.get("template") or payload.get("subject"))
+        return (task.task_type, "parent", task.parent_task_id)
+
+    def submit(self, task: Task, response: AgentResponse) -> List[Task]:
+        """Queue the follow-ups for one completed task; returns the ones accepted"""
+        return self.submit_many([(task, response)])
+
+    def submit_many(self, completed: List[Tuple[Task, AgentResponse]]) -> List[Task]:
+        """Queue the follow-ups for several completed tasks; returns the ones accepted"""
+        accepted = []
+        for task, response in completed:
+            follow_ups = self.reflection_agent.generate_follow_up_tasks(task, response)
+            if not follow_ups:
+                continue
+            depth = self.depth(task.id) + 1
+            with self._lock:
+                self._stats["generated"] += len(follow_ups)
+                if depth > self.max_depth:
+                    self._stats["too_deep"] += len(follow_ups)
+                    continue
+                now = self.clock()
+                self._expire(now)
+                for follow_up in follow_ups:
+                    key = self.dedup_key(follow_up)
+                    if key in self._recent:
+                        self._stats["coalesced"] += 1
+                        continue
+                    if len(self._pending) >= self.max_pending:
+                        self._stats["dropped"] += 1
+                        continue
+                    self._recent[key] = now + self.dedup_window
+                    self._pending.append(follow_up)
+                    accepted.append((follow_up, depth))
+        for follow_up, depth in accepted:
+            self._link(follow_up, depth)
+            self.state.save_task(follow_up)
+        if accepted:
+            self._wakeup.set()
+        return [follow_up for follow_up, _ in accepted]
+
+    def _expire(self, now: float):
+        """Forget dedup keys whose window has passed (expiries are in insertion order)"""
+        while self._recent:
+            key, expiry = next(iter(self._recent.items()))
+            if expiry > now:
+                break
+            self._recent.popitem(last=False)
+
+    def _link(self, follow_up: Task, depth: int):
+        parent = follow_up.parent_task_id
+        root = (self.state.get("followup_links", parent) or {}).get("root", parent)
+        self.state.put("followup_links", follow_up.id, {"parent": parent, "root": root, "depth": depth})
+        self.state.append(f"followups:{parent}", {"task_id": follow_up.id, "task_type": follow_up.task_type})
+
+    def depth(self, task_id: str) -> int:
+        """How many follow-up steps separate a task from the task that started its chain"""
+        link = self.state.get("followup_links", task_id)
+        return link["depth"] if link else 0
+
+    def chain(self, task_id: str) -> Dict[str, Any]:
+        """The follow-up tree below a task: {"task_id", "task_type", "status", "follow_ups": [...]}"""
+        task = self.state.get_task(task_id)
+        return {
+            "task_id": task_id,
+            "task_type": task.task_type if task else None,
+            "status": task.status.value if task else None,
+            "follow_ups": [self.chain(child["task_id"]) for child in self.state.items(f"followups:{task_id}")],
+        }
+
+    def _take_batch(self) -> List[Task]:
+        """Pop up to batch_size runnable tasks, leaving rate-limited ones queued in order"""
+        batch, deferred = [], deque()
+        with self._lock:
+            while self._pending and len(batch) < self.batch_size:
+                task = self._pending.popleft()
+                bucket = self.buckets.get(TASK_PLATFORM_MAP.get(task.task_type))
+                if bucket is None or bucket.try_acquire():
+                    batch.append(task)
+                else:
+                    deferred.append(task)
+                    self._stats["rate_limited"] += 1
+            deferred.extend(self._pending)
+            self._pending = deferred
+        return batch
+
+    def process(self) -> List[Tuple[Task, AgentResponse]]:
+        """Run one batch of pending follow-ups and queue any follow-ups they produce"""
+        batch = self._take_batch()
+        if not batch:
+            return []
+        responses = self.supervisor.orchestrate_workflow(batch, execution_mode="parallel")
+        completed = list(zip(batch, responses))
+        for task, response in completed:
+            self.state.save_task(task)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["executed"] += sum(1 for _, response in completed if response.success)
+            self._stats["failed"] += sum(1 for _, response in completed if not response.success)
+        self.submit_many(completed)
+        return completed
+
+    def drain(self, timeout: float = 5.0) -> int:
+        """Process batches until nothing runnable is left (or timeout); returns tasks run"""
+        deadline = time.monotonic() + timeout
+        ran = 0
+        while self.pending() and time.monotonic() < deadline:
+            done = len(self.process())
+            ran += done
+            if not done:
+                time.sleep(min(self._next_ready(), max(deadline - time.monotonic(), 0)))
+        return ran
+
+    def pending(self) -> int:
+        """Follow-ups waiting to run"""
+        with self._lock:
+            return len(self._pending)
+
+    def _next_ready(self) -> float:
+        """Seconds until some pending follow-up can run"""
+        with self._lock:
+            platforms = {TASK_PLATFORM_MAP.get(task.task_type) for task in self._pending}
+            waits = [self.buckets[p].wait_time() if p in self.buckets else 0.0 for p in platforms]
+        return min(waits, default=0.0)
+
+    def start(self):
+        """Run pending follow-ups from a background thread"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped.clear()
+            self._worker = threading.Thread(target=self._run, name="follow-up-worker", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if not self.pending():
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            if not self.process():
+                self._wakeup.wait(self._next_ready())
+                self._wakeup.clear()
+
+    def shutdown(self, timeout: Optional[float] = 5.0):
+        """Stop the background thread (pending follow-ups stay queued)"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Follow-up counts, queue depth and configured rate limits"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        stats["rate_limits"] = {platform: bucket.rate for platform, bucket in self.buckets.items()}
+        return stats
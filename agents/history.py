@@ -0,0 +1,94 @@
+"""
+Bounded task history with maintained counters.
+
+TaskHistory keeps the most recent `capacity` tasks in a ring buffer stored in a
+StateBackend (so it is shared across workers with the SQLite backend). Counts
+by status and task type are updated on every record and eviction, so analytics
+read a handful of counters instead of scanning the history. Evicted tasks can
+be handed to an archive sink, e.g. JsonlArchive.
+"""
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterator, List, Optional
+
+from agents.base import Task, TaskStatus
+from agents.state import StateBackend, InMemoryStateBackend, task_to_dict, task_from_dict
+
+class JsonlArchive:
+    """Archive sink appending evicted tasks to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, task: Task):
+        line = json.dumps(task_to_dict(task))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+class TaskHistory:
+    """Ring buffer of the last `capacity` processed tasks with per-status and per-type counts"""
+
+    def __init__(self, capacity: int = 1000, archive: Optional[Callable[[Task], None]] = None,
+                 state: Optional[StateBackend] = None, name: str = "task_history"):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.archive = archive
+        self.state = state or InMemoryStateBackend()
+        self.name = name
+
+    def _adjust(self, data: Dict, amount: int):
+        """Update the window counters for one task snapshot"""
+        self.state.incr(f"{self.name}:status:{data['status']}", amount)
+        self.state.incr(f"{self.name}:type:{data['task_type']}", amount)
+
+    def record(self, task: Task):
+        """Add a processed task, evicting (and archiving) the oldest beyond capacity"""
+        data = task_to_dict(task)
+        self.state.append(self.name, data)
+        self._adjust(data, 1)
+        self.state.incr(f"{self.name}:recorded")
+        size = self.state.incr(f"{self.name}:size")
+        if size > self.capacity:
+            evicted = self.state.trim(self.name, self.capacity)
+            if evicted:
+                self.state.incr(f"{self.name}:size", -len(evicted))
+            for old in evicted:
+                self._adjust(old, -1)
+                if self.archive is not None:
+                    self.archive(task_from_dict(old))
+
+    def __len__(self) -> int:
+        """Number of tasks currently in the window"""
+        return self.state.counter(f"{self.name}:size")
+
+    def __iter__(self) -> Iterator[Task]:
+        """Tasks in the window, oldest first"""
+        return iter(self.window())
+
+    def window(self, limit: Optional[int] = None) -> List[Task]:
+        """The most recent `limit` tasks (the whole window by default), oldest first"""
+        return [task_from_dict(data) for data in self.state.items(self.name, limit or self.capacity)]
+
+    @property
+    def total_recorded(self) -> int:
+        """Tasks recorded since the history was created, including evicted ones"""
+        return self.state.counter(f"{self.name}:recorded")
+
+    def status_counts(self) -> Dict[str, int]:
+        """Tasks in the window by status value"""
+        return {key: value for key, value in self.state.counters(f"{self.name}:status:").items() if value}
+
+    def type_counts(self) -> Dict[str, int]:
+        """Tasks in the window by task type"""
+        return {key: value for key, value in self.state.counters(f"{self.name}:type:").items() if value}
+
+    def count(self, status: Optional[TaskStatus] = None) -> int:
+        """Tasks in the window with the given status (all tasks by default)"""
+        if status is None:
+            return len(self)
+        return self.state.counter(f"{self.name}:status:{status.value}")
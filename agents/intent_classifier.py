@@ -0,0 +1,237 @@
+"""
+Offline embedding-style intent classifier.
+
+Messages are turned into vectors by a local hashing vectorizer (word
+unigrams/bigrams plus character n-grams, no network models) and scored against
+a precomputed matrix of intent exemplars for all personas with a single NumPy
+sparse-dense product (only the matrix rows of features present in the batch are
+gathered).
+Scores are the best cosine similarity per intent; an intent fires when its
+score reaches that intent's threshold.
+"""
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+IntentKey = Tuple[str, str]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Function words carry no intent signal and only add noise to the hashed vectors
+STOP_WORDS = frozenset("""
+a an and are as at be been but by can could do does for from have i i'm in is it its me my of on or our
+please so that the their them they this to us was we what when where which who will with would you your
+""".split())
+
+class HashingVectorizer:
+    """Stateless text -> L2-normalized float32 vector via the hashing trick"""
+
+    def __init__(self, n_features: int = 1 << 14, char_ngram: int = 4, max_cache: int = 100000):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the vector intent classifier (pip install numpy)")
+        self.n_features = n_features
+        self.char_ngram = char_ngram
+        self.max_cache = max_cache
+        self._bucket_cache: Dict[str, Tuple[int, float]] = {}
+
+    def features(self, text: str) -> List[str]:
+        """Word unigrams, word bigrams and character n-grams of each word"""
+        words = [word for word in _TOKEN.findall(text.lower()) if word not in STOP_WORDS]
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        n = self.char_ngram
+        for word in words:
+            padded = f"<{word}>"
+            if len(padded) > n:
+                features += ["#" + padded[i:i + n] for i in range(len(padded) - n + 1)]
+        return features
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        """Hash a feature to (column, sign)"""
+        cached = self._bucket_cache.get(feature)
+        if cached is None:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            cached = (digest % self.n_features, 1.0 if digest & 0x80000000 else -1.0)
+            if len(self._bucket_cache) >= self.max_cache:
+                self._bucket_cache.clear()
+            self._bucket_cache[feature] = cached
+        return cached
+
+    def transform_sparse(self, texts: List[str]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Vectorize a batch of texts into sparse (rows, cols, values) triplets.
+        Each (row, col) appears once; values are sublinear-TF weights, L2-normalized per row.
+        """
+        rows: List[int] = []
+        cols: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                column, sign = self._bucket(feature)
+                rows.append(row)
+                cols.append(column)
+                signs.append(sign)
+
+        if not rows:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+
+        keys = np.asarray(rows, dtype=np.int64) * self.n_features + np.asarray(cols, dtype=np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.asarray(signs)).astype(np.float32)
+        values = np.copysign(np.log1p(np.abs(counts)), counts)
+        unique_rows = (unique_keys // self.n_features).astype(np.intp)
+        norms = np.sqrt(np.bincount(unique_rows, weights=values * values, minlength=len(texts))).astype(np.float32)
+        norms[norms == 0] = 1.0
+        values /= norms[unique_rows]
+        return unique_rows, (unique_keys % self.n_features).astype(np.intp), values
+
+    def transform(self, texts: List[str]) -> "np.ndarray":
+        """Vectorize a batch of texts into a dense (n_texts, n_features) matrix"""
+        rows, cols, values = self.transform_sparse(texts)
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        matrix[rows, cols] = values
+        return matrix
+
+    def similarities(self, texts: List[str], columns: "np.ndarray") -> "np.ndarray":
+        """
+        Cosine similarity of each text against precomputed vectors.
+        columns is the (n_features, n_vectors) transpose of the reference matrix; only the
+        rows for features present in the texts are gathered, so cost scales with text length.
+        """
+        rows, cols, values = self.transform_sparse(texts)
+        scores = np.zeros((len(texts), columns.shape[1]), dtype=np.float32)
+        if len(rows):
+            # Triplets are sorted by row, so each text's contributions form one contiguous segment
+            segment_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            scores[rows[segment_starts]] = np.add.reduceat(columns[cols] * values[:, None], segment_starts, axis=0)
+        return scores
+
+class IntentClassifier:
+    """Scores messages against intent exemplars of all personas at once"""
+
+    def __init__(self, vectorizer: Optional[HashingVectorizer] = None, default_threshold: float = 0.25):
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.default_threshold = default_threshold
+        self._exemplars: Dict[IntentKey, List[str]] = {}
+        self._thresholds: Dict[IntentKey, float] = {}
+        self._scopes: Set[str] = set()
+        self._fitted = None
+        self._lock = threading.Lock()
+
+    def add_exemplars(self, scope: str, intent: str, exemplars: List[str], threshold: Optional[float] = None):
+        """Register example phrasings for an intent (the matrix is rebuilt on next use)"""
+        with self._lock:
+            self._exemplars.setdefault((scope, intent), []).extend(exemplars)
+            self._scopes.add(scope)
+            if threshold is not None:
+                self._thresholds[(scope, intent)] = threshold
+            self._fitted = None
+
+    def register_scope(self, scope: str, intents: Dict[str, List[str]], thresholds: Optional[Dict[str, float]] = None):
+        """Register the exemplars (and optional thresholds) of every intent of one scope"""
+        thresholds = thresholds or {}
+        for intent, exemplars in intents.items():
+            self.add_exemplars(scope, intent, exemplars, thresholds.get(intent))
+
+    def unregister_scope(self, scope: str):
+        """Drop the exemplars and thresholds of every intent of one scope"""
+        with self._lock:
+            for key in [key for key in self._exemplars if key[0] == scope]:
+                del self._exemplars[key]
+            for key in [key for key in self._thresholds if key[0] == scope]:
+                del self._thresholds[key]
+            self._scopes.discard(scope)
+            self._fitted = None
+
+    def has_scope(self, scope: str) -> bool:
+        """Check whether exemplars are registered under scope"""
+        return scope in self._scopes
+
+    def set_threshold(self, scope: str, intent: str, threshold: float):
+        """Configure the score an intent must reach to fire"""
+        with self._lock:
+            self._thresholds[(scope, intent)] = threshold
+            self._fitted = None
+
+    def fit(self):
+        """Precompute the exemplar matrix, grouped so each intent's rows are contiguous"""
+        with self._lock:
+            if self._fitted is not None:
+                return self._fitted
+
+            labels = sorted(self._exemplars)
+            texts: List[str] = []
+            starts: List[int] = []
+            for key in labels:
+                starts.append(len(texts))
+                texts.extend(self._exemplars[key])
+
+            matrix = self.vectorizer.transform(texts) if texts else np.zeros((0, self.vectorizer.n_features), dtype=np.float32)
+            thresholds = np.array([self._thresholds.get(key, self.default_threshold) for key in labels], dtype=np.float32)
+            scope_slices: Dict[str, Tuple[int, int]] = {}
+            for position, (scope, _) in enumerate(labels):
+                first, _ = scope_slices.get(scope, (position, position))
+                scope_slices[scope] = (first, position + 1)
+
+            columns = np.ascontiguousarray(matrix.T)
+            self._fitted = (labels, columns, np.asarray(starts, dtype=np.intp), thresholds, scope_slices)
+            return self._fitted
+
+    def score_batch(self, messages: List[str]) -> Tuple[List[IntentKey], "np.ndarray"]:
+        """Return (intent labels, (n_messages, n_intents) matrix of best exemplar cosine scores)"""
+        labels, columns, starts, _, _ = self._fitted or self.fit()
+        if not labels:
+            return labels, np.zeros((len(messages), 0), dtype=np.float32)
+        similarities = self.vectorizer.similarities(messages, columns)
+        return labels, np.maximum.reduceat(similarities, starts, axis=1)
+
+    def classify_batch(self, messages: List[str], scope: Optional[str] = None) -> List[Set[str]]:
+        """
+        Return the fired intents for every message.
+        With a scope only that scope's intent names are returned, otherwise "scope.intent" keys.
+        """
+        labels, columns, starts, thresholds, scope_slices = self._fitted or self.fit()
+        if scope is not None and scope not in scope_slices:
+            return [set() for _ in messages]
+
+        first, last = scope_slices[scope] if scope is not None else (0, len(labels))
+        if first == last:
+            return [set() for _ in messages]
+        row_start = starts[first]
+        row_end = starts[last] if last < len(labels) else columns.shape[1]
+
+        similarities = self.vectorizer.similarities(messages, columns[:, row_start:row_end])
+        scores = np.maximum.reduceat(similarities, starts[first:last] - row_start, axis=1)
+        fired = scores >= thresholds[first:last]
+
+        results = []
+        for row in fired:
+            if scope is not None:
+                results.append({labels[first + i][1] for i in np.flatnonzero(row)})
+            else:
+                results.append({".".join(labels[i]) for i in np.flatnonzero(row)})
+        return results
+
+    def classify(self, message: str, scope: Optional[str] = None) -> Set[str]:
+        """Return the fired intents for a single message"""
+        return self.classify_batch([message], scope=scope)[0]
+
+_shared_classifier: Optional[IntentClassifier] = None
+_shared_lock = threading.Lock()
+
+def get_intent_classifier() -> IntentClassifier:
+    """Classifier shared by all persona agents (created on first use)"""
+    global _shared_classifier
+    with _shared_lock:
+        if _shared_classifier is None:
+            _shared_classifier = IntentClassifier()
+        return _shared_classifier
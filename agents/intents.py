@@ -0,0 +1,202 @@
+"""
+Shared single-pass intent matcher for persona agents.
+
+Every persona registers its intent groups (lists of regex patterns) under its
+own scope. The engine splits the patterns into their top-level alternatives,
+deduplicates them and compiles all of them into one regex shaped like a trie
+over their literal prefixes, so the scan tries a single branch per character
+instead of every alternative. One pass over the message reports the first
+alternative matching at each position; the few alternatives that could also
+match at that position (their literal prefixes overlap) are verified with an
+anchored match. The result equals running re.search(pattern, message,
+re.IGNORECASE) for every pattern separately.
+
+match_scope uses a matcher compiled from that scope's groups only, so one
+persona's lookups do not grow with the number of registered personas and
+re-registering a persona only recompiles its own matcher.
+"""
+import re
+import threading
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+IntentKey = Tuple[str, str]
+
+def split_alternatives(pattern: str) -> List[str]:
+    """Split a regex on its top-level '|' (ignoring groups, classes and escapes)"""
+    alternatives = []
+    depth = 0
+    in_class = False
+    start = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            alternatives.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(pattern[start:])
+    return [alt for alt in alternatives if alt]
+
+_METACHARACTERS = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*+?{")
+
+def literal_prefix(alternative: str) -> Tuple[str, str]:
+    """Split an alternative into its leading literal text and the remaining regex"""
+    i = 0
+    while i < len(alternative) and alternative[i] not in _METACHARACTERS:
+        i += 1
+    # A quantifier applies to the last literal character, so it is not part of the prefix
+    if i < len(alternative) and alternative[i] in _QUANTIFIERS and i > 0:
+        i -= 1
+    return alternative[:i], alternative[i:]
+
+class _TrieNode:
+    __slots__ = ("children", "leaves")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.leaves: List[Tuple[int, str]] = []
+
+def _emit(node: _TrieNode) -> str:
+    """Render a trie node as a regex; leaves end in an empty marker group naming the alternative"""
+    branches = [f"(?:{remainder})(?P<i{index}>)" for index, remainder in node.leaves]
+    branches += [re.escape(char) + _emit(child) for char, child in node.children.items()]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+class _CompiledIntents:
+    """Immutable compiled state of an IntentEngine"""
+
+    def __init__(self, owners: Dict[str, Set[IntentKey]], flags: int):
+        alternatives = list(owners)
+        prefixes = []
+        root = _TrieNode()
+        for index, alternative in enumerate(alternatives):
+            prefix, remainder = literal_prefix(alternative)
+            prefix = prefix.lower() if flags & re.IGNORECASE else prefix
+            prefixes.append(prefix)
+            node = root
+            for char in prefix:
+                node = node.children.setdefault(char, _TrieNode())
+            node.leaves.append((index, remainder))
+
+        self.owners = [frozenset(owners[alt]) for alt in alternatives]
+        self.anchored = [re.compile(alt, flags) for alt in alternatives]
+        # Alternatives that may match at the same position as alternative i
+        self.overlapping = [
+            [j for j, other in enumerate(prefixes) if j != i and (other.startswith(prefix) or prefix.startswith(other))]
+            for i, prefix in enumerate(prefixes)
+        ]
+        self.marker_index = {f"i{index}": index for index in range(len(alternatives))}
+        self.all_keys = frozenset(key for keys in self.owners for key in keys)
+        self.regex = re.compile(f"(?={_emit(root)})" if alternatives else r"(?!)", flags)
+
+class IntentEngine:
+    """Compiles the intent patterns of all registered scopes into one matcher"""
+
+    def __init__(self, flags: int = re.IGNORECASE):
+        self.flags = flags
+        self._groups: Dict[IntentKey, List[str]] = {}
+        self._scopes: Set[str] = set()
+        # Rebuilt lazily after registrations
+        self._compiled: Optional[_CompiledIntents] = None
+        self._scope_compiled: Dict[str, _CompiledIntents] = {}
+        self._lock = threading.Lock()
+
+    def register(self, scope: str, name: str, patterns: List[str]):
+        """Register (or replace) an intent group; the matcher is rebuilt on next use"""
+        with self._lock:
+            self._groups[(scope, name)] = list(patterns)
+            self._scopes.add(scope)
+            self._compiled = None
+            self._scope_compiled.pop(scope, None)
+
+    def register_scope(self, scope: str, groups: Dict[str, List[str]]):
+        """Register every intent group of one scope"""
+        for name, patterns in groups.items():
+            self.register(scope, name, patterns)
+
+    def unregister_scope(self, scope: str):
+        """Drop every intent group of one scope"""
+        with self._lock:
+            for key in [key for key in self._groups if key[0] == scope]:
+                del self._groups[key]
+            self._scopes.discard(scope)
+            self._compiled = None
+            self._scope_compiled.pop(scope, None)
+
+    def has_scope(self, scope: str) -> bool:
+        """Check whether any group is registered under scope"""
+        return scope in self._scopes
+
+    def _build(self, groups: Dict[IntentKey, List[str]]) -> _CompiledIntents:
+        """Compile a set of groups into one matcher"""
+        owners: Dict[str, Set[IntentKey]] = {}
+        for key, patterns in groups.items():
+            for pattern in patterns:
+                for alternative in split_alternatives(pattern):
+                    owners.setdefault(alternative, set()).add(key)
+        return _CompiledIntents(owners, self.flags)
+
+    def compile(self) -> _CompiledIntents:
+        """Build the combined matcher of all scopes (called lazily by match)"""
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = self._build(self._groups)
+            return self._compiled
+
+    def compile_scope(self, scope: str) -> _CompiledIntents:
+        """Build the matcher of one scope (called lazily by match_scope)"""
+        compiled = self._scope_compiled.get(scope)
+        if compiled is None:
+            with self._lock:
+                compiled = self._scope_compiled.get(scope)
+                if compiled is None:
+                    compiled = self._build({key: patterns for key, patterns in self._groups.items() if key[0] == scope})
+                    self._scope_compiled[scope] = compiled
+        return compiled
+
+    @staticmethod
+    def _scan(compiled: _CompiledIntents, message: str) -> Set[IntentKey]:
+        """Run one compiled matcher over message"""
+        owners = compiled.owners
+        matched: Set[IntentKey] = set()
+        found: Set[int] = set()
+
+        for match in compiled.regex.finditer(message):
+            index = compiled.marker_index[match.lastgroup]
+            if index not in found:
+                found.add(index)
+                matched |= owners[index]
+            position = match.start()
+            for other in compiled.overlapping[index]:
+                if other not in found and not owners[other] <= matched and compiled.anchored[other].match(message, position):
+                    found.add(other)
+                    matched |= owners[other]
+            if len(matched) == len(compiled.all_keys):
+                break
+        return matched
+
+    def match(self, message: str) -> Set[IntentKey]:
+        """Return every (scope, group) whose patterns match somewhere in message"""
+        return self._scan(self._compiled or self.compile(), message)
+
+    def match_scope(self, scope: str, message: str) -> Set[str]:
+        """Return the names of the groups of one scope that match message"""
+        return {name for _, name in self._scan(self.compile_scope(scope), message)}
+
+# Engine shared by all persona agents
+intent_engine = IntentEngine()
@@ -0,0 +1,112 @@
+"""
+Latency tracking and deadline-bounded calls.
+
+LatencyTracker keeps a rolling window of observed latencies for percentile
+queries; call_with_deadline runs a blocking call in the background, abandons it
+once its latency budget is spent and can hedge with a duplicate request.
+"""
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agents.singleflight import SingleFlight
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not finish within its latency budget"""
+
+class LatencyTracker:
+    """Rolling window of latency samples (seconds) with percentile queries"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Add a latency sample"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-100), or None until min_samples have been seen"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return _percentile(ordered, q)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Return sample count and p50/p95/p99 over the current window"""
+        with self._lock:
+            ordered = sorted(self._samples)
+        return {
+            "samples": len(ordered),
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99)
+        }
+
+def _percentile(ordered, q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def _start(target: Callable[[bool], None], hedged: bool):
+    """Start an attempt on a daemon thread inside a copy of the caller's context"""
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target, hedged), daemon=True).start()
+
+def call_with_deadline(fn: Callable[[], Any], budget: float, hedge_after: Optional[float] = None) -> Tuple[Any, int]:
+    """
+    Run fn in a background thread and wait at most budget seconds.
+
+    When hedge_after is given and fn has not finished by then, a second copy is
+    started (bypassing request coalescing) and the first successful result wins.
+    Returns (result, attempts). Raises DeadlineExceeded when the budget is spent;
+    the abandoned threads finish on their own. If every started attempt fails,
+    the last error is re-raised.
+    """
+    results: "queue.Queue[Tuple[bool, Any]]" = queue.Queue()
+
+    def attempt(hedged: bool):
+        try:
+            if hedged:
+                with SingleFlight.bypass():
+                    value = fn()
+            else:
+                value = fn()
+            results.put((True, value))
+        except BaseException as e:
+            results.put((False, e))
+
+    deadline = time.monotonic() + budget
+    _start(attempt, False)
+    attempts = 1
+    pending = 1
+    hedge_at = time.monotonic() + hedge_after if hedge_after is not None and hedge_after < budget else None
+
+    while True:
+        now = time.monotonic()
+        wake_at = hedge_at if hedge_at is not None else deadline
+        if now >= deadline:
+            raise DeadlineExceeded(f"call exceeded latency budget of {budget:.2f}s")
+        try:
+            ok, value = results.get(timeout=max(0.0, wake_at - now))
+        except queue.Empty:
+            if hedge_at is not None and time.monotonic() >= hedge_at:
+                _start(attempt, True)
+                attempts += 1
+                pending += 1
+                hedge_at = None
+            continue
+
+        pending -= 1
+        if ok:
+            return value, attempts
+        if pending == 0:
+            raise value
@@ -0,0 +1,74 @@
+"""
+Lazy initialization of heavy SDKs, model clients and devices.
+
+Importing the agent system must stay cheap: test runs, worker forks and
+serverless cold starts pay for every module-level import. Expensive objects
+(langchain/langgraph, the Gemini chat model, the Groq client, OpenCV) are
+declared with @lazy and built on first use. preload() builds every declared
+resource up front, e.g. before a server starts accepting requests.
+"""
+import threading
+import time
+from typing import Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Lazy(Generic[T]):
+    """Thread-safe value built by factory on first call"""
+
+    def __init__(self, factory: Callable[[], T], name: Optional[str] = None):
+        self.factory = factory
+        self.name = name or factory.__name__
+        self.__doc__ = factory.__doc__
+        self._value: Optional[T] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self.factory()
+                    self._loaded = True
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def reset(self):
+        """Drop the value so the next call builds it again"""
+        with self._lock:
+            self._value = None
+            self._loaded = False
+
+# Every resource declared with @lazy, by name
+_resources: Dict[str, Lazy] = {}
+
+def lazy(name: str) -> Callable[[Callable[[], T]], Lazy[T]]:
+    """Declare a zero-argument factory as a named lazily built resource"""
+    def decorator(factory: Callable[[], T]) -> Lazy[T]:
+        resource = Lazy(factory, name)
+        _resources[name] = resource
+        return resource
+    return decorator
+
+def preload(names: Optional[Iterable[str]] = None) -> Dict[str, object]:
+    """
+    Build the declared resources now (all of them by default).
+    Returns seconds taken per resource, or the error message for resources that failed
+    (e.g. a missing API key), so a warm-up never prevents the server from starting.
+    """
+    report: Dict[str, object] = {}
+    for name in (list(names) if names is not None else list(_resources)):
+        started = time.perf_counter()
+        try:
+            _resources[name]()
+            report[name] = round(time.perf_counter() - started, 4)
+        except Exception as e:
+            report[name] = f"error: {e}"
+    return report
+
+def loaded_resources() -> Dict[str, bool]:
+    """Which declared resources have been built"""
+    return {name: resource.loaded for name, resource in _resources.items()}
@@ -0,0 +1,264 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are sharded per thread: each thread only ever
+writes its own dict, so recording takes no lock and never contends. A scrape
+sums the shards (shards of finished threads are folded into a retired total).
+Callback metrics are evaluated at scrape time, for values that already live
+elsewhere (queue depths, cache stats, task counts by status).
+
+    requests = metrics.counter("app_requests_total", "Requests handled", ["path"])
+    requests.inc("/tasks")
+    latency = metrics.histogram("app_request_duration_seconds", "Request latency", ["path"])
+    latency.observe(0.012, "/tasks")
+    metrics.render()   # text/plain; version=0.0.4
+
+Metrics are per process; with several uvicorn workers scrape each one.
+"""
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+class _Shards:
+    """One dict per writer thread; readers merge them"""
+
+    # Registering a shard folds finished threads' shards once this many are held, so
+    # thread-per-call code does not grow the list between scrapes
+    FOLD_THRESHOLD = 64
+
+    def __init__(self, merge: Callable):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, Dict]] = []
+        self._retired: Dict = {}
+        self._fold_at = self.FOLD_THRESHOLD
+
+    def get(self) -> Dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                if len(self._shards) >= self._fold_at:
+                    self._fold_dead()
+                    # Doubling keeps folding amortized when many threads really are alive
+                    self._fold_at = max(self.FOLD_THRESHOLD, 2 * len(self._shards))
+            self._local.shard = shard
+            return shard
+
+    def _fold_dead(self):
+        """Merge the shards of finished threads into the retired total (lock held)"""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = live
+
+    def collect(self) -> Dict:
+        with self._lock:
+            self._fold_dead()
+            total: Dict = {}
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, shard)
+        return total
+
+def _merge_counts(into: Dict, shard: Dict):
+    for key, value in list(shard.items()):
+        into[key] = into.get(key, 0) + value
+
+def _merge_buckets(into: Dict, shard: Dict):
+    for key, values in list(shard.items()):
+        merged = into.get(key)
+        if merged is None:
+            into[key] = list(values)
+        else:
+            for i, value in enumerate(values):
+                merged[i] += value
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards(_merge_counts)
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        shard = self._shards.get()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._shards.collect().get(labelvalues, 0)
+
+    def samples(self) -> List[Tuple[str, LabelValues, Tuple, float]]:
+        return [(self.name, labels, (), value) for labels, value in sorted(self._shards.collect().items())]
+
+class Gauge(Counter):
+    """Sharded value that can go up and down (e.g. work in flight)"""
+
+    type = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1):
+        self.inc(*labelvalues, amount=-amount)
+
+class Histogram:
+    """Fixed-bucket distribution per label combination"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards(_merge_buckets)
+
+    def observe(self, value: float, *labelvalues: str):
+        shard = self._shards.get()
+        # One count per bucket (last is +Inf), followed by the running sum
+        cells = shard.get(labelvalues)
+        if cells is None:
+            cells = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        cells[bisect.bisect_left(self.buckets, value)] += 1
+        cells[-1] += value
+
+    def snapshot(self, *labelvalues: str) -> Dict[str, float]:
+        """Count, sum and cumulative bucket counts for one label combination"""
+        cells = self._shards.collect().get(labelvalues) or [0] * (len(self.buckets) + 1) + [0.0]
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (math.inf,), cells[:-1]):
+            running += count
+            cumulative[bound] = running
+        return {"count": running, "sum": cells[-1], "buckets": cumulative}
+
+    def samples(self) -> List[Tuple[str, LabelValues, Tuple, float]]:
+        samples = []
+        for labels, cells in sorted(self._shards.collect().items()):
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), cells[:-1]):
+                running += count
+                samples.append((f"{self.name}_bucket", labels, (("le", _format_bound(bound)),), running))
+            samples.append((f"{self.name}_sum", labels, (), cells[-1]))
+            samples.append((f"{self.name}_count", labels, (), running))
+        return samples
+
+class CallbackMetric:
+    """Gauge (or externally kept counter) whose values are read at scrape time"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[LabelValues, float]], type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.type = type
+
+    def samples(self) -> List[Tuple[str, LabelValues, Tuple, float]]:
+        try:
+            values = self.callback()
+        except Exception:
+            # A failing source must not break the whole scrape
+            return []
+        return [(self.name, labels, (), value) for labels, value in sorted(values.items())]
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class MetricsRegistry:
+    """Named metrics rendered together; registering an existing name returns the same metric"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, factory: Callable[[], object]):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(name, lambda: Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(name, lambda: Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[LabelValues, float]], type: str = "gauge") -> CallbackMetric:
+        """Register (or replace) a metric read from callback() -> {label values: value}"""
+        metric = CallbackMetric(name, documentation, labelnames, callback, type)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample_name, labels, extra, value in metric.samples():
+                pairs = list(zip(metric.labelnames, labels)) + list(extra)
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in pairs)
+                lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+# Recorded by the agents themselves
+agent_task_duration = metrics.histogram(
+    "agent_task_duration_seconds", "Time spent in an agent's execute_task", ["agent", "task_type"])
+agent_tasks = metrics.counter(
+    "agent_tasks_total", "Tasks executed per agent by outcome (success, failure, error)", ["agent", "task_type", "outcome"])
+tasks_in_flight = metrics.gauge(
+    "tasks_in_flight", "Tasks currently being routed by the supervisor", ["task_type"])
+llm_request_duration = metrics.histogram(
+    "llm_request_duration_seconds", "LLM call latency per personality (cache hits excluded)", ["personality"])
+llm_turn_duration = metrics.histogram(
+    "llm_turn_duration_seconds", "Agent turn latency by path (react or fast) and whether the webcam frame was used",
+    ["path", "vision"])
+llm_backend_requests = metrics.counter(
+    "llm_backend_requests_total", "Requests per LLM router and backend by outcome (success, error, lost to a hedge)",
+    ["router", "backend", "outcome"])
+llm_backend_duration = metrics.histogram(
+    "llm_backend_duration_seconds", "Latency of each request to an LLM backend, including hedges that lost",
+    ["router", "backend"])
+llm_backend_hedges = metrics.counter(
+    "llm_backend_hedges_total", "Duplicate requests sent to the next backend after the hedge delay", ["router"])
+session_prewarm_duration = metrics.histogram(
+    "session_prewarm_duration_seconds", "Time per session prewarm step (clients, connections, agent, camera, vision)",
+    ["step", "outcome"])
@@ -0,0 +1,367 @@
+"""
+Local stand-in for the GitHub, Jira, Gmail and Calendar APIs.
+
+Implements the endpoints the platform agents call (plus list endpoints with each
+API's pagination style) in memory, with configurable latency, injected
+failures and rate limiting, so the agents can be load-tested without network
+access. The four APIs use disjoint paths, so one server serves them all:
+
+    python -m agents.mock_platforms --port 8900 --latency uniform:0.01,0.05 --error-rate 0.02
+    export GITHUB_API_URL=http://127.0.0.1:8900 JIRA_BASE_URL=http://127.0.0.1:8900 \\
+           GMAIL_API_URL=http://127.0.0.1:8900 CALENDAR_API_URL=http://127.0.0.1:8900
+
+Latency specs (also used by benchmarks/fake_llm.py):
+
+    fixed:0.05              always 50 ms
+    uniform:0.02,0.08       uniform between 20 and 80 ms
+    normal:0.05,0.01        mean 50 ms, stddev 10 ms (clipped at 0)
+    lognormal:-3.0,0.5      exp(N(-3.0, 0.5)) seconds, a long-tailed distribution
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+def parse_latency(spec: str, seed: int = 0) -> Callable[[], float]:
+    """Build a sampler returning seconds from a "kind:params" spec"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    samplers = {
+        "fixed": lambda: values[0],
+        "uniform": lambda: rng.uniform(values[0], values[1]),
+        "normal": lambda: max(rng.gauss(values[0], values[1]), 0.0),
+        "lognormal": lambda: rng.lognormvariate(values[0], values[1]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution: {kind} (expected {', '.join(samplers)})")
+    sampler = samplers[kind]
+
+    def sample() -> float:
+        with lock:
+            return sampler()
+    return sample
+
+class _RateWindow:
+    """Fixed-window request counter for one platform"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.reset_at = time.time() + window
+        self.used = 0
+
+    def hit(self) -> Tuple[bool, int, int]:
+        """Count a request; returns (allowed, remaining, reset epoch seconds)"""
+        now = time.time()
+        if now >= self.reset_at:
+            self.reset_at = now + self.window
+            self.used = 0
+        allowed = self.used < self.limit
+        if allowed:
+            self.used += 1
+        return allowed, self.limit - self.used, int(self.reset_at)
+
+class _Route:
+    def __init__(self, platform: str, method: str, pattern: str, handler: str):
+        self.platform = platform
+        self.method = method
+        self.pattern = re.compile(f"^{pattern}$")
+        self.handler = handler
+
+ROUTES = [
+    _Route("github", "GET", r"/?", "github_root"),
+    _Route("github", "GET", r"/user", "github_user"),
+    _Route("github", "GET", r"/user/repos", "github_list_repos"),
+    _Route("github", "POST", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/issues", "github_create_issue"),
+    _Route("github", "GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/issues", "github_list_issues"),
+    _Route("github", "PATCH", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/issues/(?P<number>\d+)", "github_update_issue"),
+    _Route("jira", "GET", r"/rest/api/2/myself", "jira_myself"),
+    _Route("jira", "POST", r"/rest/api/2/issue", "jira_create_issue"),
+    _Route("jira", "PUT", r"/rest/api/2/issue/(?P<key>[^/]+)", "jira_update_issue"),
+    _Route("jira", "GET", r"/rest/api/2/search", "jira_search"),
+    _Route("gmail", "GET", r"/gmail/v1/users/me/profile", "gmail_profile"),
+    _Route("gmail", "POST", r"/gmail/v1/users/me/messages/send", "gmail_send"),
+    _Route("gmail", "GET", r"/gmail/v1/users/me/messages", "gmail_list"),
+    _Route("calendar", "GET", r"/calendar/v3/users/me/calendarList", "calendar_list_calendars"),
+    _Route("calendar", "POST", r"/calendar/v3/calendars/(?P<calendar>[^/]+)/events", "calendar_create_event"),
+    _Route("calendar", "GET", r"/calendar/v3/calendars/(?P<calendar>[^/]+)/events", "calendar_list_events"),
+]
+
+class MockPlatformServer:
+    """In-memory GitHub/Jira/Gmail/Calendar API served over HTTP from a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 error_rate: float = 0.0, rate_limit: Optional[int] = None, rate_window: float = 60.0,
+                 page_size: int = 30, seed: int = 0):
+        self.latency = parse_latency(latency, seed)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.page_size = page_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows: Dict[str, _RateWindow] = {}
+        self._data: Dict[str, List[Dict[str, Any]]] = {"issues": [], "tickets": [], "messages": [], "events": []}
+        self._stats = {"requests": 0, "injected_errors": 0, "rate_limited": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use for every platform"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing the platform agents at this server"""
+        return {name: self.url for name in ("GITHUB_API_URL", "JIRA_BASE_URL", "GMAIL_API_URL", "CALENDAR_API_URL")}
+
+    def start(self) -> "MockPlatformServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-platforms", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockPlatformServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counts plus how many records each API holds"""
+        with self._lock:
+            return {**self._stats, **{name: len(records) for name, records in self._data.items()}}
+
+    # Request handling
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _dispatch(self):
+                server._handle(self)
+
+            do_GET = do_POST = do_PUT = do_PATCH = _dispatch
+
+        return Handler
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        parts = urlsplit(request.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        length = int(request.headers.get("Content-Length") or 0)
+        body = json.loads(request.rfile.read(length) or b"{}") if length else {}
+
+        route, params = None, {}
+        for candidate in ROUTES:
+            match = candidate.pattern.match(parts.path)
+            if match and candidate.method == request.command:
+                route, params = candidate, match.groupdict()
+                break
+        if route is None:
+            return self._send(request, 404, {"message": "Not Found"})
+
+        time.sleep(self.latency())
+        headers = {}
+        with self._lock:
+            self._stats["requests"] += 1
+            if self.rate_limit is not None:
+                window = self._windows.setdefault(route.platform, _RateWindow(self.rate_limit, self.rate_window))
+                allowed, remaining, reset = window.hit()
+                headers = {"X-RateLimit-Limit": str(self.rate_limit), "X-RateLimit-Remaining": str(max(remaining, 0)),
+                           "X-RateLimit-Reset": str(reset)}
+                if not allowed:
+                    self._stats["rate_limited"] += 1
+                    headers["Retry-After"] = str(max(reset - int(time.time()), 1))
+                    return self._send(request, 429, {"message": "API rate limit exceeded"}, headers)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self._stats["injected_errors"] += 1
+                return self._send(request, 503, {"message": "Injected failure"}, headers)
+
+        status, payload, extra = getattr(self, f"_{route.handler}")(params, query, body, request)
+        self._send(request, status, payload, {**headers, **extra})
+
+    @staticmethod
+    def _send(request: BaseHTTPRequestHandler, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode() if status != 204 else b""
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _add(self, kind: str, record: Dict[str, Any]) -> int:
+        with self._lock:
+            self._data[kind].append(record)
+            return len(self._data[kind])
+
+    def _page(self, kind: str, start: int, size: int, keep: Callable[[Dict[str, Any]], bool] = lambda r: True):
+        with self._lock:
+            records = [record for record in self._data[kind] if keep(record)]
+        return records[start:start + size], len(records)
+
+    def _token_page(self, kind: str, query: Dict[str, str], key: str, keep=lambda r: True):
+        """Google-style pagination with maxResults and opaque pageToken/nextPageToken"""
+        start = int(query.get("pageToken") or 0)
+        size = int(query.get("maxResults") or self.page_size)
+        items, total = self._page(kind, start, size, keep)
+        result = {key: items, "resultSizeEstimate": total}
+        if start + size < total:
+            result["nextPageToken"] = str(start + size)
+        return result
+
+    # GitHub
+
+    def _github_root(self, params, query, body, request):
+        return 200, {"current_user_url": f"{self.url}/user"}, {}
+
+    def _github_user(self, params, query, body, request):
+        return 200, {"login": "mock-user", "id": 1}, {}
+
+    def _github_page(self, kind: str, query, request, keep=lambda r: True):
+        """GitHub-style pagination with page/per_page and a Link header"""
+        page = max(int(query.get("page") or 1), 1)
+        per_page = int(query.get("per_page") or self.page_size)
+        items, total = self._page(kind, (page - 1) * per_page, per_page, keep)
+        path = urlsplit(request.path).path
+        links = []
+        if page * per_page < total:
+            links.append(f'<{self.url}{path}?{urlencode({**query, "page": page + 1})}>; rel="next"')
+            last = (total + per_page - 1) // per_page
+            links.append(f'<{self.url}{path}?{urlencode({**query, "page": last})}>; rel="last"')
+        return 200, items, {"Link": ", ".join(links)} if links else {}
+
+    def _github_list_repos(self, params, query, body, request):
+        with self._lock:
+            repos = sorted({issue["repository"] for issue in self._data["issues"]})
+        return 200, [{"full_name": name, "name": name.split("/")[-1]} for name in repos], {}
+
+    def _github_create_issue(self, params, query, body, request):
+        repository = f"{params['owner']}/{params['repo']}"
+        with self._lock:
+            number = sum(1 for issue in self._data["issues"] if issue["repository"] == repository) + 1
+            issue = {"number": number, "title": body.get("title", ""), "body": body.get("body", ""),
+                     "state": "open", "repository": repository,
+                     "html_url": f"https://github.com/{repository}/issues/{number}"}
+            self._data["issues"].append(issue)
+        return 201, issue, {}
+
+    def _github_list_issues(self, params, query, body, request):
+        repository = f"{params['owner']}/{params['repo']}"
+        return self._github_page("issues", query, request, lambda issue: issue["repository"] == repository)
+
+    def _github_update_issue(self, params, query, body, request):
+        repository, number = f"{params['owner']}/{params['repo']}", int(params["number"])
+        with self._lock:
+            for issue in self._data["issues"]:
+                if issue["repository"] == repository and issue["number"] == number:
+                    issue.update({key: value for key, value in body.items() if key in ("title", "body", "state")})
+                    return 200, issue, {}
+        return 404, {"message": "Not Found"}, {}
+
+    # Jira
+
+    def _jira_myself(self, params, query, body, request):
+        return 200, {"accountId": "mock-account", "displayName": "Mock User"}, {}
+
+    def _jira_create_issue(self, params, query, body, request):
+        fields = body.get("fields", {})
+        project = fields.get("project", {}).get("key", "PROJ")
+        with self._lock:
+            number = len(self._data["tickets"]) + 1
+            key = f"{project}-{number}"
+            self._data["tickets"].append({"id": str(10000 + number), "key": key, "fields": fields})
+        return 201, {"id": str(10000 + number), "key": key, "self": f"{self.url}/rest/api/2/issue/{key}"}, {}
+
+    def _jira_update_issue(self, params, query, body, request):
+        with self._lock:
+            for ticket in self._data["tickets"]:
+                if ticket["key"] == params["key"]:
+                    ticket["fields"].update(body.get("fields", {}))
+                    return 204, None, {}
+        return 404, {"errorMessages": ["Issue does not exist"]}, {}
+
+    def _jira_search(self, params, query, body, request):
+        start = int(query.get("startAt") or 0)
+        size = int(query.get("maxResults") or self.page_size)
+        issues, total = self._page("tickets", start, size)
+        return 200, {"startAt": start, "maxResults": size, "total": total, "issues": issues}, {}
+
+    # Gmail
+
+    def _gmail_profile(self, params, query, body, request):
+        return 200, {"emailAddress": "mock@company.com", "messagesTotal": len(self._data["messages"])}, {}
+
+    def _gmail_send(self, params, query, body, request):
+        with self._lock:
+            number = len(self._data["messages"]) + 1
+            message = {"id": f"msg{number:08x}", "threadId": f"thread{number:08x}", "labelIds": ["SENT"],
+                       "raw": body.get("raw", "")}
+            self._data["messages"].append(message)
+        return 200, {key: message[key] for key in ("id", "threadId", "labelIds")}, {}
+
+    def _gmail_list(self, params, query, body, request):
+        result = self._token_page("messages", query, "messages")
+        result["messages"] = [{"id": m["id"], "threadId": m["threadId"]} for m in result["messages"]]
+        return 200, result, {}
+
+    # Calendar
+
+    def _calendar_list_calendars(self, params, query, body, request):
+        return 200, {"items": [{"id": "primary", "summary": "Mock Calendar", "primary": True}]}, {}
+
+    def _calendar_create_event(self, params, query, body, request):
+        with self._lock:
+            number = len(self._data["events"]) + 1
+            event = {"id": f"event{number}", "calendar": params["calendar"], "summary": body.get("summary", ""),
+                     "start": body.get("start", {}), "end": body.get("end", {}), "status": "confirmed",
+                     "htmlLink": f"https://calendar.google.com/event?eid=event{number}",
+                     "hangoutLink": f"https://meet.google.com/mock-{number}"}
+            self._data["events"].append(event)
+        return 200, event, {}
+
+    def _calendar_list_events(self, params, query, body, request):
+        result = self._token_page("events", query, "items", lambda event: event["calendar"] == params["calendar"])
+        return 200, result, {}
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Local mock of the GitHub, Jira, Gmail and Calendar APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default="fixed:0", help="per-request latency, e.g. uniform:0.01,0.05")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=int, help="requests per platform per window before 429")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockPlatformServer(args.host, args.port, args.latency, args.error_rate, args.rate_limit,
+                                args.rate_window, args.page_size, args.seed)
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Single-call multimodal fast path for ask_agent.
+
+On the ReAct path a question about what the webcam shows costs three
+sequential model round trips: a Gemini call that emits the tool call, the Groq
+vision call inside analyze_image_with_query, and a second Gemini call that
+composes the answer. With MULTIMODAL_FAST_PATH=1 a phrase check decides up
+front whether the question needs the camera; if so the current frame is
+captured and sent together with the question to the (multimodal) Gemini
+model in a single call. Other questions are a single
+text-only call without the tool loop.
+
+Both paths record llm_turn_duration_seconds{path, vision} so their per-turn
+latencies can be compared on /metrics; benchmarks/bench_multimodal.py compares
+them offline.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# Questions about the user's appearance or surroundings. Only phrases that are about the
+# camera view count: single words like "look", "see" or "room" also occur in ordinary requests
+# ("look up the meeting room schedule") that must not upload a frame.
+_VISION_PATTERN = re.compile(
+    r"\b(?:"
+    r"what (?:do|can) you see|(?:can|do) you see (?:me|my|this|that|what|anything|how)|"
+    r"how do i look|do i look|what do i look like|how am i looking|look at (?:me|my|this)|"
+    r"am i wearing|i(?:'m| am) wearing|what i(?:'m| am) wearing|"
+    r"(?:my|this) (?:outfit|clothes|shirt|jacket|hat|tie|glasses|hair|haircut|beard|face|smile|expression|"
+    r"appearance|background|room|desk|setup)|"
+    r"do i have (?:a |any )?(?:beard|glasses|tattoo|hat|mustache|moustache)|"
+    r"am i (?:holding|smiling)|i(?:'m| am) holding|in my hand|holding up|how many fingers|"
+    r"behind me|in front of me|on the camera|on camera|(?:the |my |your )?(?:webcam|camera)|"
+    r"(?:picture|photo|image) of me|how many people|what colou?r is my"
+    r")\b",
+    re.IGNORECASE,
+)
+
+def needs_vision(query: str) -> bool:
+    """Cheap phrase check for questions that need the webcam frame"""
+    return bool(_VISION_PATTERN.search(query or ""))
+
+# Questions the generic first-turn analysis (tools.SPECULATIVE_VISION_QUERY) answers: the user's
+# appearance, clothing, expression or style, as asked for the opening compliment
+_APPEARANCE_PATTERN = re.compile(
+    r"\b(?:appearance|look|looks|looking|wearing|outfit|clothes|clothing|dressed|style|hair|beard|glasses|"
+    r"expression|smile|smiling|compliment|describe (?:me|the (?:person|user))|person in front)\b",
+    re.IGNORECASE,
+)
+
+def is_appearance_query(query: str) -> bool:
+    """Check whether a vision query asks about the person's appearance (not e.g. counting or reading)"""
+    return bool(_APPEARANCE_PATTERN.search(query or ""))
+
+def build_messages(system_prompt: str, query: str, image_b64: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Chat messages for one call; the frame is attached as an inline JPEG when given"""
+    content: Any = query
+    if image_b64:
+        content = [
+            {"type": "text", "text": query},
+            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}},
+        ]
+    return [{"role": "system", "content": system_prompt}, {"role": "user", "content": content}]
@@ -0,0 +1,84 @@
+"""
+Concurrent conversation pipeline.
+
+Extracts intents from the user message first, dispatches the resulting platform
+tasks to a worker pool and generates the persona's LLM reply at the same time,
+so a turn costs max(LLM, tasks) instead of LLM + tasks. With an
+EvaluationPipeline, reflection runs in the background after the turn.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+from agents.base import PersonaAgent, Task, AgentResponse
+from agents.supervisor import HierarchicalSupervisor
+from agents.reflection import ReflectionAgent
+from agents.evaluation_pipeline import EvaluationPipeline
+from agents.tracing import tracer
+
+@dataclass
+class TaskOutcome:
+    """A platform task together with its response and reflection evaluation (None when deferred)"""
+    task: Task
+    response: AgentResponse
+    evaluation: Optional[Dict[str, Any]]
+
+@dataclass
+class ConversationResult:
+    """Persona reply plus the outcomes of every task it triggered"""
+    response: AgentResponse
+    task_outcomes: List[TaskOutcome] = field(default_factory=list)
+
+class ConversationPipeline:
+    """Runs persona generation and the persona's platform tasks concurrently"""
+
+    def __init__(self, supervisor: HierarchicalSupervisor, reflection_agent: ReflectionAgent, max_workers: int = 8,
+                 evaluator: Optional[EvaluationPipeline] = None):
+        self.supervisor = supervisor
+        self.reflection_agent = reflection_agent
+        self.evaluator = evaluator
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conversation-task")
+
+    def run(self, persona: PersonaAgent, message: str, context: Optional[Dict[str, Any]] = None,
+            evaluate_inline: bool = False) -> ConversationResult:
+        """Handle one conversational turn"""
+        with tracer.span("conversation", persona=persona.agent_id) as span:
+            # Intent extraction is cheap, so do it up front and start the tasks before the LLM call
+            with tracer.span("persona.interpret_user_intent"):
+                tasks = persona.interpret_user_intent(message)
+            span.set_attribute("tasks", len(tasks))
+            # Each worker runs in a copy of this context so task spans nest under the turn
+            futures = [self.executor.submit(contextvars.copy_context().run, self._execute_task, task, evaluate_inline)
+                       for task in tasks]
+
+            try:
+                with tracer.span("persona.generate_response") as generate_span:
+                    response_text, degraded = persona.generate_budgeted_response(message, context)
+                    generate_span.set_attribute("degraded", degraded)
+            finally:
+                outcomes = [future.result() for future in futures]
+
+        response = AgentResponse(
+            success=True,
+            message=response_text,
+            data={"degraded": degraded},
+            tasks_created=tasks
+        )
+        return ConversationResult(response=response, task_outcomes=outcomes)
+
+    def _execute_task(self, task: Task, evaluate_inline: bool = False) -> TaskOutcome:
+        """Route a task through the supervisor and evaluate (or queue evaluation of) the result"""
+        started = time.perf_counter()
+        response = self.supervisor.execute_task(task)
+        latency = time.perf_counter() - started
+        if self.evaluator is not None:
+            evaluation = self.evaluator.submit(task, response, inline=evaluate_inline, latency=latency)
+        else:
+            evaluation = self.reflection_agent.evaluate_task_completion(task, response, latency)
+        return TaskOutcome(task=task, response=response, evaluation=evaluation)
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self.executor.shutdown(wait=False)
@@ -1,11 +1,76 @@
 """
 Platform-specific supervisor agents that interface with external APIs/services.
+
+GitHub talks to GITHUB_API_URL (default https://api.github.com). Gmail, Jira and
+Calendar call their APIs only when GMAIL_API_URL, JIRA_BASE_URL or
+CALENDAR_API_URL is set and return simulated results otherwise. Pointing all
+four at agents/mock_platforms.py exercises the real request path locally.
 """
+import base64
 import os
+import threading
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import parsedate_to_datetime
 import requests
 from typing import Dict, List, Any, Optional
 from agents.base import PlatformAgent, SubAgent, Task, AgentResponse, TaskStatus
 
+DEFAULT_GITHUB_API_URL = "https://api.github.com"
+PLATFORM_HTTP_TIMEOUT = float(os.getenv("PLATFORM_HTTP_TIMEOUT", "10"))
+
+# One session per thread (requests.Session is not documented as thread-safe); each one
+# reuses its pooled keep-alive connections across calls made by that platform thread
+_sessions = threading.local()
+
+def _http() -> requests.Session:
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+def api_base_url(env_var: str, default: Optional[str] = None) -> Optional[str]:
+    """Base URL for a platform API from the environment, without a trailing slash"""
+    url = os.getenv(env_var) or default
+    return url.rstrip("/") if url else None
+
+def _api_failure(action: str, response: requests.Response) -> AgentResponse:
+    """Failed response carrying the status code and, when rate limited, the retry delay"""
+    data = {"status_code": response.status_code}
+    retry_after = _retry_after(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        data["retry_after"] = retry_after
+    return AgentResponse(
+        success=False,
+        message=f"Failed to {action}: {response.status_code} {response.text}",
+        data=data
+    )
+
+def _retry_after(value: Optional[str]) -> Optional[int]:
+    """Seconds from a Retry-After header in either form (delay seconds or HTTP date); None if unparseable"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(int((when - datetime.now(timezone.utc)).total_seconds()), 0)
+
+def _bearer(env_var: str) -> Dict[str, str]:
+    """Authorization header from a token env var (none when unset, as the mock server needs none)"""
+    token = os.getenv(env_var)
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+def _now_iso(offset: timedelta = timedelta()) -> str:
+    return (datetime.now(timezone.utc) + offset).strftime("%Y-%m-%dT%H:%M:%SZ")
+
 class GitHubPlatformAgent(PlatformAgent):
     """GitHub platform supervisor that manages GitHub-related tasks"""
     
@@ -17,7 +82,7 @@ class GitHubPlatformAgent(PlatformAgent):
             platform_name="github"
         )
         self.github_token = github_token or os.getenv("GITHUB_TOKEN")
-        self.base_url = "https://api.github.com"
+        self.base_url = api_base_url("GITHUB_API_URL", DEFAULT_GITHUB_API_URL)
         
         # Add sub-agents for specific GitHub tasks
         self.add_sub_agent(GitHubIssueAgent())
@@ -31,7 +96,7 @@ class GitHubPlatformAgent(PlatformAgent):
         
         headers = {"Authorization": f"token {self.github_token}"}
         try:
-            response = requests.get(f"{self.base_url}/user", headers=headers)
+            response = _http().get(f"{self.base_url}/user", headers=headers, timeout=PLATFORM_HTTP_TIMEOUT)
             return response.status_code == 200
         except Exception:
             return False
@@ -39,7 +104,7 @@ class GitHubPlatformAgent(PlatformAgent):
     def test_connection(self) -> bool:
         """Test connection to GitHub API"""
         try:
-            response = requests.get(f"{self.base_url}")
+            response = _http().get(f"{self.base_url}/", timeout=PLATFORM_HTTP_TIMEOUT)
             return response.status_code == 200
         except Exception:
             return False
@@ -89,7 +154,8 @@ class GitHubIssueAgent(SubAgent):
         description = payload.get("description", "")
         
         github_token = os.getenv("GITHUB_TOKEN")
-        if not github_token:
+        base_url = api_base_url("GITHUB_API_URL", DEFAULT_GITHUB_API_URL)
+        if not github_token and base_url == DEFAULT_GITHUB_API_URL:
             return AgentResponse(
                 success=False,
                 message="GitHub token not configured. Issue created in simulation mode.",
@@ -102,10 +168,7 @@ class GitHubIssueAgent(SubAgent):
                 }
             )
         
-        headers = {
-            "Authorization": f"token {github_token}",
-            "Content-Type": "application/json"
-        }
+        headers = self._headers(github_token)
         
         issue_data = {
             "title": title,
@@ -113,10 +176,11 @@ class GitHubIssueAgent(SubAgent):
         }
         
         try:
-            response = requests.post(
-                f"https://api.github.com/repos/{repository}/issues",
+            response = _http().post(
+                f"{base_url}/repos/{repository}/issues",
                 json=issue_data,
-                headers=headers
+                headers=headers,
+                timeout=PLATFORM_HTTP_TIMEOUT
             )
             
             if response.status_code == 201:
@@ -133,10 +197,7 @@ class GitHubIssueAgent(SubAgent):
                     data=task.result
                 )
             else:
-                return AgentResponse(
-                    success=False,
-                    message=f"Failed to create GitHub issue: {response.text}"
-                )
+                return _api_failure("create GitHub issue", response)
                 
         except Exception as e:
             return AgentResponse(
@@ -153,12 +214,52 @@ class GitHubIssueAgent(SubAgent):
         )
     
     def _list_issues(self, task: Task) -> AgentResponse:
-        """List GitHub issues"""
-        # Simplified implementation
+        """List GitHub issues, following Link pagination up to max_pages"""
+        github_token = os.getenv("GITHUB_TOKEN")
+        base_url = api_base_url("GITHUB_API_URL", DEFAULT_GITHUB_API_URL)
+        if not github_token and base_url == DEFAULT_GITHUB_API_URL:
+            return AgentResponse(
+                success=True,
+                message="GitHub issue listing functionality would be implemented here"
+            )
+        
+        repository = task.payload.get("repository", "company/default")
+        max_pages = task.payload.get("max_pages", 10)
+        url = f"{base_url}/repos/{repository}/issues"
+        params = {"per_page": task.payload.get("per_page", 30)}
+        issues = []
+        try:
+            for _ in range(max_pages):
+                response = _http().get(url, params=params, headers=self._headers(github_token),
+                                        timeout=PLATFORM_HTTP_TIMEOUT)
+                if response.status_code != 200:
+                    return _api_failure("list GitHub issues", response)
+                issues.extend({"issue_id": issue["number"], "title": issue["title"], "url": issue["html_url"]}
+                              for issue in response.json())
+                url = response.links.get("next", {}).get("url")
+                params = None
+                if not url:
+                    break
+        except Exception as e:
+            return AgentResponse(
+                success=False,
+                message=f"Error listing GitHub issues: {str(e)}"
+            )
+        
+        task.status = TaskStatus.COMPLETED
+        task.result = {"repository": repository, "issues": issues, "count": len(issues)}
         return AgentResponse(
             success=True,
-            message="GitHub issue listing functionality would be implemented here"
+            message=f"Found {len(issues)} issues in {repository}",
+            data=task.result
         )
+    
+    @staticmethod
+    def _headers(github_token: Optional[str]) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if github_token:
+            headers["Authorization"] = f"token {github_token}"
+        return headers
 
 class GitHubRepositoryAgent(SubAgent):
     """Sub-agent for GitHub repository management"""
@@ -264,6 +365,39 @@ class EmailSenderAgent(SubAgent):
         recipient = payload.get("recipient", "example@company.com")
         template = payload.get("template", "default")
         
+        base_url = api_base_url("GMAIL_API_URL")
+        if base_url:
+            message = EmailMessage()
+            message["To"] = recipient
+            message["Subject"] = subject
+            message.set_content(payload.get("body", f"Template: {template}"))
+            raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+            try:
+                response = _http().post(
+                    f"{base_url}/gmail/v1/users/me/messages/send",
+                    json={"raw": raw},
+                    headers=_bearer("GMAIL_ACCESS_TOKEN"),
+                    timeout=PLATFORM_HTTP_TIMEOUT
+                )
+            except Exception as e:
+                return AgentResponse(success=False, message=f"Error sending email: {str(e)}")
+            if response.status_code != 200:
+                return _api_failure("send email", response)
+            sent = response.json()
+            task.status = TaskStatus.COMPLETED
+            task.result = {
+                "email_id": sent["id"],
+                "thread_id": sent.get("threadId"),
+                "recipient": recipient,
+                "subject": subject,
+                "sent_at": _now_iso()
+            }
+            return AgentResponse(
+                success=True,
+                message=f"Email sent successfully to {recipient}",
+                data=task.result
+            )
+        
         # Simulate email sending
         task.status = TaskStatus.COMPLETED
         task.result = {
@@ -370,6 +504,41 @@ class JiraTicketAgent(SubAgent):
         description = payload.get("description", "No description")
         priority = payload.get("priority", "medium")
         
+        base_url = api_base_url("JIRA_BASE_URL")
+        if base_url:
+            fields = {
+                "project": {"key": payload.get("project", "PROJ")},
+                "summary": title,
+                "description": description,
+                "issuetype": {"name": payload.get("issue_type", "Task")},
+                "priority": {"name": str(priority).capitalize()}
+            }
+            try:
+                response = _http().post(
+                    f"{base_url}/rest/api/2/issue",
+                    json={"fields": fields},
+                    headers=_bearer("JIRA_API_TOKEN"),
+                    timeout=PLATFORM_HTTP_TIMEOUT
+                )
+            except Exception as e:
+                return AgentResponse(success=False, message=f"Error creating Jira ticket: {str(e)}")
+            if response.status_code != 201:
+                return _api_failure("create Jira ticket", response)
+            key = response.json()["key"]
+            task.status = TaskStatus.COMPLETED
+            task.result = {
+                "ticket_id": key,
+                "title": title,
+                "description": description,
+                "priority": priority,
+                "url": f"{base_url}/browse/{key}"
+            }
+            return AgentResponse(
+                success=True,
+                message=f"Successfully created Jira ticket {key}",
+                data=task.result
+            )
+        
         # Simulate ticket creation
         task.status = TaskStatus.COMPLETED
         task.result = {
@@ -468,6 +637,54 @@ class CalendarSchedulerAgent(SubAgent):
         duration = payload.get("duration", 30)
         meeting_type = payload.get("type", "general")
         
+        base_url = api_base_url("CALENDAR_API_URL")
+        if base_url:
+            start = payload.get("start_time") or _now_iso(timedelta(hours=1))
+            try:
+                minutes = float(duration)
+                if minutes <= 0:
+                    raise ValueError(f"duration must be positive, got {duration!r}")
+                begins = datetime.fromisoformat(str(start).replace("Z", "+00:00"))
+                if begins.tzinfo is None:
+                    begins = begins.replace(tzinfo=timezone.utc)  # naive start times are UTC
+                # Formatted with a Z suffix, so convert offset start times to UTC first
+                end = (begins.astimezone(timezone.utc) + timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            except (TypeError, ValueError) as e:
+                return AgentResponse(success=False, message=f"Invalid meeting time: {e}")
+            event = {
+                "summary": title,
+                "description": payload.get("description", ""),
+                "start": {"dateTime": start},
+                "end": {"dateTime": end},
+                "attendees": [{"email": email} for email in payload.get("attendees", [])]
+            }
+            try:
+                response = _http().post(
+                    f"{base_url}/calendar/v3/calendars/{payload.get('calendar', 'primary')}/events",
+                    json=event,
+                    headers=_bearer("CALENDAR_ACCESS_TOKEN"),
+                    timeout=PLATFORM_HTTP_TIMEOUT
+                )
+            except Exception as e:
+                return AgentResponse(success=False, message=f"Error scheduling meeting: {str(e)}")
+            if response.status_code != 200:
+                return _api_failure("schedule meeting", response)
+            created = response.json()
+            task.status = TaskStatus.COMPLETED
+            task.result = {
+                "meeting_id": created["id"],
+                "title": title,
+                "duration": duration,
+                "type": meeting_type,
+                "scheduled_time": start,
+                "meeting_url": created.get("hangoutLink") or created.get("htmlLink")
+            }
+            return AgentResponse(
+                success=True,
+                message=f"Successfully scheduled {title} for {duration} minutes",
+                data=task.result
+            )
+        
         # Simulate meeting scheduling
         task.status = TaskStatus.COMPLETED
         task.result = {
@@ -0,0 +1,183 @@
+"""
+Speculative prewarming at session start.
+
+The first turn of a session otherwise pays for everything built lazily: the
+Gemini/Groq/ElevenLabs clients and the TLS connections behind them, compiling
+the personality's ReAct agent and opening the webcam (with its discarded
+warm-up frames). A session starts when the personality is chosen or the
+camera is started; SessionPrewarmer.start() then warms these in the background:
+
+    clients      SDK imports and model clients (agents.lazy.preload)
+    connections  one cheap request per LLM backend to open its connection
+    agent        the personality's ReAct agent, compiled for every chat backend
+    tts          the ElevenLabs client and its connection (voice sessions)
+    camera       opt-in: the webcam opened and past its warm-up reads
+    vision       optional: the first-turn vision analysis, run speculatively
+
+The webcam is only touched when the caller says so: the camera step with
+camera=True (SESSION_PREWARM_CAMERA=1 makes that the default), the vision step
+with vision=True, which the UI passes once its live feed is running.
+
+The system prompts ask for a compliment on the user's appearance in the first
+turn, so that turn almost always looks through the webcam. With
+SESSION_PREWARM_VISION=1 the vision step analyzes the current frame once the
+other steps are done; the next appearance question to analyze_image_with_query
+within SPECULATIVE_VISION_TTL seconds is answered from it instead of calling
+the vision model (see tools.prime_vision).
+
+Steps run in parallel and never raise: each is reported with its duration and
+outcome by status() and on session_prewarm_duration_seconds. A step already run
+for the same personality within SESSION_PREWARM_TTL seconds is not repeated, so
+a later trigger only adds what is new (e.g. the vision step once the camera starts).
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from agents.lazy import preload
+from agents.metrics import session_prewarm_duration
+
+# A step gets the session's personality and returns a result for the report
+Step = Callable[[str], Any]
+
+def _warm_clients(personality: str):
+    import ai_agent  # noqa: F401 - declares the lazily built LLM resources
+    return preload(["llm_backends", "langgraph", "groq_client"])
+
+def _open_connections(personality: str):
+    from agents.providers import chat_router, vision_router
+    return {"chat": chat_router.connect(), "vision": vision_router.connect()}
+
+def _compile_agent(personality: str):
+    import ai_agent
+    return ai_agent.prepare_agents(personality)
+
+def _warm_tts(personality: str):
+    from text_to_speech import connect_elevenlabs
+    connect_elevenlabs()
+
+def _open_camera(personality: str):
+    import tools
+    if not tools.warm_camera():
+        raise RuntimeError("Could not open any webcam (tried indices 0-3)")
+
+def _prime_vision(personality: str):
+    import tools
+    return len(tools.prime_vision())
+
+def default_steps(voice: bool = False, camera: bool = False) -> Dict[str, Step]:
+    """The parallel warm-up steps; voice adds ElevenLabs, camera opens the webcam"""
+    steps: Dict[str, Step] = {
+        "clients": _warm_clients,
+        "connections": _open_connections,
+        "agent": _compile_agent,
+    }
+    if voice:
+        steps["tts"] = _warm_tts
+    if camera:
+        steps["camera"] = _open_camera
+    return steps
+
+class SessionPrewarmer:
+    """Warms the resources a session's first turn needs, in the background"""
+
+    def __init__(self, steps_factory: Callable[..., Dict[str, Step]] = default_steps,
+                 vision_step: Step = _prime_vision, speculative_vision: bool = False,
+                 camera: bool = False, ttl: float = 300.0, max_workers: int = 4, max_sessions: int = 4,
+                 enabled: bool = True):
+        self.steps_factory = steps_factory
+        self.vision_step = vision_step
+        self.speculative_vision = speculative_vision
+        self.camera = camera
+        self.ttl = ttl
+        self.enabled = enabled
+        self._steps = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prewarm")
+        # Coordinators wait for a session's steps so start() returns immediately; up to
+        # max_sessions sessions are coordinated at once, later ones queue
+        self._sessions = ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix="prewarm-session")
+        self._lock = threading.Lock()
+        # Personality -> step name -> when it was last started
+        self._started: Dict[str, Dict[str, float]] = {}
+        self._reports: Dict[str, Dict[str, Any]] = {}
+
+    def configure(self, speculative_vision: Optional[bool] = None, camera: Optional[bool] = None,
+                  ttl: Optional[float] = None, enabled: Optional[bool] = None):
+        if speculative_vision is not None:
+            self.speculative_vision = speculative_vision
+        if camera is not None:
+            self.camera = camera
+        if ttl is not None:
+            self.ttl = ttl
+        if enabled is not None:
+            self.enabled = enabled
+
+    def start(self, personality: str, voice: bool = False, camera: Optional[bool] = None,
+              vision: bool = False) -> Optional[Future]:
+        """
+        Prewarm for a session in the background; None when disabled or nothing is left to warm.
+        camera opens the webcam (default: the prewarmer's camera setting); vision allows the
+        speculative analysis, for callers whose frames come from a running live feed.
+        """
+        if not self.enabled:
+            return None
+        camera = self.camera if camera is None else camera
+        steps = self.steps_factory(voice=voice, camera=camera)
+        # The speculative analysis reads a frame, so it needs the webcam one way or the other
+        run_vision = self.speculative_vision and (vision or camera)
+        now = time.monotonic()
+        with self._lock:
+            started = self._started.setdefault(personality, {})
+            wanted = list(steps) + (["vision"] if run_vision else [])
+            fresh = [name for name in wanted if name not in started or now - started[name] >= self.ttl]
+            if not fresh:
+                return None
+            for name in fresh:
+                started[name] = now
+            report = self._reports.setdefault(personality, {"steps": {}})
+            report["done"] = False
+        steps = {name: fn for name, fn in steps.items() if name in fresh}
+        return self._sessions.submit(self._run, personality, steps, "vision" in fresh)
+
+    def _step(self, personality: str, name: str, fn: Step) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result: Dict[str, Any] = {"status": "ok", "result": fn(personality)}
+        except Exception as e:
+            logging.warning(f"Session prewarm step {name} failed: {e}")
+            result = {"status": f"error: {e}"}
+        result["seconds"] = round(time.perf_counter() - started, 4)
+        session_prewarm_duration.observe(result["seconds"], name, "ok" if result["status"] == "ok" else "error")
+        with self._lock:
+            self._reports[personality]["steps"][name] = result
+        return result
+
+    def _run(self, personality: str, steps: Dict[str, Step], vision: bool) -> Dict[str, Any]:
+        started = time.perf_counter()
+        wait([self._steps.submit(self._step, personality, name, fn) for name, fn in steps.items()])
+        # The speculative analysis needs the vision client and the camera warmed above
+        if vision:
+            self._step(personality, "vision", self.vision_step)
+        with self._lock:
+            report = self._reports[personality]
+            report["done"] = True
+            report["seconds"] = round(time.perf_counter() - started, 4)
+            return {**report, "steps": dict(report["steps"])}
+
+    def status(self) -> Dict[str, Any]:
+        """Per personality: whether its prewarm is done and each step's outcome and duration"""
+        with self._lock:
+            return {personality: {**report, "steps": dict(report["steps"])}
+                    for personality, report in self._reports.items()}
+
+def _prewarmer_from_env() -> SessionPrewarmer:
+    return SessionPrewarmer(
+        speculative_vision=os.getenv("SESSION_PREWARM_VISION", "0").lower() in ("1", "true", "yes"),
+        camera=os.getenv("SESSION_PREWARM_CAMERA", "0").lower() in ("1", "true", "yes"),
+        ttl=float(os.getenv("SESSION_PREWARM_TTL", "300")),
+        enabled=os.getenv("SESSION_PREWARM", "1").lower() in ("1", "true", "yes"),
+    )
+
+session_prewarmer = _prewarmer_from_env()
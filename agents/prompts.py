@@ -0,0 +1,55 @@
+"""
+System prompts for persona personality types.
+
+Prompt templates are declared in agents/system_prompts.json (one list of lines
+per personality, sharing the {base_instructions} block) and rendered once per
+personality type; persona definitions can register additional templates.
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Union
+
+PROMPTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "system_prompts.json")
+
+_registered: Dict[str, str] = {}
+_lock = threading.Lock()
+
+def _join(template: Union[str, List[str]]) -> str:
+    """Templates may be written as a single string or a list of lines"""
+    return "\n".join(template) if isinstance(template, list) else template
+
+@lru_cache(maxsize=1)
+def _load_templates() -> Dict[str, object]:
+    """Read the prompt templates file (once per process)"""
+    with open(PROMPTS_FILE, encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        "base_instructions": _join(data["base_instructions"]),
+        "default": _join(data["default"]),
+        "personalities": {key.lower(): _join(value) for key, value in data["personalities"].items()},
+    }
+
+def register_prompt(personality_type: str, template: Union[str, List[str]]):
+    """Register (or replace) the prompt template of a personality type"""
+    with _lock:
+        _registered[personality_type.lower()] = _join(template)
+        get_system_prompt.cache_clear()
+
+def unregister_prompt(personality_type: str):
+    """Drop the registered template of a personality type (it falls back to the templates file or the default)"""
+    with _lock:
+        if _registered.pop(personality_type.lower(), None) is not None:
+            get_system_prompt.cache_clear()
+
+@lru_cache(maxsize=256)
+def get_system_prompt(personality_type: str = "general assistant") -> str:
+    """Render the system prompt of a personality type (cached per type)"""
+    data = _load_templates()
+    key = personality_type.lower()
+    template = _registered.get(key) or data["personalities"].get(key)
+    if template is None:
+        # Default prompt for custom or unrecognized personalities
+        template = data["default"].replace("{personality_type}", personality_type)
+    return template.replace("{base_instructions}", data["base_instructions"])
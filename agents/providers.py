@@ -0,0 +1,350 @@
+"""
+LLM provider routing with failover and hedged requests.
+
+Agent turns go through chat_router and webcam questions through
+vision_router. Each router holds an ordered list of backends
+(provider:model), for example
+
+    LLM_CHAT_BACKENDS=gemini:gemini-2.0-flash,groq:llama-3.3-70b-versatile
+    LLM_VISION_BACKENDS=groq:meta-llama/llama-4-maverick-17b-128e-instruct,gemini:gemini-2.0-flash
+    LLM_FAST_BACKENDS=gemini:gemini-2.0-flash-lite
+
+A call goes to the first healthy backend. When it fails, the next backend is
+tried right away. When it runs past the hedge delay, a duplicate request is
+sent to the next backend and the first answer wins. The hedge delay is the
+lowest p95 among the backends' recent latencies. Attempts that lose to a hedge
+are not recorded as latency samples; they count as strikes instead, so a
+slowed-down provider does not drag the delay up with it. A backend with
+failure_threshold errors or lost hedges in a row is moved to the back for
+cooldown seconds. With simple_query_max_chars set, short queries go to the
+"fast" tier (LLM_FAST_BACKENDS) first.
+
+The fake provider (fake:<name>) is a local backend with configurable latency
+and error rate for tests and offline runs.
+"""
+import contextvars
+import os
+import queue
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from agents.lazy import Lazy, lazy
+from agents.latency import LatencyTracker
+from agents.metrics import llm_backend_duration, llm_backend_requests, llm_backend_hedges
+from agents.mock_platforms import parse_latency
+
+T = TypeVar("T")
+
+@lazy("groq_client")
+def get_groq_client():
+    """Groq client shared by every Groq backend and speech-to-text (reuses its HTTP connection pool)"""
+    from groq import Groq
+    return Groq()
+
+class Backend:
+    """One model at one provider"""
+
+    provider = ""
+
+    def __init__(self, model: str, tier: str = "standard"):
+        self.model = model
+        self.tier = tier
+        self.name = f"{self.provider}:{model}"
+        self._chat_model = Lazy(self._build_chat_model, self.name)
+
+    def chat_model(self):
+        """LangChain chat model for the ReAct agent, built on first use"""
+        return self._chat_model()
+
+    def _build_chat_model(self):
+        raise NotImplementedError
+
+    def complete(self, messages: List[Dict[str, Any]]) -> str:
+        """One chat completion; user content may include image_url parts on multimodal models"""
+        return self.chat_model().invoke(messages).content
+
+    def warm(self):
+        """Build the client up front"""
+        self.chat_model()
+
+    def connect(self):
+        """Build the client and open its connection with a cheap request, so the first turn skips the TLS handshake"""
+        self.warm()
+
+class GeminiBackend(Backend):
+    provider = "gemini"
+
+    def _build_chat_model(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=self.model, temperature=0.7)
+
+    def connect(self):
+        # countTokens is free and goes through the same client as generation
+        self.chat_model().get_num_tokens("hello")
+
+class GroqBackend(Backend):
+    provider = "groq"
+
+    def _build_chat_model(self):
+        # Only needed to run the ReAct agent on Groq; plain completions use the Groq SDK
+        from langchain_groq import ChatGroq
+        return ChatGroq(model=self.model, temperature=0.7)
+
+    def complete(self, messages: List[Dict[str, Any]]) -> str:
+        completion = get_groq_client().chat.completions.create(messages=messages, model=self.model)
+        return completion.choices[0].message.content
+
+    def warm(self):
+        get_groq_client()
+
+    def connect(self):
+        get_groq_client().models.list()
+
+class FakeBackend(Backend):
+    """Local backend with a latency distribution (see parse_latency) and an error rate"""
+
+    provider = "fake"
+
+    def __init__(self, model: str = "local", latency: str = "fixed:0", error_rate: float = 0.0, seed: int = 0,
+                 tier: str = "standard"):
+        super().__init__(model, tier)
+        self.set_latency(latency, seed)
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def set_latency(self, latency: str, seed: int = 0):
+        """Change the latency distribution, e.g. to simulate a degraded provider"""
+        self.latency = parse_latency(latency, seed)
+
+    def _build_chat_model(self):
+        return self
+
+    def invoke(self, messages: List[Dict[str, Any]]):
+        return SimpleNamespace(content=self.complete(messages))
+
+    def complete(self, messages: List[Dict[str, Any]]) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency()
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise ConnectionError(f"{self.name} is unavailable")
+        content = messages[-1]["content"]
+        text = content if isinstance(content, str) else next(part["text"] for part in content if part["type"] == "text")
+        return f"[{self.name}] {text}"
+
+    def warm(self):
+        pass
+
+PROVIDERS = {backend.provider: backend for backend in (GeminiBackend, GroqBackend, FakeBackend)}
+
+def parse_backends(spec: str, tier: str = "standard") -> List[Backend]:
+    """'gemini:gemini-2.0-flash,groq:llama-3.3-70b-versatile' -> backends"""
+    backends = []
+    for item in spec.split(","):
+        provider, _, model = item.strip().partition(":")
+        if not provider:
+            continue
+        if provider not in PROVIDERS or not model:
+            raise ValueError(f"Unknown LLM backend: {item.strip()} (expected provider:model, "
+                             f"provider one of {', '.join(PROVIDERS)})")
+        backends.append(PROVIDERS[provider](model, tier=tier))
+    return backends
+
+class BackendHealth:
+    """Latency window and failure streak of one backend"""
+
+    def __init__(self):
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+class ProviderRouter:
+    """Routes calls across backends with failover, p95-based hedging and a per-backend circuit breaker"""
+
+    def __init__(self, name: str, backends: Sequence[Backend] = (), hedge: bool = True, hedge_after: float = 3.0,
+                 failure_threshold: int = 3, cooldown: float = 30.0, simple_query_max_chars: int = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.configure(backends, hedge, hedge_after, failure_threshold, cooldown, simple_query_max_chars)
+
+    def configure(self, backends: Sequence[Backend], hedge: bool = True, hedge_after: float = 3.0,
+                  failure_threshold: int = 3, cooldown: float = 30.0, simple_query_max_chars: int = 0):
+        """Replace the backends and settings, resetting health"""
+        with self._lock:
+            self.backends = list(backends)
+            self.health = {backend.name: BackendHealth() for backend in self.backends}
+            self.hedge = hedge
+            # Hedge delay until some backend has enough latency samples for a p95
+            self.hedge_after = hedge_after
+            self.failure_threshold = failure_threshold
+            self.cooldown = cooldown
+            self.simple_query_max_chars = simple_query_max_chars
+
+    def candidates(self, query: Optional[str] = None) -> List[Backend]:
+        """Backends in the order a call tries them: healthy first, fast tier first for simple queries"""
+        now = self.clock()
+        simple = bool(self.simple_query_max_chars and query is not None and len(query) <= self.simple_query_max_chars)
+        def rank(backend: Backend):
+            tripped = self.health[backend.name].open_until > now
+            return (tripped, (backend.tier != "fast") if simple else (backend.tier == "fast"))
+        return sorted(self.backends, key=rank)
+
+    def hedge_delay(self) -> float:
+        """Lowest p95 among the backends with enough samples, else the configured hedge_after"""
+        p95s = [p95 for p95 in (health.latency.percentile(95) for health in self.health.values()) if p95 is not None]
+        return min(p95s) if p95s else self.hedge_after
+
+    def _record(self, backend: Backend, seconds: Optional[float], outcome: str):
+        """Account one attempt: success, error, or lost (overtaken by a hedge, latency unknown)"""
+        health = self.health.get(backend.name)
+        if health is None:
+            return  # reconfigured while the call was running
+        llm_backend_requests.inc(self.name, backend.name, outcome)
+        if seconds is not None:
+            health.latency.record(seconds)
+            llm_backend_duration.observe(seconds, self.name, backend.name)
+        with self._lock:
+            health.requests += 1
+            if outcome == "success":
+                health.consecutive_failures = 0
+                return
+            health.failures += outcome == "error"
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold:
+                health.open_until = self.clock() + self.cooldown
+
+    def _attempt(self, backend: Backend, fn: Callable[[Backend], T], finished: Optional[threading.Event] = None) -> T:
+        """Run fn(backend) and record the outcome, unless the call was already answered by another attempt"""
+        started = self.clock()
+        try:
+            value = fn(backend)
+        except Exception:
+            if finished is None or not finished.is_set():
+                self._record(backend, self.clock() - started, "error")
+            raise
+        if finished is None or not finished.is_set():
+            self._record(backend, self.clock() - started, "success")
+        return value
+
+    def call(self, fn: Callable[[Backend], T], query: Optional[str] = None) -> T:
+        """
+        Run fn(backend) on the first candidate, failing over on errors and hedging slow calls.
+        Raises the last error when every backend failed.
+        """
+        order = self.candidates(query)
+        if not order:
+            raise RuntimeError(f"No LLM backends configured for {self.name}")
+        if len(order) == 1:
+            return self._attempt(order[0], fn)
+
+        results: "queue.Queue" = queue.Queue()
+        finished = threading.Event()
+        def run(backend: Backend):
+            try:
+                results.put((backend, True, self._attempt(backend, fn, finished)))
+            except Exception as e:
+                results.put((backend, False, e))
+
+        launched = 0
+        outstanding = []
+        def launch():
+            nonlocal launched
+            # Attempts run in a copy of the caller's context so spans and voice timing stay in the turn
+            threading.Thread(target=contextvars.copy_context().run, args=(run, order[launched]), daemon=True).start()
+            outstanding.append(order[launched])
+            launched += 1
+
+        launch()
+        pending = 1
+        hedge_at = self.clock() + self.hedge_delay() if self.hedge else None
+        while True:
+            timeout = max(0.0, hedge_at - self.clock()) if hedge_at is not None else None
+            try:
+                backend, ok, value = results.get(timeout=timeout)
+            except queue.Empty:
+                # The call is past the hedge delay: duplicate it on the next backend
+                llm_backend_hedges.inc(self.name)
+                launch()
+                pending += 1
+                hedge_at = self.clock() + self.hedge_delay() if launched < len(order) else None
+                continue
+            pending -= 1
+            outstanding.remove(backend)
+            if ok:
+                finished.set()
+                for slower in outstanding:
+                    self._record(slower, None, "lost")
+                return value
+            if launched < len(order):
+                launch()
+                pending += 1
+                if hedge_at is not None:
+                    hedge_at = self.clock() + self.hedge_delay() if launched < len(order) else None
+            elif pending == 0:
+                raise value
+
+    def status(self) -> Dict[str, Any]:
+        now = self.clock()
+        backends = {}
+        for backend in self.backends:
+            health = self.health[backend.name]
+            backends[backend.name] = {
+                "tier": backend.tier,
+                "healthy": health.open_until <= now,
+                "requests": health.requests,
+                "failures": health.failures,
+                "consecutive_failures": health.consecutive_failures,
+                "latency": health.latency.get_summary(),
+            }
+        return {"hedge": self.hedge, "hedge_delay": self.hedge_delay(), "backends": backends}
+
+    def warm(self) -> Dict[str, Any]:
+        """Build every backend's client; errors (e.g. a missing SDK or key) are reported, not raised"""
+        report: Dict[str, Any] = {}
+        for backend in self.backends:
+            try:
+                backend.warm()
+                report[backend.name] = "ok"
+            except Exception as e:
+                report[backend.name] = f"error: {e}"
+        return report
+
+    def connect(self) -> Dict[str, Any]:
+        """Open a connection to every backend, reporting errors like warm()"""
+        report: Dict[str, Any] = {}
+        for backend in self.backends:
+            try:
+                backend.connect()
+                report[backend.name] = "ok"
+            except Exception as e:
+                report[backend.name] = f"error: {e}"
+        return report
+
+def _router_from_env(name: str, default_backends: str, fast_backends: str = "") -> ProviderRouter:
+    backends = parse_backends(os.getenv(f"LLM_{name.upper()}_BACKENDS", default_backends))
+    backends += parse_backends(fast_backends, tier="fast")
+    return ProviderRouter(
+        name,
+        backends,
+        hedge=os.getenv("LLM_ROUTER_HEDGE", "1").lower() in ("1", "true", "yes"),
+        hedge_after=float(os.getenv("LLM_ROUTER_HEDGE_AFTER", "3")),
+        failure_threshold=int(os.getenv("LLM_ROUTER_FAILURE_THRESHOLD", "3")),
+        cooldown=float(os.getenv("LLM_ROUTER_COOLDOWN", "30")),
+        simple_query_max_chars=int(os.getenv("LLM_ROUTE_SIMPLE_MAX_CHARS", "0")),
+    )
+
+# Persona agent turns (the ReAct agent, or one completion on the multimodal fast path)
+chat_router = _router_from_env("chat", "gemini:gemini-2.0-flash", os.getenv("LLM_FAST_BACKENDS", ""))
+# Webcam questions: analyze_image_with_query and fast-path turns that attach a frame
+vision_router = _router_from_env("vision", "groq:meta-llama/llama-4-maverick-17b-128e-instruct")
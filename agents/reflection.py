@@ -1,22 +1,59 @@
 """
 Reflection agent that evaluates task completion and triggers follow-up actions.
+
+Summaries are served from counters maintained as each evaluation is recorded
+(running totals, issue/recommendation frequencies and per-minute/per-hour
+rollups by task type and platform), so reading them does not depend on how
+many evaluations the service has performed. Only the most recent raw
+evaluations are retained; an optional EvaluationStore keeps a larger window of
+them in compact columns for percentile and trend analytics.
 """
-from typing import Dict, List, Any, Optional
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Any, Optional, Tuple, TYPE_CHECKING
 from agents.base import BaseAgent, Task, AgentResponse, TaskStatus
+from agents.state import StateBackend, InMemoryStateBackend
+from agents.history import TaskHistory
+from agents.supervisor import TASK_PLATFORM_MAP
+from agents.codec import task_from_dict, response_from_dict
+from agents.tracing import tracer
 import uuid
 
+if TYPE_CHECKING:
+    # Imported for annotations only: loading it pulls in NumPy
+    from agents.evaluation_store import EvaluationStore
+
+# Rollup granularity -> bucket width in seconds
+ROLLUP_GRANULARITIES = {"minute": 60, "hour": 3600}
+ROLLUP_DIMENSIONS = ("task_type", "platform")
+
 class ReflectionAgent(BaseAgent):
     """
     Agent that evaluates task completion, identifies issues, and can trigger follow-up actions.
     """
     
-    def __init__(self):
+    def __init__(self, state: Optional[StateBackend] = None, history_limit: int = 1000,
+                 rollup_retention: Optional[Dict[str, int]] = None, clock: Callable[[], float] = time.time,
+                 store: Optional["EvaluationStore"] = None):
         super().__init__(
             agent_id="reflection_agent",
             name="Reflection Agent",
             description="Evaluates task completion and ensures quality outcomes"
         )
-        self.evaluation_history: List[Dict[str, Any]] = []
+        # Evaluations and aggregates live in the state backend so summaries cover every worker process
+        self.state = state or InMemoryStateBackend()
+        self.history_limit = history_limit
+        # Number of buckets kept per granularity
+        self.rollup_retention = {"minute": 120, "hour": 48, **(rollup_retention or {})}
+        self.clock = clock
+        # Process-local columnar copy of recent evaluations (with task latency) for analytics
+        self.store = store
+        self._pruned_buckets: Dict[str, int] = {}
+    
+    @property
+    def evaluation_history(self) -> List[Dict[str, Any]]:
+        """The most recent `history_limit` evaluations, oldest first"""
+        return self.state.list_evaluations()
     
     def can_handle(self, task: Task) -> bool:
         """Can handle reflection and evaluation tasks"""
@@ -36,10 +73,28 @@ class ReflectionAgent(BaseAgent):
                 message=f"Unsupported reflection task type: {task.task_type}"
             )
     
-    def evaluate_task_completion(self, task: Task, response: AgentResponse) -> Dict[str, Any]:
+    def evaluate_task_completion(self, task: Task, response: AgentResponse,
+                                 latency: Optional[float] = None) -> Dict[str, Any]:
         """
         Evaluate if a task was completed successfully and suggest improvements
         """
+        with tracer.span("reflection.evaluate", parent=task.trace_parent, task_id=task.id):
+            evaluation = self._assess(task, response)
+            self._record_evaluations([evaluation], [latency])
+            return evaluation
+    
+    def evaluate_batch(self, completed: List[Tuple[Task, AgentResponse]],
+                       latencies: Optional[List[Optional[float]]] = None) -> List[Dict[str, Any]]:
+        """Evaluate several (task, response) pairs, updating the aggregates in one write"""
+        # A batch mixes tasks from many traces, so it is traced as its own root
+        with tracer.span("reflection.evaluate_batch", size=len(completed)):
+            evaluations = [self._assess(task, response) for task, response in completed]
+            if evaluations:
+                self._record_evaluations(evaluations, latencies)
+            return evaluations
+    
+    def _assess(self, task: Task, response: AgentResponse) -> Dict[str, Any]:
+        """Score a single task outcome without recording it"""
         evaluation = {
             "task_id": task.id,
             "task_type": task.task_type,
@@ -89,11 +144,61 @@ class ReflectionAgent(BaseAgent):
             # Suggest follow-up tracking
             evaluation["recommendations"].append("Consider setting up delivery confirmation tracking")
         
-        # Store evaluation
-        self.evaluation_history.append(evaluation)
-        
         return evaluation
     
+    def _record_evaluations(self, evaluations: List[Dict[str, Any]], latencies: Optional[List[Optional[float]]] = None):
+        """Store bounded raw copies of the evaluations and fold them into the aggregates"""
+        now = self.clock()
+        if self.store is not None:
+            self.store.extend(evaluations, [now] * len(evaluations), latencies)
+        amounts: Dict[str, int] = {}
+        
+        def add(key: str, amount: int = 1):
+            amounts[key] = amounts.get(key, 0) + amount
+        
+        for evaluation in evaluations:
+            quality = evaluation["quality_score"]
+            success = int(bool(evaluation["success"]))
+            add("evaluations:total")
+            add("evaluations:quality_sum", quality)
+            add("evaluations:success", success)
+            for issue in evaluation["issues_identified"]:
+                add(f"evaluations:issue:{issue}")
+            for rec in evaluation["recommendations"]:
+                add(f"evaluations:recommendation:{rec}")
+            
+            values = {
+                "task_type": evaluation["task_type"],
+                "platform": TASK_PLATFORM_MAP.get(evaluation["task_type"], "unrouted"),
+            }
+            for granularity, width in ROLLUP_GRANULARITIES.items():
+                bucket = int(now // width) * width
+                for dimension in ROLLUP_DIMENSIONS:
+                    prefix = f"evaluations:rollup:{granularity}:{bucket}:{dimension}:{values[dimension]}:"
+                    add(prefix + "count")
+                    add(prefix + "quality_sum", quality)
+                    add(prefix + "success", success)
+        
+        self.state.incr_many(amounts)
+        for evaluation in evaluations:
+            self.state.add_evaluation(evaluation)
+        self.state.trim("evaluations", self.history_limit)
+        self._prune_rollups(now)
+    
+    def _prune_rollups(self, now: float):
+        """Drop rollup buckets older than the retention window (at most once per new bucket)"""
+        for granularity, width in ROLLUP_GRANULARITIES.items():
+            current = int(now // width) * width
+            if self._pruned_buckets.get(granularity) == current:
+                continue
+            self._pruned_buckets[granularity] = current
+            oldest = current - (self.rollup_retention[granularity] - 1) * width
+            prefix = f"evaluations:rollup:{granularity}:"
+            buckets = {int(name.split(":", 1)[0]) for name in self.state.counters(prefix)}
+            for bucket in buckets:
+                if bucket < oldest:
+                    self.state.clear_counters(f"{prefix}{bucket}:")
+    
     def _evaluate_completion(self, task: Task) -> AgentResponse:
         """Evaluate completion of a given task"""
         target_task_data = task.payload.get("target_task")
@@ -105,9 +210,10 @@ class ReflectionAgent(BaseAgent):
                 message="Missing target task or response data for evaluation"
             )
         
-        # Reconstruct task and response objects for evaluation
-        target_task = Task(**target_task_data)
-        target_response = AgentResponse(**target_response_data)
+        # Reconstruct task and response objects for evaluation (enum fields may arrive as strings)
+        target_task = target_task_data if isinstance(target_task_data, Task) else task_from_dict(target_task_data)
+        target_response = (target_response_data if isinstance(target_response_data, AgentResponse)
+                           else response_from_dict(target_response_data))
         
         evaluation = self.evaluate_task_completion(target_task, target_response)
         
@@ -155,18 +261,29 @@ class ReflectionAgent(BaseAgent):
             data=analysis_results
         )
     
-    def identify_improvement_opportunities(self, task_history: List[Task]) -> List[Dict[str, Any]]:
+    def identify_improvement_opportunities(self, task_history) -> List[Dict[str, Any]]:
         """
-        Analyze task history to identify improvement opportunities
+        Analyze task history to identify improvement opportunities.
+        Accepts a TaskHistory (read from its maintained counters) or a list of tasks.
         """
         opportunities = []
         
-        if not task_history:
+        if isinstance(task_history, TaskHistory):
+            total_tasks = len(task_history)
+            failed_count = task_history.count(TaskStatus.FAILED)
+            task_types = task_history.type_counts()
+        else:
+            total_tasks = len(task_history)
+            failed_count = sum(1 for t in task_history if t.status == TaskStatus.FAILED)
+            task_types = {}
+            for task in task_history:
+                task_types[task.task_type] = task_types.get(task.task_type, 0) + 1
+        
+        if not total_tasks:
             return opportunities
         
         # Analyze task completion patterns
-        failed_tasks = [t for t in task_history if t.status == TaskStatus.FAILED]
-        if len(failed_tasks) > len(task_history) * 0.1:  # More than 10% failure rate
+        if failed_count > total_tasks * 0.1:  # More than 10% failure rate
             opportunities.append({
                 "type": "high_failure_rate",
                 "description": "High task failure rate detected",
@@ -175,10 +292,6 @@ class ReflectionAgent(BaseAgent):
             })
         
         # Check for common task types that might need optimization
-        task_types = {}
-        for task in task_history:
-            task_types[task.task_type] = task_types.get(task.task_type, 0) + 1
-        
         most_common_type = max(task_types.items(), key=lambda x: x[1]) if task_types else None
         if most_common_type and most_common_type[1] > 5:
             opportunities.append({
@@ -209,7 +322,8 @@ class ReflectionAgent(BaseAgent):
                     "issue_data": response.data
                 },
                 parent_task_id=completed_task.id,
-                created_by=self.agent_id
+                created_by=self.agent_id,
+                trace_parent=completed_task.trace_parent
             ))
         
         elif completed_task.task_type == "send_email" and response.success:
@@ -223,7 +337,8 @@ class ReflectionAgent(BaseAgent):
                     "tracking_type": "delivery_confirmation"
                 },
                 parent_task_id=completed_task.id,
-                created_by=self.agent_id
+                created_by=self.agent_id,
+                trace_parent=completed_task.trace_parent
             ))
         
         elif completed_task.task_type == "schedule_meeting" and response.success:
@@ -238,19 +353,20 @@ class ReflectionAgent(BaseAgent):
                     "meeting_data": response.data
                 },
                 parent_task_id=completed_task.id,
-                created_by=self.agent_id
+                created_by=self.agent_id,
+                trace_parent=completed_task.trace_parent
             ))
         
         return follow_up_tasks
     
     def get_evaluation_summary(self) -> Dict[str, Any]:
         """Get summary of all evaluations performed"""
-        if not self.evaluation_history:
+        total_evaluations = self.state.counter("evaluations:total")
+        if not total_evaluations:
             return {"total_evaluations": 0, "average_quality": 0, "success_rate": 0}
         
-        total_evaluations = len(self.evaluation_history)
-        total_quality = sum(eval["quality_score"] for eval in self.evaluation_history)
-        successful_tasks = sum(1 for eval in self.evaluation_history if eval["success"])
+        total_quality = self.state.counter("evaluations:quality_sum")
+        successful_tasks = self.state.counter("evaluations:success")
         
         return {
             "total_evaluations": total_evaluations,
@@ -260,20 +376,43 @@ class ReflectionAgent(BaseAgent):
             "top_recommendations": self._get_top_recommendations()
         }
     
-    def _get_common_issues(self) -> List[str]:
+    def _get_common_issues(self, limit: int = 5) -> List[str]:
         """Get most common issues from evaluations"""
-        issue_counts = {}
-        for eval in self.evaluation_history:
-            for issue in eval["issues_identified"]:
-                issue_counts[issue] = issue_counts.get(issue, 0) + 1
-        
-        return sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        issue_counts = self.state.counters("evaluations:issue:")
+        return sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
     
-    def _get_top_recommendations(self) -> List[str]:
+    def _get_top_recommendations(self, limit: int = 5) -> List[str]:
         """Get most common recommendations from evaluations"""
-        rec_counts = {}
-        for eval in self.evaluation_history:
-            for rec in eval["recommendations"]:
-                rec_counts[rec] = rec_counts.get(rec, 0) + 1
+        rec_counts = self.state.counters("evaluations:recommendation:")
+        return sorted(rec_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+    
+    def get_evaluation_rollups(self, granularity: str = "minute", dimension: str = "task_type") -> Dict[str, Dict[str, Any]]:
+        """
+        Per-bucket evaluation stats for the retained window, keyed by bucket start (UTC ISO time)
+        and then by task type or platform.
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity} (expected one of {', '.join(ROLLUP_GRANULARITIES)})")
+        if dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension} (expected one of {', '.join(ROLLUP_DIMENSIONS)})")
+        
+        raw: Dict[int, Dict[str, Dict[str, int]]] = {}
+        for name, value in self.state.counters(f"evaluations:rollup:{granularity}:").items():
+            bucket, name_dimension, rest = name.split(":", 2)
+            if name_dimension != dimension:
+                continue
+            key, metric = rest.rsplit(":", 1)
+            raw.setdefault(int(bucket), {}).setdefault(key, {})[metric] = value
         
-        return sorted(rec_counts.items(), key=lambda x: x[1], reverse=True)[:5]
\ No newline at end of file
+        rollups = {}
+        for bucket in sorted(raw):
+            started = datetime.fromtimestamp(bucket, timezone.utc).isoformat()
+            rollups[started] = {
+                key: {
+                    "count": stats.get("count", 0),
+                    "average_quality": stats.get("quality_sum", 0) / stats["count"] if stats.get("count") else 0,
+                    "success_rate": stats.get("success", 0) / stats["count"] * 100 if stats.get("count") else 0,
+                }
+                for key, stats in raw[bucket].items()
+            }
+        return rollups
@@ -0,0 +1,267 @@
+"""
+Data-driven persona registry.
+
+Personas are declared in JSON files (agents/persona_definitions/<persona_id>.json
+plus any directories listed in PERSONA_DEFINITIONS_PATH) with their prompt,
+intent patterns, task templates and capabilities. Only the directory listing is
+read up front: a definition is parsed, and its prompt and intent matcher
+compiled, the first time that persona is used, and agents are instantiated
+lazily. reload() re-processes only the files that were added, changed or
+removed, so the other personas keep their compiled state and instances.
+"""
+import json
+import os
+import sys
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from agents.base import PersonaAgent, Task, TaskPriority
+from agents.intents import intent_engine
+from agents.prompts import register_prompt, unregister_prompt
+
+DEFINITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "persona_definitions")
+
+def _fill(value: Any, message: str) -> Any:
+    """Substitute {message} in every string of a payload template"""
+    if isinstance(value, str):
+        return value.replace("{message}", message)
+    if isinstance(value, dict):
+        return {key: _fill(item, message) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, message) for item in value]
+    return value
+
+@dataclass
+class TaskTemplate:
+    """Task created when all intents in `when` are detected in a message"""
+    when: List[str]
+    task_type: str
+    description: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    priority: TaskPriority = TaskPriority.MEDIUM
+
+    def build(self, user_message: str, created_by: str) -> Task:
+        """Instantiate the template for one user message"""
+        return Task(
+            id=str(uuid.uuid4()),
+            description=self.description,
+            task_type=self.task_type,
+            payload=_fill(self.payload, user_message),
+            priority=self.priority,
+            created_by=created_by
+        )
+
+@dataclass
+class PersonaDefinition:
+    """Declarative description of a persona agent"""
+    id: str
+    name: str
+    description: str
+    personality_type: str
+    capabilities: List[str] = field(default_factory=lambda: ["conversation"])
+    intent_patterns: Dict[str, List[str]] = field(default_factory=dict)
+    intent_exemplars: Dict[str, List[str]] = field(default_factory=dict)
+    intent_thresholds: Dict[str, float] = field(default_factory=dict)
+    tasks: List[TaskTemplate] = field(default_factory=list)
+    fallback_response: Optional[str] = None
+    error_response: Optional[str] = None
+    system_prompt: Optional[Any] = None
+    class_name: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, persona_id: str, data: Dict[str, Any]) -> "PersonaDefinition":
+        """Build a definition from parsed JSON"""
+        missing = [key for key in ("name", "description", "personality_type") if key not in data]
+        if missing:
+            raise ValueError(f"Persona definition '{persona_id}' is missing {', '.join(missing)}")
+
+        tasks = [
+            TaskTemplate(
+                when=list(template["when"]),
+                task_type=template["task_type"],
+                description=template["description"],
+                payload=template.get("payload", {}),
+                priority=TaskPriority(template.get("priority", "medium"))
+            )
+            for template in data.get("tasks", [])
+        ]
+        known = {key for key in cls.__dataclass_fields__ if key not in ("id", "tasks")}
+        return cls(id=persona_id, tasks=tasks, **{key: value for key, value in data.items() if key in known})
+
+    @classmethod
+    def from_file(cls, path: str) -> "PersonaDefinition":
+        """Load a definition; the persona id is the file name without extension"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls.from_dict(os.path.splitext(os.path.basename(path))[0], data)
+
+    def default_class_name(self) -> str:
+        """e.g. it_support -> ItSupportAgent"""
+        return self.class_name or "".join(part.capitalize() for part in self.id.split("_")) + "Agent"
+
+class PersonaRegistry:
+    """Lazily loads persona definitions and instantiates persona agents on first use"""
+
+    def __init__(self, directories: Optional[List[str]] = None):
+        if directories is None:
+            directories = [DEFINITIONS_DIR]
+            extra = os.getenv("PERSONA_DEFINITIONS_PATH", "")
+            directories += [path for path in extra.split(os.pathsep) if path]
+        self.directories = directories
+        # persona_id -> (path, mtime); later directories override earlier ones
+        self._files: Optional[Dict[str, Tuple[str, float]]] = None
+        self._definitions: Dict[str, PersonaDefinition] = {}
+        self._classes: Dict[str, Type[PersonaAgent]] = {}
+        self._custom_classes: Dict[str, Type[PersonaAgent]] = {}
+        self._instances: Dict[str, PersonaAgent] = {}
+        self._configurators: List[Callable[[PersonaAgent], None]] = []
+        self._lock = threading.RLock()
+
+    def _scan(self) -> Dict[str, Tuple[str, float]]:
+        """List the definition files without parsing them"""
+        files: Dict[str, Tuple[str, float]] = {}
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.endswith(".json"):
+                    files[entry.name[:-len(".json")]] = (entry.path, entry.stat().st_mtime)
+        return files
+
+    def _index(self) -> Dict[str, Tuple[str, float]]:
+        if self._files is None:
+            with self._lock:
+                if self._files is None:
+                    self._files = self._scan()
+        return self._files
+
+    def ids(self) -> List[str]:
+        """All known persona ids (nothing is parsed or instantiated)"""
+        return sorted(set(self._index()) | set(self._custom_classes))
+
+    def __contains__(self, persona_id: str) -> bool:
+        return persona_id in self._custom_classes or persona_id in self._index()
+
+    def register_class(self, persona_id: str, persona_class: Type[PersonaAgent]):
+        """Register a persona implemented in Python (instantiated lazily like the others)"""
+        with self._lock:
+            self._custom_classes[persona_id] = persona_class
+            self._instances.pop(persona_id, None)
+
+    def add_configurator(self, configure: Callable[[PersonaAgent], None]):
+        """Call configure(agent) on every persona agent when it is instantiated"""
+        with self._lock:
+            self._configurators.append(configure)
+            for agent in self._instances.values():
+                configure(agent)
+
+    def get_definition(self, persona_id: str) -> PersonaDefinition:
+        """Parse and compile a persona definition (once, until its file changes)"""
+        definition = self._definitions.get(persona_id)
+        if definition is not None:
+            return definition
+        with self._lock:
+            definition = self._definitions.get(persona_id)
+            if definition is None:
+                if persona_id not in self._index():
+                    raise KeyError(f"Unknown persona: {persona_id}")
+                definition = PersonaDefinition.from_file(self._index()[persona_id][0])
+                if definition.system_prompt:
+                    register_prompt(definition.personality_type, definition.system_prompt)
+                intent_engine.unregister_scope(persona_id)
+                intent_engine.register_scope(persona_id, definition.intent_patterns)
+                self._definitions[persona_id] = definition
+            return definition
+
+    def persona_class(self, persona_id: str) -> Type[PersonaAgent]:
+        """Return the agent class of a persona, building it from its definition if needed"""
+        if persona_id in self._custom_classes:
+            return self._custom_classes[persona_id]
+        persona_class = self._classes.get(persona_id)
+        if persona_class is not None:
+            return persona_class
+        with self._lock:
+            persona_class = self._classes.get(persona_id)
+            if persona_class is None:
+                # Imported here because agents.personas resolves its legacy class names through this registry
+                from agents.personas import DefinedPersonaAgent
+                definition = self.get_definition(persona_id)
+                persona_class = type(definition.default_class_name(), (DefinedPersonaAgent,), {
+                    "__doc__": f"{definition.name} persona built from its definition",
+                    "__module__": DefinedPersonaAgent.__module__,
+                    "definition": definition,
+                    "intent_patterns": definition.intent_patterns,
+                    "intent_exemplars": definition.intent_exemplars,
+                    "intent_thresholds": definition.intent_thresholds,
+                })
+                self._classes[persona_id] = persona_class
+            return persona_class
+
+    def get(self, persona_id: str) -> PersonaAgent:
+        """Return the persona agent, instantiating it on first use"""
+        agent = self._instances.get(persona_id)
+        if agent is not None:
+            return agent
+        with self._lock:
+            agent = self._instances.get(persona_id)
+            if agent is None:
+                agent = self.persona_class(persona_id)()
+                for configure in self._configurators:
+                    configure(agent)
+                self._instances[persona_id] = agent
+            return agent
+
+    def describe(self, persona_id: str) -> Dict[str, Any]:
+        """Id, name, description and capabilities of a persona"""
+        if persona_id in self._custom_classes:
+            agent = self.get(persona_id)
+            return {"id": persona_id, "name": agent.name, "description": agent.description,
+                    "capabilities": agent.get_capabilities()}
+        definition = self.get_definition(persona_id)
+        return {"id": persona_id, "name": definition.name, "description": definition.description,
+                "capabilities": list(definition.capabilities)}
+
+    def loaded(self) -> List[str]:
+        """Ids of the personas that have been instantiated"""
+        return sorted(self._instances)
+
+    def _forget(self, persona_id: str):
+        """Drop the compiled state, prompt and instance of one file-backed persona"""
+        definition = self._definitions.pop(persona_id, None)
+        if definition is not None and definition.system_prompt:
+            # Another loaded persona with the same personality type keeps serving its own prompt
+            key = definition.personality_type.lower()
+            others = [d for d in self._definitions.values() if d.system_prompt and d.personality_type.lower() == key]
+            if others:
+                register_prompt(others[-1].personality_type, others[-1].system_prompt)
+            else:
+                unregister_prompt(definition.personality_type)
+        self._classes.pop(persona_id, None)
+        self._instances.pop(persona_id, None)
+        intent_engine.unregister_scope(persona_id)
+        # Only touch the vector classifier if something already imported it (keeps NumPy optional)
+        classifier_module = sys.modules.get("agents.intent_classifier")
+        if classifier_module is not None:
+            classifier_module.get_intent_classifier().unregister_scope(persona_id)
+
+    def reload(self) -> Dict[str, List[str]]:
+        """
+        Rescan the definition directories.
+        Only added, changed (by mtime) or removed files are re-processed; changed personas are
+        re-parsed and re-instantiated on next use.
+        """
+        with self._lock:
+            previous = self._index()
+            current = self._scan()
+            added = sorted(set(current) - set(previous))
+            removed = sorted(set(previous) - set(current))
+            changed = sorted(pid for pid in set(current) & set(previous) if current[pid] != previous[pid])
+            for persona_id in removed + changed:
+                self._forget(persona_id)
+            self._files = current
+        return {"added": added, "changed": changed, "removed": removed}
+
+# Registry shared by the backend and the legacy persona class names
+persona_registry = PersonaRegistry()
@@ -0,0 +1,297 @@
+"""
+State backends for tasks, conversation sessions, counters and evaluations.
+
+InMemoryStateBackend keeps everything in the current process (the default,
+matching the previous behaviour). SQLiteStateBackend stores the same data in a
+local SQLite database in WAL mode, so every uvicorn worker on the machine sees
+the same task statuses, histories and metrics:
+
+    STATE_BACKEND=sqlite STATE_SQLITE_PATH=./state.db uvicorn backend.main:app --workers 4
+
+Values are JSON-compatible dicts; tasks are (de)serialized with task_to_dict /
+task_from_dict and stored as snapshots, so save a task again after it changes.
+"""
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from agents.base import Task
+from agents.codec import task_to_dict, task_from_dict
+
+class StateBackend(ABC):
+    """
+    Storage primitives (keyed records, append-only lists, counters) and the
+    task/session/evaluation operations the agents and the API build on them.
+    """
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: Dict[str, Any]):
+        """Insert or replace a record"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return a record or None"""
+
+    @abstractmethod
+    def values(self, namespace: str) -> List[Dict[str, Any]]:
+        """All records of a namespace in insertion order"""
+
+    @abstractmethod
+    def append(self, name: str, value: Dict[str, Any]):
+        """Append to a list"""
+
+    @abstractmethod
+    def items(self, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The list's items in order (only the last `limit` when given)"""
+
+    @abstractmethod
+    def trim(self, name: str, keep: int) -> List[Dict[str, Any]]:
+        """Remove all but the last `keep` items of a list and return the removed ones, oldest first"""
+
+    @abstractmethod
+    def incr(self, name: str, amount: int = 1) -> int:
+        """Atomically add to a counter and return the new value"""
+
+    @abstractmethod
+    def counter(self, name: str) -> int:
+        """Current value of a counter (0 if never incremented)"""
+
+    @abstractmethod
+    def counters(self, prefix: str) -> Dict[str, int]:
+        """All counters whose name starts with prefix, keyed by the rest of the name"""
+
+    @abstractmethod
+    def clear_counters(self, prefix: str):
+        """Delete every counter whose name starts with prefix"""
+
+    def incr_many(self, amounts: Dict[str, int]):
+        """Add to several counters at once (atomically where the backend supports it)"""
+        for name, amount in amounts.items():
+            self.incr(name, amount)
+
+    def close(self):
+        """Release resources held by the backend"""
+
+    # Tasks
+    def save_task(self, task: Task):
+        """Store a snapshot of a task under its id"""
+        self.put("tasks", task.id, task_to_dict(task))
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """Return the latest snapshot of a task or None"""
+        data = self.get("tasks", task_id)
+        return task_from_dict(data) if data is not None else None
+
+    def list_tasks(self) -> List[Task]:
+        """All stored tasks in creation order"""
+        return [task_from_dict(data) for data in self.values("tasks")]
+
+    # Conversation sessions
+    def append_history(self, session_id: str, entry: Dict[str, Any]):
+        """Append a turn to a conversation session"""
+        self.append(f"session:{session_id}", entry)
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """All turns of a conversation session"""
+        return self.items(f"session:{session_id}")
+
+    # Evaluations
+    def add_evaluation(self, evaluation: Dict[str, Any]):
+        """Store a reflection evaluation"""
+        self.append("evaluations", evaluation)
+
+    def list_evaluations(self) -> List[Dict[str, Any]]:
+        """All reflection evaluations, oldest first"""
+        return self.items("evaluations")
+
+class InMemoryStateBackend(StateBackend):
+    """Process-local state (one worker only)"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lists: Dict[str, deque] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._records.setdefault(namespace, {})[key] = value
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(namespace, {}).get(key)
+
+    def values(self, namespace: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records.get(namespace, {}).values())
+
+    def append(self, name: str, value: Dict[str, Any]):
+        with self._lock:
+            self._lists.setdefault(name, deque()).append(value)
+
+    def items(self, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = self._lists.get(name, ())
+            start = max(len(items) - limit, 0) if limit else 0
+            return list(islice(items, start, None))
+
+    def trim(self, name: str, keep: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = self._lists.get(name, deque())
+            return [items.popleft() for _ in range(max(len(items) - keep, 0))]
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            return self._counters[name]
+
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def counters(self, prefix: str) -> Dict[str, int]:
+        with self._lock:
+            return {name[len(prefix):]: value for name, value in self._counters.items() if name.startswith(prefix)}
+
+    def clear_counters(self, prefix: str):
+        with self._lock:
+            for name in [name for name in self._counters if name.startswith(prefix)]:
+                del self._counters[name]
+
+    def incr_many(self, amounts: Dict[str, int]):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+class SQLiteStateBackend(StateBackend):
+    """State shared by every process on the machine through one SQLite database in WAL mode"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS records (
+            namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+            PRIMARY KEY (namespace, key)
+        );
+        CREATE TABLE IF NOT EXISTS lists (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, value TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS lists_by_name ON lists (name, id);
+        CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        # One connection per thread; WAL lets readers proceed while another process writes
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any]):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO records (namespace, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+                (namespace, key, json.dumps(value))
+            )
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT value FROM records WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def values(self, namespace: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT value FROM records WHERE namespace = ? ORDER BY rowid", (namespace,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def append(self, name: str, value: Dict[str, Any]):
+        with self._connection() as connection:
+            connection.execute("INSERT INTO lists (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def items(self, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        if limit:
+            rows = self._connection().execute(
+                "SELECT value FROM (SELECT id, value FROM lists WHERE name = ? ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (name, limit)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT value FROM lists WHERE name = ? ORDER BY id", (name,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def trim(self, name: str, keep: int) -> List[Dict[str, Any]]:
+        with self._connection() as connection:
+            rows = connection.execute(
+                "DELETE FROM lists WHERE name = ? AND id <= "
+                "(SELECT id FROM lists WHERE name = ? ORDER BY id DESC LIMIT 1 OFFSET ?) RETURNING id, value",
+                (name, name, keep)
+            ).fetchall()
+        return [json.loads(value) for _, value in sorted(rows)]
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                (name, amount)
+            )
+            return connection.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def counter(self, name: str) -> int:
+        row = self._connection().execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def counters(self, prefix: str) -> Dict[str, int]:
+        rows = self._connection().execute(
+            "SELECT name, value FROM counters WHERE substr(name, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+        return {name[len(prefix):]: value for name, value in rows}
+
+    def clear_counters(self, prefix: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM counters WHERE substr(name, 1, ?) = ?", (len(prefix), prefix))
+
+    def incr_many(self, amounts: Dict[str, int]):
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                list(amounts.items())
+            )
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+def state_backend_from_env() -> StateBackend:
+    """Build the backend selected by STATE_BACKEND (memory or sqlite) and STATE_SQLITE_PATH"""
+    kind = os.getenv("STATE_BACKEND", "memory").lower()
+    if kind == "memory":
+        return InMemoryStateBackend()
+    if kind == "sqlite":
+        return SQLiteStateBackend(os.getenv("STATE_SQLITE_PATH", "agent_state.db"))
+    raise ValueError(f"Unknown STATE_BACKEND: {kind} (expected memory or sqlite)")
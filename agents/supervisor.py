@@ -2,8 +2,42 @@
 Hierarchical supervisor agent that routes tasks to platform supervisors.
 """
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from agents.base import SupervisorAgent, Task, AgentResponse, TaskStatus, PlatformAgent
+from agents.singleflight import SingleFlight, stable_key
+from agents.state import StateBackend, InMemoryStateBackend
+from agents.history import TaskHistory
+from agents.metrics import tasks_in_flight
+
+# Task type -> platform that executes it
+TASK_PLATFORM_MAP = {
+    # GitHub-related tasks
+    'github_create_issue': 'github',
+    'github_create_pr': 'github',
+    'github_list_repos': 'github',
+    'github_update_repo': 'github',
+    'code_review': 'github',
+    'repository_management': 'github',
+
+    # Email-related tasks
+    'send_email': 'gmail',
+    'check_email': 'gmail',
+    'schedule_email': 'gmail',
+    'email_followup': 'gmail',
+
+    # Jira-related tasks
+    'create_ticket': 'jira',
+    'update_ticket': 'jira',
+    'assign_ticket': 'jira',
+    'track_progress': 'jira',
+    'project_management': 'jira',
+
+    # Calendar-related tasks
+    'schedule_meeting': 'calendar',
+    'check_availability': 'calendar',
+    'send_invite': 'calendar',
+    'reschedule_meeting': 'calendar',
+}
 
 class HierarchicalSupervisor(SupervisorAgent):
     """
@@ -11,14 +45,22 @@ class HierarchicalSupervisor(SupervisorAgent):
     and routes them to appropriate platform supervisors.
     """
     
-    def __init__(self):
+    def __init__(self, coalesce_identical_tasks: bool = False, state: Optional[StateBackend] = None,
+                 history_capacity: int = 1000, history_archive: Optional[Callable[[Task], None]] = None):
         super().__init__(
             agent_id="hierarchical_supervisor",
             name="Hierarchical Supervisor",
             description="Routes tasks to appropriate platform supervisors and orchestrates workflows"
         )
         self.platform_agents: Dict[str, PlatformAgent] = {}
-        self.task_history: List[Task] = []
+        # Task history lives in the state backend so every worker process sees the same history;
+        # only the last history_capacity tasks are kept, older ones go to history_archive
+        self.state = state or InMemoryStateBackend()
+        self.task_history = TaskHistory(history_capacity, archive=history_archive, state=self.state)
+        # Opt-in: identical tasks (same type and payload) in flight at the same time share one platform call.
+        # Only safe for idempotent workloads; two real send_email tasks with the same payload would send one email
+        self.coalesce_identical_tasks = coalesce_identical_tasks
+        self.singleflight = SingleFlight()
         
     def register_platform_agent(self, platform_name: str, agent: PlatformAgent):
         """Register a platform-specific supervisor agent"""
@@ -31,8 +73,33 @@ class HierarchicalSupervisor(SupervisorAgent):
     
     def execute_task(self, task: Task) -> AgentResponse:
         """Route task to appropriate platform agent"""
-        self.task_history.append(task)
+        tasks_in_flight.inc(task.task_type)
+        try:
+            return self._execute(task)
+        finally:
+            tasks_in_flight.dec(task.task_type)
+            # Recorded once routing is done so the snapshot carries the task's final status
+            self.task_history.record(task)
+    
+    def _execute(self, task: Task) -> AgentResponse:
+        """Route a task, collapsing identical concurrent tasks into one execution"""
+        if not self.coalesce_identical_tasks:
+            return self._route_task(task)
+        
+        key = stable_key(task.task_type, task.payload)
+        (response, leader_task), shared = self.singleflight.do(key, lambda: (self._route_task(task), task))
+        
+        if shared:
+            # Mirror the outcome of the execution this task was collapsed into
+            task.assigned_agent = leader_task.assigned_agent
+            task.status = leader_task.status
+            task.result = leader_task.result
+            task.error_message = leader_task.error_message
         
+        return response
+    
+    def _route_task(self, task: Task) -> AgentResponse:
+        """Determine the platform for a task and hand it to that platform agent"""
         # Determine which platform should handle this task
         platform_name = self._determine_platform(task)
         
@@ -61,36 +128,7 @@ class HierarchicalSupervisor(SupervisorAgent):
     
     def _determine_platform(self, task: Task) -> Optional[str]:
         """Determine which platform should handle this task based on task type"""
-        platform_mappings = {
-            # GitHub-related tasks
-            'github_create_issue': 'github',
-            'github_create_pr': 'github',
-            'github_list_repos': 'github',
-            'github_update_repo': 'github',
-            'code_review': 'github',
-            'repository_management': 'github',
-            
-            # Email-related tasks
-            'send_email': 'gmail',
-            'check_email': 'gmail',
-            'schedule_email': 'gmail',
-            'email_followup': 'gmail',
-            
-            # Jira-related tasks
-            'create_ticket': 'jira',
-            'update_ticket': 'jira',
-            'assign_ticket': 'jira',
-            'track_progress': 'jira',
-            'project_management': 'jira',
-            
-            # Calendar-related tasks
-            'schedule_meeting': 'calendar',
-            'check_availability': 'calendar',
-            'send_invite': 'calendar',
-            'reschedule_meeting': 'calendar',
-        }
-        
-        return platform_mappings.get(task.task_type)
+        return TASK_PLATFORM_MAP.get(task.task_type)
     
     def orchestrate_workflow(self, tasks: List[Task], execution_mode: str = "serial") -> List[AgentResponse]:
         """
@@ -133,9 +171,13 @@ class HierarchicalSupervisor(SupervisorAgent):
             
         return subtasks
     
-    def get_task_history(self) -> List[Task]:
-        """Get history of all tasks processed"""
-        return self.task_history.copy()
+    def get_task_history(self, limit: Optional[int] = None) -> List[Task]:
+        """Get the most recent processed tasks (the whole bounded window by default), oldest first"""
+        return self.task_history.window(limit)
+    
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """Get how many concurrent identical tasks were collapsed into shared executions"""
+        return self.singleflight.get_stats()
     
     def get_platform_status(self) -> Dict[str, bool]:
         """Get status of all registered platform agents"""
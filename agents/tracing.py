@@ -0,0 +1,352 @@
+"""
+Lightweight per-stage tracing.
+
+Spans nest through a context variable, so everything called inside a span
+(persona -> supervisor -> platform -> sub-agent, the LLM call, the webcam tool,
+reflection) becomes its child. Work handed to another thread keeps its trace
+through Task.trace_parent, a W3C traceparent string captured when the task is
+created. Finished spans go to exporters: an in-memory ring buffer rendered as
+Chrome trace JSON (chrome://tracing, Perfetto) and/or an OTLP/HTTP JSON
+exporter posting to a local collector.
+
+When tracing is disabled (the default) span() returns a shared no-op span and
+traced() calls straight through, so instrumented code pays one attribute check.
+
+    with tracer.span("conversation", persona="doctor") as span:
+        span.set_attribute("tasks", 2)
+"""
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_ids = random.Random()
+
+def _new_id(bits: int) -> int:
+    return _ids.getrandbits(bits) or 1
+
+def parse_traceparent(traceparent: Optional[str]):
+    """(trace_id, span_id) from a "00-<trace>-<span>-<flags>" header, None when malformed"""
+    if not traceparent:
+        return None
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        return int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+
+class Span:
+    """A timed operation; use as a context manager"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes",
+                 "error", "thread_id", "_tracer", "_token", "_started")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._tracer = tracer
+        self._token = None
+        current = _current.get()
+        remote = parse_traceparent(parent) if current is None else None
+        if current is not None:
+            self.trace_id, self.parent_id = current.trace_id, current.span_id
+        elif remote is not None:
+            self.trace_id, self.parent_id = remote
+        else:
+            self.trace_id, self.parent_id = _new_id(128), None
+        self.span_id = _new_id(64)
+        self.start_ns = self.end_ns = 0
+        self.thread_id = 0
+        self._started = 0
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id:032x}-{self.span_id:016x}-01"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self._tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": f"{self.trace_id:032x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id else None,
+            "start_ns": self.start_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+class _NoopSpan:
+    """Returned by span() while tracing is disabled"""
+
+    __slots__ = ()
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters"""
+
+    def __init__(self, enabled: bool = False, exporters: Optional[List[Any]] = None):
+        self.enabled = enabled
+        self.exporters = list(exporters or [])
+
+    def configure(self, enabled: bool, exporters: Optional[List[Any]] = None):
+        """Switch tracing on or off, replacing the exporters"""
+        self.shutdown()
+        self.exporters = list(exporters or [])
+        self.enabled = enabled
+
+    def span(self, name: str, parent: Optional[str] = None, **attributes):
+        """Child of the current span, else of the parent traceparent, else a new trace"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, parent, attributes)
+
+    def current(self) -> Optional[Span]:
+        return _current.get()
+
+    def exporter(self, kind: type):
+        """The first configured exporter of the given class, or None"""
+        return next((exporter for exporter in self.exporters if isinstance(exporter, kind)), None)
+
+    def _finish(self, span: Span):
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def shutdown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+tracer = Tracer()
+
+def current_traceparent() -> Optional[str]:
+    """traceparent of the active span (None when tracing is off or no span is open)"""
+    if not tracer.enabled:
+        return None
+    span = _current.get()
+    return span.traceparent if span is not None else None
+
+def traced(name: str, **attributes) -> Callable:
+    """Decorator running the function inside a span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Exporters
+
+class ChromeTraceExporter:
+    """Keeps the most recent spans in memory; renders them in the Chrome trace event format"""
+
+    def __init__(self, capacity: int = 10000, path: Optional[str] = None):
+        self.path = path
+        self._spans: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [span for span in spans if f"{span.trace_id:032x}" == trace_id]
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def to_chrome_trace(self, trace_id: Optional[str] = None) -> Dict[str, Any]:
+        """Complete ("X") events with microsecond timestamps, one row per thread"""
+        pid = os.getpid()
+        events = []
+        for span in self.spans(trace_id):
+            args = {**span.attributes, "trace_id": f"{span.trace_id:032x}", "span_id": f"{span.span_id:016x}"}
+            if span.parent_id:
+                args["parent_id"] = f"{span.parent_id:016x}"
+            if span.error:
+                args["error"] = span.error
+            events.append({"name": span.name, "cat": span.name.split(".")[0], "ph": "X", "pid": pid,
+                           "tid": span.thread_id, "ts": span.start_ns / 1000,
+                           "dur": (span.end_ns - span.start_ns) / 1000, "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+    def shutdown(self):
+        if self.path:
+            self.write(self.path)
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class OTLPExporter:
+    """Batches spans on a background thread and posts them as OTLP/HTTP JSON"""
+
+    def __init__(self, endpoint: str = "http://localhost:4318/v1/traces", service_name: str = "ai-agent-system",
+                 batch_size: int = 512, flush_interval: float = 2.0, max_queue: int = 10000, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._stats = {"exported": 0, "dropped": 0, "failed_batches": 0}
+        self._worker = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._worker.start()
+
+    def export(self, span: Span):
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._stats["dropped"] += 1
+                return
+            self._queue.append(span)
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        """ExportTraceServiceRequest in the OTLP JSON encoding"""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "agents.tracing"},
+                "spans": [{
+                    "traceId": f"{span.trace_id:032x}",
+                    "spanId": f"{span.span_id:016x}",
+                    **({"parentSpanId": f"{span.parent_id:016x}"} if span.parent_id else {}),
+                    "name": span.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                } for span in spans],
+            }],
+        }]}
+
+    def _take(self) -> List[Span]:
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _post(self, batch: List[Span]):
+        import requests
+        try:
+            response = requests.post(self.endpoint, json=self.to_otlp(batch), timeout=self.timeout)
+            ok = response.status_code < 300
+        except Exception:
+            ok = False
+        with self._cond:
+            if ok:
+                self._stats["exported"] += len(batch)
+            else:
+                self._stats["failed_batches"] += 1
+                self._stats["dropped"] += len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._queue) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                batch = self._take()
+                stopped = self._stopped
+            if batch:
+                self._post(batch)
+            elif stopped:
+                return
+
+    def flush(self, timeout: float = 5.0):
+        """Wake the worker and wait until the queue is empty"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify()
+        while self._queue and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {**self._stats, "queued": len(self._queue)}
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._worker.join(self.timeout)
+
+def configure_from_env() -> Tracer:
+    """Set up the global tracer from TRACING_* environment variables"""
+    if os.getenv("TRACING_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        tracer.configure(False)
+        return tracer
+    exporters = []
+    for kind in os.getenv("TRACING_EXPORTERS", "chrome").split(","):
+        kind = kind.strip()
+        if kind == "chrome":
+            exporters.append(ChromeTraceExporter(int(os.getenv("TRACING_BUFFER_SIZE", "10000")),
+                                                 os.getenv("TRACING_CHROME_PATH") or None))
+        elif kind == "otlp":
+            exporters.append(OTLPExporter(os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"),
+                                          os.getenv("TRACING_SERVICE_NAME", "ai-agent-system")))
+        elif kind:
+            raise ValueError(f"Unknown tracing exporter: {kind} (expected chrome or otlp)")
+    tracer.configure(True, exporters)
+    return tracer
@@ -0,0 +1,195 @@
+"""
+Per-turn timing for the voice loop.
+
+A VoiceTurn records how long each stage of one turn took:
+
+    listening        waiting for and capturing speech (not part of the response latency)
+    endpointing      silence the recognizer waits for before it ends the phrase
+    audio_encode     WAV -> MP3 conversion of the recording
+    stt_upload       sending the audio to the STT API (includes inference unless the API reports it)
+    stt_inference    server-side transcription time, when the response reports it
+    llm_tools        tool calls made by the agent (webcam capture and vision)
+    llm_generation   the rest of the agent call
+    tts_synthesis    text-to-speech request and download
+    playback         playing the reply
+
+Time to first audio runs from the end of the user's speech (including the
+endpointing wait) to the moment playback starts. Finished turns go to a
+rolling VoiceTimingLog with percentile summaries and JSONL export.
+
+    turn = voice_timing_log.start_turn("doctor")
+    with turn.active():
+        with turn.stage("audio_encode"):
+            ...
+    voice_timing_log.finish(turn)
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+STAGES = ("listening", "endpointing", "audio_encode", "stt_upload", "stt_inference",
+          "llm_tools", "llm_generation", "tts_synthesis", "playback")
+
+_current_turn: contextvars.ContextVar[Optional["VoiceTurn"]] = contextvars.ContextVar("voice_turn", default=None)
+
+class VoiceTurn:
+    """Stage durations (seconds) of one voice turn"""
+
+    def __init__(self, personality: str = "general assistant", clock: Callable[[], float] = time.perf_counter):
+        self.personality = personality
+        self.clock = clock
+        self.timestamp = time.time()
+        self.started = clock()
+        self.stages: Dict[str, float] = {}
+        self.speech_ended: Optional[float] = None
+        self.first_audio: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator["VoiceTurn"]:
+        started = self.clock()
+        try:
+            yield self
+        finally:
+            self.add(name, self.clock() - started)
+
+    @contextmanager
+    def llm(self) -> Iterator["VoiceTurn"]:
+        """Time an agent call, splitting out the tool time recorded inside it"""
+        started = self.clock()
+        tools_before = self.stages.get("llm_tools", 0.0)
+        try:
+            yield self
+        finally:
+            tools = self.stages.get("llm_tools", 0.0) - tools_before
+            self.add("llm_generation", max(self.clock() - started - tools, 0.0))
+
+    @contextmanager
+    def active(self) -> Iterator["VoiceTurn"]:
+        """Make this the turn that stage() helpers deeper in the call stack record into"""
+        token = _current_turn.set(self)
+        try:
+            yield self
+        finally:
+            _current_turn.reset(token)
+
+    def mark_speech_end(self):
+        self.speech_ended = self.clock()
+
+    def mark_first_audio(self):
+        if self.first_audio is None:
+            self.first_audio = self.clock()
+
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        if self.speech_ended is None or self.first_audio is None:
+            return None
+        return self.stages.get("endpointing", 0.0) + self.first_audio - self.speech_ended
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "personality": self.personality,
+            "stages": dict(self.stages),
+            "time_to_first_audio": self.time_to_first_audio,
+            "total": (self.finished or self.clock()) - self.started,
+            "error": self.error,
+        }
+
+def current_turn() -> Optional[VoiceTurn]:
+    return _current_turn.get()
+
+@contextmanager
+def voice_stage(name: str) -> Iterator[None]:
+    """Record into the active turn's stage; a no-op outside a voice turn"""
+    turn = _current_turn.get()
+    if turn is None:
+        yield
+        return
+    with turn.stage(name):
+        yield
+
+def voice_timed(name: str) -> Callable:
+    """Decorator recording the function's run time into the active turn's stage"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with voice_stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _percentile(ordered: List[float], q: float) -> float:
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+class VoiceTimingLog:
+    """Rolling log of finished turns, optionally appended to a JSONL file as they finish"""
+
+    def __init__(self, capacity: int = 500, path: Optional[str] = None):
+        self.path = path
+        self._records: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def start_turn(self, personality: str = "general assistant") -> VoiceTurn:
+        return VoiceTurn(personality)
+
+    def finish(self, turn: VoiceTurn, error: Optional[str] = None) -> Dict[str, Any]:
+        turn.finished = turn.clock()
+        turn.error = error
+        record = turn.to_dict()
+        with self._lock:
+            self._records.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> Dict[str, Any]:
+        """p50/p95/p99/mean per stage, time to first audio and turn total, in seconds"""
+        records = self.records()
+        series: Dict[str, List[float]] = {}
+        for record in records:
+            for stage, seconds in record["stages"].items():
+                series.setdefault(stage, []).append(seconds)
+            for key in ("time_to_first_audio", "total"):
+                if record[key] is not None:
+                    series.setdefault(key, []).append(record[key])
+        order = list(STAGES) + sorted(set(series) - set(STAGES) - {"time_to_first_audio", "total"}) + \
+            ["time_to_first_audio", "total"]
+        summary = {}
+        for name in order:
+            values = sorted(series.get(name, []))
+            if values:
+                summary[name] = {"count": len(values), "p50": _percentile(values, 50), "p95": _percentile(values, 95),
+                                 "p99": _percentile(values, 99), "mean": sum(values) / len(values)}
+        return {"turns": len(records), "stages": summary}
+
+    def export_jsonl(self, path: str) -> str:
+        """Write the turns currently in the log to path, one JSON object per line"""
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records():
+                f.write(json.dumps(record) + "\n")
+        return path
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+voice_timing_log = VoiceTimingLog(int(os.getenv("VOICE_TIMING_LOG_SIZE", "500")), os.getenv("VOICE_TIMING_JSONL"))
@@ -1,180 +1,195 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
 from dotenv import load_dotenv
-from tools import analyze_image_with_query
+from typing import Any, Dict, Optional, Tuple
+from tools import analyze_image_with_query, current_frame
+from agents.cache import ResponseCache
+from agents.cassette import cassette, recorded
+from agents.lazy import lazy
+from agents.prompts import get_system_prompt
+from agents.singleflight import SingleFlight, stable_key
+from agents.tracing import tracer
+from agents.metrics import llm_request_duration, llm_turn_duration
+from agents.multimodal import build_messages, needs_vision
+from agents.providers import chat_router, vision_router
 
 
 load_dotenv()
 
+# Opt-in response cache shared by every ask_agent call (see RESPONSE_CACHE_* env vars)
+response_cache: Optional[ResponseCache] = ResponseCache.from_env()
+
+# Collapses identical concurrent ask_agent runs (retries, double-clicks) into one LLM call
+ask_agent_flight = SingleFlight()
+
+# One multimodal model call instead of the ReAct tool loop (see agents/multimodal.py)
+multimodal_fast_path = os.getenv("MULTIMODAL_FAST_PATH", "0").lower() in ("1", "true", "yes")
+
 def generate_system_prompt(personality_type="general assistant"):
     """Generate a dynamic system prompt based on the specified personality type."""
-    
-    base_instructions = """
-        - BE ENTHUSIASTIC AND COMPLIMENTARY: Always look for opportunities to give genuine compliments and show enthusiasm about interacting with the person.
-        - FIRST and FOREMOST, figure out from the query asked whether it requires a look via the webcam to be answered, if yes call the analyze_image_with_query tool for it and proceed.
-        - PROACTIVELY USE WEBCAM: Even if not explicitly asked, consider using the webcam to give appearance-based compliments (clothing, style, professional appearance, etc.).
-        - Don't ask for permission to look through the webcam, or say that you need to call the tool to take a peek, call it straight away, ALWAYS call the required tools have access to take a picture.
-        - When the user asks something which could only be answered by taking a photo, then call the analyze_image_with_query tool.
-        - COMPLIMENT EVERYTHING: Look for things to compliment - clothing, hairstyle, background, professional appearance, confidence, smile, etc.
-        - SHOW GENUINE INTEREST: Ask follow-up questions about the person's interests, work, goals, and life to show you care about them as an individual.
-        - Always present the results (if they come from a tool) in a natural, witty, enthusiastic, and human-sounding way.
-        - BE UPBEAT: Use positive language, exclamation points when appropriate, and maintain an upbeat, encouraging tone.
-    """
-    
-    # Define personality-specific prompts with commanding professional behavior
-    personality_prompts = {
-        "doctor": f"""You are an enthusiastic, caring medical doctor who genuinely cares about patients' wellbeing! Take charge of the conversation with warmth and conduct a thorough medical assessment.
-        
-        ENTHUSIASTIC PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY greet the patient warmly and compliment something about them (their smile, positive energy, or professional appearance from webcam)
-        - Ask about their primary concern with genuine interest and empathy
-        - Follow up with diagnostic questions while maintaining an encouraging, supportive tone
-        - Compliment their responsibility for seeking medical care and taking charge of their health
-        - Ask about medical history, medications, allergies, and family history with genuine interest
-        - Provide preliminary assessment with encouraging words and positive reinforcement
-        - Always remind that this doesn't replace in-person medical consultation, but express excitement about helping them on their health journey
-        
-        BE ENTHUSIASTICALLY COMMANDING: Lead with medical authority but wrapped in warmth and encouragement. Show genuine interest in their complete wellbeing!
-        
-        {base_instructions}
-        Your role is to conduct enthusiastic, caring medical consultations that make patients feel valued and supported.""",
-        
-        "lawyer": f"""You are a confident, sharp legal counsel who genuinely appreciates intelligent clients! Take control of the discussion with enthusiasm and gather all necessary legal information.
-        
-        ENTHUSIASTIC PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY compliment the client's wisdom in seeking legal counsel and their professional appearance
-        - Ask about their legal issue with genuine interest and intellectual curiosity
-        - Probe for specific details while expressing appreciation for their thoroughness when they provide good information
-        - Compliment their preparation, documentation, or clear thinking when appropriate
-        - Assess potential legal strategies with excitement about building a strong case
-        - Provide legal analysis with confidence and enthusiasm about achieving positive outcomes
-        - Always clarify this is general guidance, not formal legal advice, but express genuine interest in their success
-        
-        BE ENTHUSIASTICALLY COMMANDING: Direct the consultation with legal authority while showing genuine appreciation for the client's intelligence and preparation!
-        
-        {base_instructions}
-        Your role is to conduct engaging legal consultations that make clients feel confident and well-represented.""",
-        
-        "receptionist": f"""You are a warm, efficient executive receptionist who genuinely enjoys helping people! Take charge of scheduling with enthusiasm and make everyone feel welcome.
-        
-        ENTHUSIASTIC PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY welcome them warmly and compliment something about their appearance or professional demeanor from the webcam
-        - Ask what service or appointment they need with genuine excitement to help
-        - Compliment their organization or preparation when gathering appointment details
-        - Show enthusiasm about their choice of services and express confidence in the quality they'll receive
-        - Coordinate schedules with efficiency while maintaining a positive, can-do attitude
-        - Provide clear information with genuine care about their experience
-        - Follow up with warm confirmation details and encouraging preparation instructions
-        
-        BE ENTHUSIASTICALLY COMMANDING: Manage interactions with the efficiency of a seasoned office manager while making everyone feel like a VIP!
-        
-        {base_instructions}
-        Your role is to manage reception duties with warmth and efficiency that makes everyone feel valued and well-cared for.""",
-        
-        "teacher": f"""You are an inspiring, passionate educator who absolutely loves helping students learn and grow! Take control of the learning process with genuine enthusiasm and excitement.
-        
-        ENTHUSIASTIC PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY compliment the student's appearance, studious look, or dedication to learning from the webcam
-        - Ask what subject/topic they want to learn with genuine excitement and curiosity
-        - Assess their current knowledge while praising their existing understanding and efforts
-        - Design interactive lessons with constant encouragement and positive reinforcement
-        - Celebrate correct answers enthusiastically and provide gentle, encouraging correction for mistakes
-        - Compliment their progress, thinking process, and effort throughout the session
-        - Show genuine interest in their academic goals and personal growth
-        - Adapt teaching methods while maintaining high energy and enthusiasm
-        
-        BE ENTHUSIASTICALLY COMMANDING: Lead educational sessions with the passion of an inspiring teacher who believes every student can succeed brilliantly!
-        
-        {base_instructions}
-        Your role is to conduct inspiring educational sessions that make students feel capable, valued, and excited about learning.""",
-        
-        "therapist": f"""You are a warm, empathetic therapist who genuinely cares about helping people flourish! Guide the therapeutic process with compassionate enthusiasm and professional insight.
-        
-        ENTHUSIASTIC PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY compliment their courage in seeking support and their positive energy or appearance from the webcam
-        - Ask about their current concerns with deep empathy and genuine interest in their wellbeing
-        - Explore underlying issues while celebrating their self-awareness and emotional intelligence
-        - Compliment their insights, progress, and strength throughout the conversation
-        - Provide structured feedback with encouragement and hope for positive change
-        - Show genuine excitement about their potential for growth and healing
-        - Express appreciation for their openness and trust in the therapeutic process
-        
-        BE ENTHUSIASTICALLY COMMANDING: Lead therapeutic sessions with professional warmth while expressing genuine belief in their capacity for positive change!
-        
-        {base_instructions}
-        Your role is to conduct uplifting therapy sessions that help people feel valued, understood, and hopeful about their future. Always clarify this supplements but doesn't replace professional therapy.""",
-        
-        "hr": f"""You are a seasoned HR manager who excels at both recognizing talent and providing constructive feedback! Take charge of evaluations with professional enthusiasm balanced with honest assessment.
-        
-        ENTHUSIASTIC YET CRITICAL PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY compliment their professional appearance, confidence, or positive energy from the webcam
-        - Ask about their background and career objectives with genuine interest in their potential
-        - Conduct structured behavioral interviews while celebrating their achievements AND identifying areas for growth
-        - Compliment specific strengths, experiences, and skills while also noting areas that need development
-        - PROVIDE BALANCED FEEDBACK: Mix genuine praise with constructive criticism in a supportive way
-        - Ask challenging questions while maintaining encouragement about their potential
-        - CRITICAL ASSESSMENT: Don't shy away from pointing out weaknesses, gaps in experience, or areas needing improvement
-        - Express excitement about their potential while being honest about current limitations
-        - Provide both positive reinforcement AND actionable feedback for improvement
-        - Make recommendations that include both strengths to leverage and areas to develop
-        
-        BE ENTHUSIASTICALLY BALANCED: Lead interviews with HR expertise that recognizes talent while providing honest, constructive feedback for growth!
-        
-        {base_instructions}
-        Your role is to conduct comprehensive HR assessments that make candidates feel valued while receiving honest, balanced evaluation including both strengths and areas for improvement."""
-    }
-    
-    # Get the specific personality prompt or default to general assistant
-    if personality_type.lower() in personality_prompts:
-        return personality_prompts[personality_type.lower()]
-    else:
-        # Default prompt for custom or unrecognized personalities
-        return f"""You are an enthusiastic professional {personality_type} who genuinely enjoys helping people and takes pride in your expertise! Take charge of interactions with warmth and demonstrate your knowledge through active engagement.
-        
-        ENTHUSIASTIC PROFESSIONAL BEHAVIOR:
-        - IMMEDIATELY compliment something about the person's appearance, energy, or professional demeanor from the webcam
-        - Ask relevant questions about their needs in your specialty area with genuine excitement and interest
-        - Lead conversations through systematic questioning while expressing appreciation for their goals
-        - Provide expert analysis and recommendations with enthusiasm about helping them succeed
-        - Show genuine interest in their background, aspirations, and challenges
-        - Compliment their smart questions, preparation, or insights throughout the interaction
-        - Engage actively with positive energy rather than passively responding to questions
-        
-        BE ENTHUSIASTICALLY COMMANDING: Act with the authority and expertise of a seasoned {personality_type} while maintaining warmth, encouragement, and genuine interest in the person!
-        
-        {base_instructions}
-        Your role is to conduct professional interactions that make people feel valued, understood, and excited about working with a skilled {personality_type}."""
-
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0.7,
-)
-
-def ask_agent(user_query: str, personality_type: str = "general assistant") -> str:
+    # Templates live in agents/system_prompts.json; each type is rendered once and cached
+    return get_system_prompt(personality_type)
+
+
+def ai_available() -> bool:
+    """Check that the LLM SDKs are installed and an API key is configured, without importing them"""
+    if cassette.mode == "replay":
+        return True  # every agent run is answered from the cassette
+    has_key = bool(os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY"))
+    return has_key and find_spec("langchain_google_genai") is not None and find_spec("langgraph") is not None
+
+def get_llm():
+    """Chat model of the first configured chat backend (see agents/providers.py)"""
+    return chat_router.backends[0].chat_model()
+
+@lazy("llm_backends")
+def _warm_llm_backends():
+    """Clients of every configured chat and vision backend, built by preload()"""
+    return {"chat": chat_router.warm(), "vision": vision_router.warm()}
+
+@lazy("langgraph")
+def _react_agent_factory():
+    """langgraph's create_react_agent, imported on first use"""
+    from langgraph.prebuilt import create_react_agent
+    return create_react_agent
+
+# Compiled ReAct agents per (backend, system prompt); compiling the graph is part of every uncached turn otherwise
+_agents: "OrderedDict[Tuple[Any, str], Any]" = OrderedDict()
+_agents_lock = threading.Lock()
+AGENT_CACHE_SIZE = 32
+
+def get_react_agent(backend, system_prompt: str):
+    """ReAct agent for a chat backend and system prompt, compiled once and reused across turns"""
+    key = (backend, system_prompt)
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is not None:
+            _agents.move_to_end(key)
+            return agent
+    agent = _react_agent_factory()(
+        model=backend.chat_model(),
+        tools=[analyze_image_with_query],
+        prompt=system_prompt
+        )
+    with _agents_lock:
+        _agents[key] = agent
+        _agents.move_to_end(key)
+        while len(_agents) > AGENT_CACHE_SIZE:
+            _agents.popitem(last=False)
+    return agent
+
+def prepare_agents(personality_type: str = "general assistant") -> int:
+    """Compile the personality's ReAct agent for every chat backend ahead of its first turn"""
+    if multimodal_fast_path:
+        return 0  # the fast path makes plain completions and never compiles an agent
+    system_prompt = generate_system_prompt(personality_type)
+    for backend in chat_router.backends:
+        get_react_agent(backend, system_prompt)
+    return len(chat_router.backends)
+
+def __getattr__(name: str):
+    # Backwards compatible access to the module-level model
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _used_tools(messages) -> bool:
+    """Check whether a ReAct run called any tool (tool turns are not cacheable)"""
+    for message in messages:
+        if getattr(message, "type", None) == "tool" or getattr(message, "tool_calls", None):
+            return True
+    return False
+
+def ask_agent(user_query: str, personality_type: str = "general assistant",
+              cache: Optional[ResponseCache] = None, context: Optional[Dict[str, Any]] = None) -> str:
     """
     Ask the agent a question with a specific personality type.
     
     Args:
         user_query: The user's question
         personality_type: The type of assistant (doctor, lawyer, receptionist, etc.)
+        cache: Response cache to consult (defaults to the module-level response_cache)
+        context: Conversation context, fingerprinted into the cache key
     
     Returns:
         The agent's response
     """
-    system_prompt = generate_system_prompt(personality_type)
-    
-    agent = create_react_agent(
-        model=llm,
-        tools=[analyze_image_with_query],
-        prompt=system_prompt
+    if cache is None:
+        cache = response_cache
+    with tracer.span("llm.ask_agent", personality=personality_type) as span:
+        if cache is not None:
+            cached = cache.get(personality_type, user_query, context)
+            if cached is not None:
+                span.set_attribute("cache_hit", True)
+                return cached
+
+        (answer, used_tools), shared = ask_agent_flight.do(
+            stable_key("ask_agent", personality_type, user_query, context),
+            lambda: _run_agent(user_query, personality_type)
         )
+        span.set_attribute("coalesced", shared)
+        span.set_attribute("used_tools", used_tools)
+
+        if cache is not None and not shared:
+            cache.put(personality_type, user_query, answer, context=context, used_tools=used_tools)
+
+        return answer
+
+@recorded("llm", key=lambda user_query, personality_type: [personality_type, user_query])
+def _run_agent(user_query: str, personality_type: str):
+    """Run one agent turn and return (answer, used_tools)"""
+    if multimodal_fast_path:
+        return _run_fast_path(user_query, personality_type)
 
+    turn_started = time.perf_counter()
+    system_prompt = generate_system_prompt(personality_type)
     input_messages = {"messages": [{"role": "user", "content": user_query}]}
 
-    response = agent.invoke(input_messages)
+    def invoke(backend):
+        agent = get_react_agent(backend, system_prompt)
+        with tracer.span("llm.invoke", backend=backend.name):
+            return agent.invoke(input_messages)
+
+    started = time.perf_counter()
+    # The router fails over to the next chat backend on errors and hedges slow calls
+    response = chat_router.call(invoke, query=user_query)
+    llm_request_duration.observe(time.perf_counter() - started, personality_type)
+
+    used_tools = _used_tools(response['messages'])
+    llm_turn_duration.observe(time.perf_counter() - turn_started, "react", str(used_tools).lower())
+    return response['messages'][-1].content, used_tools
+
+def _run_fast_path(user_query: str, personality_type: str):
+    """Answer in one model call, attaching the webcam frame when the question needs it"""
+    turn_started = time.perf_counter()
+    system_prompt = generate_system_prompt(personality_type)
+
+    image_b64 = None
+    if needs_vision(user_query):
+        try:
+            image_b64 = current_frame()
+        except Exception as e:
+            logging.warning(f"Webcam frame unavailable, answering without it: {e}")
+
+    used_vision = image_b64 is not None
+    messages = build_messages(system_prompt, user_query, image_b64)
+
+    def complete(backend):
+        with tracer.span("llm.invoke", path="fast", vision=used_vision, backend=backend.name):
+            return backend.complete(messages)
+
+    started = time.perf_counter()
+    # Questions with a frame need a multimodal model, so they go to the vision backends
+    answer = (vision_router if used_vision else chat_router).call(complete, query=user_query)
+    llm_request_duration.observe(time.perf_counter() - started, personality_type)
 
-    return response['messages'][-1].content
+    llm_turn_duration.observe(time.perf_counter() - turn_started, "fast", str(used_vision).lower())
+    # Turns that looked through the webcam are not cacheable, like ReAct tool turns
+    return answer, used_vision
 
 
 #print(ask_agent(user_query="Do I have a beard?"))
\ No newline at end of file
@@ -2,11 +2,13 @@
 FastAPI backend for the modular AI assistant system.
 Provides REST API endpoints for persona selection, conversations, and task management.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 import uuid
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import sys
@@ -18,36 +20,51 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
 # Import our agent system
 from agents.base import Task, TaskStatus, TaskPriority, AgentResponse
 from agents.supervisor import HierarchicalSupervisor  
-from agents.personas import HRManagerAgent, ITSupportAgent, DoctorAgent
+from agents.personas import AI_AVAILABLE
+from agents.registry import persona_registry
 from agents.platforms import (
     GitHubPlatformAgent, GmailPlatformAgent, 
     JiraPlatformAgent, CalendarPlatformAgent
 )
 from agents.reflection import ReflectionAgent
+from agents.cache import ResponseCache
+from agents.pipeline import ConversationPipeline
+from agents.lazy import preload, loaded_resources
+from agents.state import state_backend_from_env
+from agents.history import JsonlArchive
+from agents.evaluation_pipeline import EvaluationPipeline
+from agents.followups import FollowUpStage, parse_rate_limits
+from agents.tracing import configure_from_env, ChromeTraceExporter
+from agents.metrics import metrics
+from fastapi.responses import PlainTextResponse
 
 # Pydantic models for API requests/responses
 class ConversationRequest(BaseModel):
     persona: str
     message: str
     context: Optional[Dict[str, Any]] = {}
+    evaluate_inline: bool = False
 
 class ConversationResponse(BaseModel):
     message: str
     tasks_created: List[Dict[str, Any]] = []
     persona: str
     timestamp: datetime
+    degraded: bool = False
 
 class TaskRequest(BaseModel):
     description: str
     task_type: str
     payload: Dict[str, Any]
     priority: str = "medium"
+    evaluate_inline: bool = False
 
 class TaskResponse(BaseModel):
     task_id: str
     status: str
     result: Optional[Dict[str, Any]] = None
     message: str
+    evaluation_score: Optional[int] = None
 
 class PersonaInfo(BaseModel):
     id: str
@@ -61,11 +78,38 @@ class SystemStatus(BaseModel):
     total_tasks_processed: int
     system_health: str
 
+def preload_system() -> Dict[str, Any]:
+    """Warm SDKs, model clients and persona agents so the first request does not pay for them"""
+    try:
+        import ai_agent  # noqa: F401 - declares the lazily built LLM resources
+    except Exception:
+        pass
+    resources = preload()
+    for persona_id in personas.ids():
+        # Instantiating the persona and matching once compiles its intent matcher
+        personas.get(persona_id).match_intents("")
+    return {"resources": resources, "personas": personas.loaded()}
+
+@asynccontextmanager
+async def lifespan(app):
+    """Optionally warm everything up before serving (PRELOAD_ON_STARTUP=1, or --preload)"""
+    if os.getenv("PRELOAD_ON_STARTUP", "").lower() in ("1", "true", "yes"):
+        preload_system()
+    if followups_enabled:
+        followup_stage.start()
+    yield
+    # Record evaluations still queued before the worker exits
+    evaluation_pipeline.shutdown()
+    followup_stage.shutdown()
+    # Flushes queued OTLP spans and writes TRACING_CHROME_PATH
+    tracer.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Modular AI Assistant API",
     description="API for workplace automation with multiple conversational personas and hierarchical agent orchestration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware for React frontend
@@ -77,16 +121,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-stage spans (TRACING_ENABLED=1); a no-op unless enabled
+tracer = configure_from_env()
+
+request_duration = metrics.histogram(
+    "http_request_duration_seconds", "API request latency per endpoint", ["method", "route", "status"])
+
+def _route_template(request: Request) -> str:
+    """Matched route path (/tasks/{task_id}) so task ids do not become label values"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Record request latency; with tracing on, open a root span continuing an incoming traceparent header"""
+    started = time.perf_counter()
+    if not tracer.enabled:
+        response = await call_next(request)
+    else:
+        with tracer.span(f"{request.method} {request.url.path}", parent=request.headers.get("traceparent")) as span:
+            response = await call_next(request)
+            span.set_attribute("status_code", response.status_code)
+            response.headers["traceparent"] = span.traceparent
+    request_duration.observe(time.perf_counter() - started, request.method, _route_template(request),
+                             str(response.status_code))
+    return response
+
+# Tasks, sessions, counters and evaluations; STATE_BACKEND=sqlite shares them across uvicorn workers
+state = state_backend_from_env()
+
 # Initialize the agent system
-supervisor = HierarchicalSupervisor()
-reflection_agent = ReflectionAgent()
+supervisor = HierarchicalSupervisor(
+    state=state,
+    # Collapsing identical concurrent tasks is only safe when tasks are idempotent
+    coalesce_identical_tasks=os.getenv("TASK_COALESCING", "0").lower() in ("1", "true", "yes"),
+    # Only the most recent tasks are kept; older ones are optionally appended to a JSONL archive
+    history_capacity=int(os.getenv("TASK_HISTORY_CAPACITY", "1000")),
+    history_archive=JsonlArchive(os.environ["TASK_HISTORY_ARCHIVE_PATH"]) if os.getenv("TASK_HISTORY_ARCHIVE_PATH") else None
+)
+def evaluation_store_from_env():
+    """Opt-in columnar copy of the most recent evaluations for percentile/trend analytics (needs numpy)"""
+    if os.getenv("EVALUATION_ANALYTICS", "0").lower() not in ("1", "true", "yes"):
+        return None
+    from agents.evaluation_store import EvaluationStore
+    return EvaluationStore(max_rows=int(os.getenv("EVALUATION_ANALYTICS_MAX_ROWS", "100000")))
+
+# Summaries come from maintained aggregates; only the most recent raw evaluations are kept
+reflection_agent = ReflectionAgent(
+    state=state,
+    history_limit=int(os.getenv("EVALUATION_HISTORY_LIMIT", "1000")),
+    store=evaluation_store_from_env()
+)
+# Follow-ups suggested by the reflection agent run in batches, deduplicated and rate-limited per platform
+followup_stage = FollowUpStage(
+    supervisor,
+    reflection_agent,
+    dedup_window=float(os.getenv("FOLLOWUP_DEDUP_WINDOW", "300")),
+    rate_limits=parse_rate_limits(os.getenv("FOLLOWUP_RATE_LIMITS", "")),
+    max_pending=int(os.getenv("FOLLOWUP_MAX_PENDING", "10000"))
+)
+# Opt-in: follow-ups are real platform tasks (emails, issues), previously only reported
+followups_enabled = os.getenv("FOLLOWUPS_ENABLED", "0").lower() in ("1", "true", "yes")
+# Evaluations run in a background worker unless EVALUATION_MODE=inline or the request asks for the score
+evaluation_pipeline = EvaluationPipeline(
+    reflection_agent,
+    mode=os.getenv("EVALUATION_MODE", "async"),
+    max_queue=int(os.getenv("EVALUATION_QUEUE_SIZE", "10000")),
+    on_evaluated=followup_stage.submit_many if followups_enabled else None
+)
 
-# Initialize persona agents
-personas = {
-    "hr_manager": HRManagerAgent(),
-    "it_support": ITSupportAgent(),
-    "doctor": DoctorAgent()
-}
+# Persona agents are declared in agents/persona_definitions and instantiated on first use
+personas = persona_registry
+
+# Opt-in response cache shared by all personas (RESPONSE_CACHE_ENABLED=1)
+response_cache = ResponseCache.from_env()
+
+def configure_persona(persona_agent):
+    """Apply the response cache and latency settings to a newly instantiated persona"""
+    persona_agent.response_cache = response_cache
+    # Per-persona LLM latency budget, e.g. LLM_LATENCY_BUDGET_SECONDS_DOCTOR=5
+    budget = os.getenv(f"LLM_LATENCY_BUDGET_SECONDS_{persona_agent.agent_id.upper()}", os.getenv("LLM_LATENCY_BUDGET_SECONDS"))
+    persona_agent.latency_budget = float(budget) if budget else None
+    persona_agent.hedge_requests = os.getenv("LLM_HEDGE_REQUESTS", "").lower() in ("1", "true", "yes")
+
+personas.add_configurator(configure_persona)
 
 # Initialize platform agents
 github_agent = GitHubPlatformAgent()
@@ -100,10 +218,23 @@ supervisor.register_platform_agent("gmail", gmail_agent)
 supervisor.register_platform_agent("jira", jira_agent)
 supervisor.register_platform_agent("calendar", calendar_agent)
 
-# Global state management
-conversation_history: Dict[str, List[Dict[str, Any]]] = {}
-task_store: Dict[str, Task] = {}
-tasks_processed = 0
+# Runs persona LLM generation and the persona's platform tasks concurrently
+conversation_pipeline = ConversationPipeline(supervisor, reflection_agent, evaluator=evaluation_pipeline)
+
+# Scrape-time views of state kept elsewhere, exposed at /metrics
+metrics.callback("tasks_processed_total", "Tasks processed through /tasks and /conversation", [],
+                 lambda: {(): state.counter("tasks_processed")}, type="counter")
+metrics.callback("task_history_tasks", "Tasks in the bounded history window by status", ["status"],
+                 lambda: {(status.value,): supervisor.task_history.count(status) for status in TaskStatus})
+metrics.callback("queue_depth", "Items waiting in background queues", ["queue"], lambda: {
+    ("evaluation",): evaluation_pipeline.stats()["queue_depth"],
+    ("followups",): followup_stage.pending(),
+})
+metrics.callback("response_cache_lookups_total", "Persona response cache lookups by result", ["result"],
+                 lambda: {(result,): response_cache.get_stats()[result] for result in ("hits", "near_hits", "misses")}
+                 if response_cache is not None else {}, type="counter")
+metrics.callback("response_cache_hit_ratio", "Share of cache lookups answered from the cache", [],
+                 lambda: {(): response_cache.get_stats()["hit_rate"]} if response_cache is not None else {})
 
 @app.get("/")
 def root():
@@ -125,78 +256,54 @@ def get_personas():
     """Get list of available persona agents"""
     persona_list = []
     
-    for persona_id, persona_agent in personas.items():
-        persona_list.append(PersonaInfo(
-            id=persona_id,
-            name=persona_agent.name,
-            description=persona_agent.description,
-            capabilities=persona_agent.get_capabilities()
-        ))
+    for persona_id in personas.ids():
+        persona_list.append(PersonaInfo(**personas.describe(persona_id)))
     
     return persona_list
 
 @app.post("/conversation", response_model=ConversationResponse)
 def have_conversation(request: ConversationRequest):
     """Have a conversation with a selected persona"""
-    global tasks_processed
-    
     # Validate persona
     if request.persona not in personas:
         raise HTTPException(status_code=400, detail=f"Unknown persona: {request.persona}")
     
-    persona_agent = personas[request.persona]
+    persona_agent = personas.get(request.persona)
     
-    # Create conversation task
-    conversation_task = Task(
-        id=str(uuid.uuid4()),
-        description=f"Conversation with {persona_agent.name}",
-        task_type="conversation",
-        payload={"message": request.message},
-        created_by=request.persona
-    )
-    
-    # Execute conversation
+    # Execute conversation: intents are extracted first and their tasks run while the LLM answers
     try:
-        response = persona_agent.execute_task(conversation_task)
-        tasks_processed += 1
+        result = conversation_pipeline.run(persona_agent, request.message, request.context, request.evaluate_inline)
+        response = result.response
+        state.incr("tasks_processed")
         
         # Store conversation in history
         session_id = f"{request.persona}_session"
-        if session_id not in conversation_history:
-            conversation_history[session_id] = []
-        
-        conversation_history[session_id].append({
+        state.append_history(session_id, {
             "user_message": request.message,
             "agent_response": response.message,
             "timestamp": datetime.now().isoformat(),
             "tasks_created": len(response.tasks_created or [])
         })
         
-        # Process any tasks created by the persona
+        # Report the tasks created by the persona
         created_tasks = []
-        if response.tasks_created:
-            for task in response.tasks_created:
-                task_store[task.id] = task
-                # Execute task through supervisor
-                task_response = supervisor.execute_task(task)
-                
-                # Evaluate task with reflection agent
-                evaluation = reflection_agent.evaluate_task_completion(task, task_response)
-                
-                created_tasks.append({
-                    "task_id": task.id,
-                    "task_type": task.task_type,
-                    "description": task.description,
-                    "status": task.status.value,
-                    "result": task_response.data,
-                    "evaluation_score": evaluation.get("quality_score", 0)
-                })
+        for outcome in result.task_outcomes:
+            state.save_task(outcome.task)
+            created_tasks.append({
+                "task_id": outcome.task.id,
+                "task_type": outcome.task.task_type,
+                "description": outcome.task.description,
+                "status": outcome.task.status.value,
+                "result": outcome.response.data,
+                "evaluation_score": outcome.evaluation.get("quality_score", 0) if outcome.evaluation else None
+            })
         
         return ConversationResponse(
             message=response.message,
             tasks_created=created_tasks,
             persona=request.persona,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            degraded=bool(response.data and response.data.get("degraded"))
         )
         
     except Exception as e:
@@ -205,8 +312,6 @@ def have_conversation(request: ConversationRequest):
 @app.post("/tasks", response_model=TaskResponse)
 def create_task(request: TaskRequest):
     """Create and execute a task directly"""
-    global tasks_processed
-    
     # Convert priority string to enum
     priority_map = {
         "low": TaskPriority.LOW,
@@ -225,36 +330,40 @@ def create_task(request: TaskRequest):
     )
     
     # Store task
-    task_store[task.id] = task
+    state.save_task(task)
     
     # Execute task through supervisor
     try:
+        started = time.perf_counter()
         response = supervisor.execute_task(task)
-        tasks_processed += 1
+        latency = time.perf_counter() - started
+        state.save_task(task)
+        state.incr("tasks_processed")
         
-        # Evaluate with reflection agent
-        evaluation = reflection_agent.evaluate_task_completion(task, response)
+        # Evaluate with reflection agent (queued unless the caller wants the score)
+        evaluation = evaluation_pipeline.submit(task, response, inline=request.evaluate_inline, latency=latency)
         
         return TaskResponse(
             task_id=task.id,
             status=task.status.value,
             result=response.data,
-            message=response.message
+            message=response.message,
+            evaluation_score=evaluation["quality_score"] if evaluation else None
         )
         
     except Exception as e:
         task.status = TaskStatus.FAILED
         task.error_message = str(e)
+        state.save_task(task)
         raise HTTPException(status_code=500, detail=f"Error executing task: {str(e)}")
 
 @app.get("/tasks/{task_id}", response_model=TaskResponse)
 def get_task(task_id: str):
     """Get status and result of a specific task"""
-    if task_id not in task_store:
+    task = state.get_task(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    task = task_store[task_id]
-    
     return TaskResponse(
         task_id=task.id,
         status=task.status.value,
@@ -262,12 +371,19 @@ def get_task(task_id: str):
         message=task.error_message or "Task completed successfully"
     )
 
+@app.get("/tasks/{task_id}/followups")
+def get_task_followups(task_id: str):
+    """Get the chain of follow-up tasks triggered by a task"""
+    if state.get_task(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return followup_stage.chain(task_id)
+
 @app.get("/tasks", response_model=List[TaskResponse])
 def get_all_tasks():
     """Get all tasks and their statuses"""
     task_list = []
     
-    for task in task_store.values():
+    for task in state.list_tasks():
         task_list.append(TaskResponse(
             task_id=task.id,
             status=task.status.value,
@@ -282,12 +398,9 @@ def get_conversation_history(persona: str):
     """Get conversation history for a specific persona"""
     session_id = f"{persona}_session"
     
-    if session_id not in conversation_history:
-        return {"persona": persona, "history": []}
-    
     return {
         "persona": persona,
-        "history": conversation_history[session_id]
+        "history": state.get_history(session_id)
     }
 
 @app.get("/system/status", response_model=SystemStatus)
@@ -296,17 +409,116 @@ def get_system_status():
     platform_status = supervisor.get_platform_status()
     
     return SystemStatus(
-        active_personas=list(personas.keys()),
+        active_personas=personas.ids(),
         platform_status=platform_status,
-        total_tasks_processed=tasks_processed,
+        total_tasks_processed=state.counter("tasks_processed"),
         system_health="healthy" if all(platform_status.values()) else "degraded"
     )
 
+@app.post("/personas/reload")
+def reload_personas():
+    """Pick up added, changed or removed persona definition files"""
+    return personas.reload()
+
+@app.post("/personas/{persona}/prewarm")
+def prewarm_persona(persona: str):
+    """Start a session: warm clients, connections and the persona's agent in the background"""
+    if persona not in personas:
+        raise HTTPException(status_code=400, detail=f"Unknown persona: {persona}")
+    from agents.prewarm import session_prewarmer
+    # Never open the API host's webcam from a request
+    started = session_prewarmer.start(personas.get(persona).personality_type, camera=False)
+    return {"persona": persona, "started": started is not None}
+
+@app.get("/system/prewarm")
+def get_prewarm_status():
+    """Get the outcome and duration of each session prewarm step"""
+    from agents.prewarm import session_prewarmer
+    return session_prewarmer.status()
+
 @app.get("/system/evaluation")
 def get_evaluation_summary():
     """Get evaluation summary from reflection agent"""
     return reflection_agent.get_evaluation_summary()
 
+@app.get("/system/evaluation/pipeline")
+def get_evaluation_pipeline_stats():
+    """Get background evaluation queue depth and lag"""
+    return evaluation_pipeline.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of latency histograms, error counts, queue depths and cache stats"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/system/traces")
+def get_traces(trace_id: Optional[str] = None):
+    """Get recent spans as Chrome trace JSON (load in chrome://tracing or Perfetto)"""
+    exporter = tracer.exporter(ChromeTraceExporter)
+    if exporter is None:
+        raise HTTPException(status_code=404, detail="Tracing is disabled or has no chrome exporter")
+    return exporter.to_chrome_trace(trace_id)
+
+@app.get("/system/followups")
+def get_followup_stats():
+    """Get follow-up queue depth, dedup and rate-limit counters"""
+    return followup_stage.stats()
+
+@app.get("/system/evaluation/analytics")
+def get_evaluation_analytics(task_type: Optional[str] = None, bucket_seconds: float = 3600):
+    """Get quality/latency percentiles, per-type breakdown and quality trend for this worker's evaluations"""
+    store = reflection_agent.store
+    if store is None:
+        raise HTTPException(status_code=503, detail="Evaluation analytics are disabled (set EVALUATION_ANALYTICS=1; needs numpy)")
+    return {
+        **store.summary(),
+        "quality_trend": store.trend("quality", bucket_seconds=bucket_seconds, task_type=task_type),
+        "memory_bytes": store.nbytes
+    }
+
+@app.get("/system/evaluation/rollups")
+def get_evaluation_rollups(granularity: str = "minute", dimension: str = "task_type"):
+    """Get per-minute or per-hour evaluation stats by task type or platform"""
+    try:
+        return reflection_agent.get_evaluation_rollups(granularity, dimension)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/system/history")
+def get_task_history_summary():
+    """Get task counts by status and type over the bounded history window, plus improvement opportunities"""
+    history = supervisor.task_history
+    return {
+        "capacity": history.capacity,
+        "window_size": len(history),
+        "total_recorded": history.total_recorded,
+        "by_status": history.status_counts(),
+        "by_task_type": history.type_counts(),
+        "improvement_opportunities": reflection_agent.identify_improvement_opportunities(history)
+    }
+
+@app.get("/system/cache")
+def get_cache_stats():
+    """Get response cache hit-rate metrics"""
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.get_stats()}
+
+@app.get("/system/llm-backends")
+def get_llm_backends():
+    """Get health, latency and hedge delay of every chat and vision backend"""
+    from agents.providers import chat_router, vision_router
+    return {"chat": chat_router.status(), "vision": vision_router.status()}
+
+@app.get("/system/coalescing")
+def get_coalescing_stats():
+    """Get how many identical concurrent calls were collapsed into one execution"""
+    stats = {"supervisor": supervisor.get_coalescing_stats()}
+    if AI_AVAILABLE:
+        from ai_agent import ask_agent_flight
+        stats["ask_agent"] = ask_agent_flight.get_stats()
+    return stats
+
 @app.post("/workflow")
 def execute_workflow(workflow_request: Dict[str, Any]):
     """Execute a workflow with multiple tasks"""
@@ -324,11 +536,13 @@ def execute_workflow(workflow_request: Dict[str, Any]):
             created_by="workflow_api"
         )
         tasks.append(task)
-        task_store[task.id] = task
+        state.save_task(task)
     
     # Execute workflow
     try:
         responses = supervisor.orchestrate_workflow(tasks, execution_mode)
+        for task in tasks:
+            state.save_task(task)
         
         workflow_result = {
             "workflow_id": str(uuid.uuid4()),
@@ -358,6 +572,19 @@ def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/system/startup")
+def get_startup_status():
+    """Get which lazily initialized SDKs, clients and personas have been loaded"""
+    return {"resources": loaded_resources(), "personas": personas.loaded()}
+
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the Modular AI Assistant API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--preload", action="store_true", help="Load SDKs, model clients and personas before serving")
+    args = parser.parse_args()
+    if args.preload:
+        print(f"Preloaded: {preload_system()}")
+    uvicorn.run(app, host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Replay a JSONL file of conversations through the personas and the supervisor.
+
+Each input line is {"persona": "it_support", "message": "...", "context": {...}}
+with an optional "id". Results go to the output JSONL, one per input line, in
+input order unless --unordered is given.
+
+    python batch_process.py tickets.jsonl -o triage.jsonl --workers 8
+    python batch_process.py traffic.jsonl -o replay.jsonl --executor process --workers 4 --unordered
+    python batch_process.py tickets.jsonl -o triage.jsonl --resume
+
+--resume continues an interrupted run, skipping the lines already in the output.
+"""
+import argparse
+import json
+import sys
+
+from agents.batch import BatchProcessor
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of {persona, message, context} records")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file the results are written to")
+    parser.add_argument("--workers", type=int, default=4, help="Records processed concurrently")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Worker pool type; process gives each worker its own agent system")
+    parser.add_argument("--unordered", action="store_true", help="Write results as they complete instead of in input order")
+    parser.add_argument("--max-in-flight", type=int, help="Records submitted but not yet written (default: 4 x workers)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Flush and fsync the output every N results")
+    parser.add_argument("--task-workers", type=int, default=4, help="Platform task threads per agent system")
+    parser.add_argument("--persona", help="Persona for records that do not name one")
+    parser.add_argument("--resume", action="store_true", help="Continue an existing output file")
+    parser.add_argument("--limit", type=int, help="Process at most N records")
+    args = parser.parse_args(argv)
+
+    processor = BatchProcessor(
+        workers=args.workers,
+        executor=args.executor,
+        ordered=not args.unordered,
+        max_in_flight=args.max_in_flight,
+        checkpoint_every=args.checkpoint_every,
+        task_workers=args.task_workers,
+        default_persona=args.persona
+    )
+    try:
+        stats = processor.run(args.input, args.output, resume=args.resume, limit=args.limit)
+    except FileExistsError as e:
+        print(f"❌ {e} (use --resume)", file=sys.stderr)
+        return 2
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
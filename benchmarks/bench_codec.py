@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Memory of slotted Task objects and throughput of the binary codec against
+JSON (via task_to_dict) and pickle.
+
+Usage:
+    python benchmarks/bench_codec.py [--tasks 200000]
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, fields
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from agents.base import Task, TaskStatus, TaskPriority
+from agents.codec import encode, decode, task_to_dict, task_from_dict, MSGPACK_AVAILABLE
+
+# The previous, dict-backed layout of Task for comparison
+DictTask = dataclass(type("DictTask", (), {
+    "__annotations__": {f.name: f.type for f in fields(Task)},
+    **{f.name: f.default for f in fields(Task) if f.default is not f.default_factory},
+}))
+
+def build(cls, count):
+    return [cls(str(uuid.UUID(int=i)), "Send welcome email", "send_email", {"recipient": f"user{i}@company.com"},
+                TaskStatus.COMPLETED, TaskPriority.HIGH, "gmail_platform") for i in range(count)]
+
+def measure_memory(cls, count):
+    tracemalloc.start()
+    tasks = build(cls, count)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+    return used / count
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"tasks={args.tasks} msgpack_extension={MSGPACK_AVAILABLE}")
+    print(f"memory per task   : {measure_memory(DictTask, args.tasks):6.0f} B with __dict__, "
+          f"{measure_memory(Task, args.tasks):6.0f} B slotted")
+
+    tasks = build(Task, args.tasks)
+    formats = {
+        "json": (lambda: json.dumps([task_to_dict(t) for t in tasks]).encode(),
+                 lambda blob: [task_from_dict(d) for d in json.loads(blob)]),
+        "pickle": (lambda: pickle.dumps(tasks, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        "codec": (lambda: encode(tasks), decode),
+    }
+    for name, (dump, load) in formats.items():
+        blob, dump_seconds = timed(dump)
+        restored, load_seconds = timed(lambda: load(blob))
+        assert restored == tasks
+        print(f"{name:<18}: {len(blob) / args.tasks:6.0f} B/task, encode {args.tasks / dump_seconds:9.0f} tasks/s, "
+              f"decode {args.tasks / load_seconds:9.0f} tasks/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Memory and query time of the columnar evaluation store against the same
+analytics computed over a list of evaluation dicts.
+
+Usage:
+    python benchmarks/bench_evaluation_store.py [--evaluations 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from agents.evaluation_store import EvaluationStore
+
+TASK_TYPES = ["send_email", "create_ticket", "github_create_issue", "schedule_meeting", "code_review"]
+ISSUES = ["Task execution failed", "Requires user clarification"]
+RECOMMENDATIONS = ["Consider setting up delivery confirmation tracking",
+                   "Provide more specific instructions to avoid ambiguity"]
+
+def build_evaluations(count):
+    rng = random.Random(7)
+    evaluations = []
+    for i in range(count):
+        success = rng.random() > 0.1
+        evaluations.append({
+            "task_id": str(i),
+            "task_type": rng.choice(TASK_TYPES),
+            "success": success,
+            "completeness_score": 100 if success else 20,
+            "quality_score": rng.choice((40, 60, 80, 100)),
+            "issues_identified": [] if success else [rng.choice(ISSUES)],
+            "recommendations": [rng.choice(RECOMMENDATIONS)] if rng.random() > 0.5 else [],
+            "follow_up_needed": False,
+            "follow_up_tasks": [],
+        })
+    return evaluations
+
+def list_analytics(evaluations):
+    quality = sorted(e["quality_score"] for e in evaluations)
+    percentiles = {p: quality[min(int(len(quality) * p / 100), len(quality) - 1)] for p in (50, 90, 99)}
+    by_type = {}
+    for e in evaluations:
+        stats = by_type.setdefault(e["task_type"], [0, 0, 0])
+        stats[0] += 1
+        stats[1] += e["success"]
+        stats[2] += e["quality_score"]
+    issues = {}
+    for e in evaluations:
+        for issue in e["issues_identified"]:
+            issues[issue] = issues.get(issue, 0) + 1
+    return percentiles, by_type, issues
+
+def store_analytics(store):
+    return store.percentiles("quality"), store.by_task_type(), store.label_counts("issues")
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=1000000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    evaluations = build_evaluations(args.evaluations)
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    store = EvaluationStore()
+    timestamps = [1_700_000_000 + i for i in range(len(evaluations))]
+    for i in range(0, len(evaluations), 10000):
+        store.extend(evaluations[i:i + 10000], timestamps[i:i + 10000], [0.05] * len(evaluations[i:i + 10000]))
+
+    print(f"evaluations={len(evaluations)}")
+    print(f"list of dicts     : {list_bytes / 2**20:8.1f} MiB, analytics {timed(list_analytics, evaluations):8.1f} ms")
+    print(f"columnar store    : {store.nbytes / 2**20:8.1f} MiB, analytics {timed(store_analytics, store):8.1f} ms")
+    print(f"hourly trend      : {timed(store.trend, 'quality', 3600):8.1f} ms")
+    print(f"moving average    : {timed(store.moving_average, 'quality', 1000):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
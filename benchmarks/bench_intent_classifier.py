@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Throughput of the NumPy intent classifier (single and batched) against the
+regex intent engine, plus how often the two backends agree.
+
+Usage:
+    python benchmarks/bench_intent_classifier.py [--messages 5000] [--batch-size 256]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from agents.intents import IntentEngine
+from agents.intent_classifier import IntentClassifier
+from agents.personas import HRManagerAgent, ITSupportAgent, DoctorAgent
+from bench_intents import build_corpus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    personas = [HRManagerAgent(), ITSupportAgent(), DoctorAgent()]
+    corpus = build_corpus(args.messages)
+
+    engine = IntentEngine()
+    classifier = IntentClassifier()
+    for persona in personas:
+        engine.register_scope(persona.agent_id, type(persona).intent_patterns)
+        classifier.register_scope(persona.agent_id, type(persona).intent_exemplars, type(persona).intent_thresholds)
+    engine.compile()
+    classifier.fit()
+
+    started = time.perf_counter()
+    regex_results = [engine.match(message) for message in corpus]
+    regex_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for message in corpus:
+        classifier.classify(message)
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vector_results = []
+    for i in range(0, len(corpus), args.batch_size):
+        vector_results.extend(classifier.classify_batch(corpus[i:i + args.batch_size]))
+    batch_seconds = time.perf_counter() - started
+
+    agree = sum(
+        1 for regex, vector in zip(regex_results, vector_results)
+        if {f"{scope}.{name}" for scope, name in regex} == vector
+    )
+
+    print(f"messages={len(corpus)} batch_size={args.batch_size}")
+    print(f"regex engine          : {len(corpus) / regex_seconds:10.0f} messages/s")
+    print(f"vector classifier     : {len(corpus) / single_seconds:10.0f} messages/s (one at a time)")
+    print(f"vector classifier     : {len(corpus) / batch_seconds:10.0f} messages/s (batched)")
+    print(f"backend agreement     : {agree / len(corpus) * 100:9.1f}% of messages")
+
+if __name__ == "__main__":
+    main()
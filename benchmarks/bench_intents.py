@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared single-pass intent engine against the legacy
+per-pattern re.search loop over a corpus of persona messages.
+
+Usage:
+    python benchmarks/bench_intents.py [--messages 5000] [--extra-personas 0]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from agents.intents import IntentEngine
+from agents.personas import HRManagerAgent, ITSupportAgent, DoctorAgent
+
+SAMPLE_MESSAGES = [
+    "I need to onboard a new software developer. They need GitHub access and a welcome email.",
+    "My laptop is running very slowly and I can't access the company VPN. Can you help?",
+    "I've been having persistent headaches for the past week. Can I schedule an appointment?",
+    "Please send me my lab results and set a medication reminder",
+    "Install the new design tool for the marketing team",
+    "hi",
+    "What time is it?",
+    "Our new hire starts Monday, create an account and send an announcement to the team",
+    "The printer on floor 3 is broken again, error code 52",
+    "Can I see the doctor for a checkup next week and follow up on my test results?",
+]
+
+FILLER = "the quick brown fox jumps over the lazy dog while we wait for the meeting to start".split()
+
+def build_corpus(count: int, seed: int = 7):
+    """Mix the sample messages with random filler of varying length"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        words = rng.sample(FILLER, rng.randint(0, len(FILLER)))
+        message = rng.choice(SAMPLE_MESSAGES)
+        corpus.append(" ".join(words[: len(words) // 2] + [message] + words[len(words) // 2:]))
+    return corpus
+
+def legacy_match(groups, message):
+    """Original approach: one re.search per pattern with re.IGNORECASE"""
+    return {
+        name for name, patterns in groups.items()
+        if any(re.search(pattern, message, re.IGNORECASE) for pattern in patterns)
+    }
+
+def synthetic_groups(count: int, seed: int = 11):
+    """Extra personas with keyword intents to simulate a larger deployment"""
+    rng = random.Random(seed)
+    vocabulary = ["invoice", "payroll", "laptop", "badge", "parking", "expense", "vacation", "training",
+                  "license", "contract", "refund", "shipment", "warehouse", "audit", "budget", "campaign"]
+    personas = {}
+    for p in range(count):
+        personas[f"synthetic_{p}"] = {
+            f"intent_{i}": [f"{rng.choice(vocabulary)}.*{rng.choice(vocabulary)}|{rng.choice(vocabulary)}_{p}"]
+            for i in range(10)
+        }
+    return personas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--extra-personas", type=int, default=0, help="Synthetic personas with 10 intents each")
+    args = parser.parse_args()
+
+    personas = {agent.agent_id: type(agent).intent_patterns for agent in (HRManagerAgent(), ITSupportAgent(), DoctorAgent())}
+    personas.update(synthetic_groups(args.extra_personas))
+    corpus = build_corpus(args.messages)
+
+    engine = IntentEngine()
+    for scope, groups in personas.items():
+        engine.register_scope(scope, groups)
+    engine.compile()
+
+    # Correctness: the combined matcher must agree with the legacy loop
+    for message in corpus[:500]:
+        expected = {(scope, name) for scope, groups in personas.items() for name in legacy_match(groups, message)}
+        assert engine.match(message) == expected, message
+
+    started = time.perf_counter()
+    for message in corpus:
+        for groups in personas.values():
+            legacy_match(groups, message)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for message in corpus:
+        engine.match(message)
+    engine_seconds = time.perf_counter() - started
+
+    intents = sum(len(groups) for groups in personas.values())
+    print(f"personas={len(personas)} intents={intents} messages={len(corpus)}")
+    print(f"legacy re.search loop : {legacy_seconds * 1e6 / len(corpus):8.1f} us/message")
+    print(f"single-pass engine    : {engine_seconds * 1e6 / len(corpus):8.1f} us/message")
+    print(f"speedup               : {legacy_seconds / engine_seconds:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Per-turn latency of the multimodal fast path vs the ReAct tool loop.
+
+Runs ask_agent on webcam questions and on text-only questions, once through
+the ReAct agent (a tool-calling model call, the vision call and a second model
+call for webcam questions) and once with MULTIMODAL_FAST_PATH (a single model
+call with the frame attached). Model and image-upload latencies are drawn from
+the fake LLM's seeded distributions, so the comparison shows the effect of the
+round trips saved rather than network noise.
+
+    python benchmarks/bench_multimodal.py
+    python benchmarks/bench_multimodal.py --llm-latency lognormal:-1.2,0.3 --image-latency fixed:0.2 --json mm.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fake_llm
+from bench_pipeline import measure
+
+QUERIES = {
+    "vision": [
+        "How do I look today?",
+        "Do I have a beard?",
+        "What color is my shirt?",
+        "What do you see behind me?",
+    ],
+    "text": [
+        "What are the symptoms of a cold?",
+        "Help me plan my week",
+        "How should I prepare for an interview?",
+    ],
+}
+
+# A 1x1 JPEG is enough: the fakes never decode the frame
+FRAME = "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgGBgcGBQgHBwcJCQgKDBQNDAsLDBkSEw8UHRofHh0aHBwgJC4nICIsIxwcKDcpLDAxNDQ0Hyc5PTgyPC4zNDL/wAALCAABAAEBAREA/8QAFAABAAAAAAAAAAAAAAAAAAAACf/EABQQAQAAAAAAAAAAAAAAAAAAAAD/2gAIAQEAAD8AKp//2Q=="
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--llm-latency", default="fixed:0.05", help="latency of one model call")
+    parser.add_argument("--image-latency", default="fixed:0.01", help="extra latency of a model call with a frame")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    import ai_agent
+    import tools
+
+    fake_llm.install(args.llm_latency, args.seed, use_tools=True, image_latency=args.image_latency)
+    tools.set_frame_source(lambda: FRAME)
+
+    results = {}
+    print(f"{'path':<8} {'queries':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for path in ("react", "fast"):
+        ai_agent.multimodal_fast_path = path == "fast"
+        for kind, queries in QUERIES.items():
+            result = measure(lambda i: ai_agent.ask_agent(f"{queries[i % len(queries)]} (turn {i})"),
+                             args.iterations, args.warmup)
+            results[f"{path}.{kind}"] = result
+            print(f"{path:<8} {kind:<8} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f}")
+    for kind in QUERIES:
+        speedup = results[f"react.{kind}"]["p50_ms"] / results[f"fast.{kind}"]["p50_ms"]
+        print(f"{kind}: fast path p50 is {speedup:.2f}x faster than ReAct")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
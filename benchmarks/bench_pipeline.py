@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the agent pipeline with a deterministic fake LLM.
+
+Scenarios: persona intent extraction, supervisor routing, platform sub-agent
+execution, reflection evaluation and the /conversation, /tasks and /workflow
+endpoints (in process, through FastAPI's TestClient). Each reports throughput
+and p50/p95/p99 latency.
+
+    python benchmarks/bench_pipeline.py --llm-latency lognormal:-3,0.5 --json results.json
+    python benchmarks/bench_pipeline.py --baseline results.json --tolerance 0.25
+    python benchmarks/bench_pipeline.py --max-p95 conversation=150 --min-throughput tasks=500
+    python benchmarks/bench_pipeline.py --cassette llm.jsonl.gz --cassette-latency-scale 1.0
+
+Exits with status 1 when a scenario is slower than its baseline by more than
+the tolerance (p95 up or throughput down) or misses an absolute threshold.
+With --cassette, persona replies are replayed from a cassette recorded against
+the real LLM (CASSETTE_MODE=record, see agents/cassette.py) instead of coming
+from the fake LLM.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Keep background follow-ups from competing with the measured requests
+os.environ.setdefault("FOLLOWUPS_ENABLED", "0")
+
+import fake_llm
+from agents.base import Task, AgentResponse
+
+SCENARIOS = ["intent_extraction", "supervisor_routing", "platform_execution", "reflection",
+             "conversation", "tasks", "workflow"]
+
+MESSAGES = [
+    "I need to onboard a new hire, they need GitHub access and a welcome email",
+    "Please schedule a meeting with the design team tomorrow",
+    "My laptop is broken, can you create a ticket",
+    "Send an email to the team about the release",
+    "Can you create a GitHub issue for the login bug",
+    "What are the symptoms of a cold",
+]
+TASK_TYPES = ["send_email", "create_ticket", "github_create_issue", "schedule_meeting"]
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def measure(operation: Callable[[int], None], iterations: int, warmup: int) -> Dict[str, float]:
+    """Run operation(i) sequentially and summarize per-call latency in milliseconds"""
+    for i in range(warmup):
+        operation(i)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        operation(i)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "throughput_per_s": iterations / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+    }
+
+def _task(i: int, task_type: Optional[str] = None) -> Task:
+    task_type = task_type or TASK_TYPES[i % len(TASK_TYPES)]
+    return Task(id=str(uuid.uuid4()), description=f"Benchmark {task_type} {i}", task_type=task_type,
+                payload={"recipient": f"user{i}@company.com", "title": f"Item {i}"})
+
+def build_scenarios(fake_cache: bool) -> Dict[str, Callable[[int], None]]:
+    """Operations for each scenario, sharing one in-process backend"""
+    import backend.main as api
+    from fastapi.testclient import TestClient
+
+    if not fake_cache:
+        api.response_cache = None
+    client = TestClient(api.app)
+    hr = api.personas.get("hr_manager")
+    supervisor = api.supervisor
+    gmail = supervisor.platform_agents["gmail"]
+    reflection = api.reflection_agent
+    ok = AgentResponse(success=True, message="Email sent successfully", data={"email_id": "1"})
+
+    def post(path: str, body: dict):
+        response = client.post(path, json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+
+    return {
+        "intent_extraction": lambda i: hr.interpret_user_intent(f"{MESSAGES[i % len(MESSAGES)]} #{i}"),
+        "supervisor_routing": lambda i: supervisor.execute_task(_task(i)),
+        "platform_execution": lambda i: gmail.execute_task(_task(i, "send_email")),
+        "reflection": lambda i: reflection.evaluate_task_completion(_task(i), ok),
+        "conversation": lambda i: post("/conversation", {
+            "persona": ["hr_manager", "it_support", "doctor"][i % 3],
+            "message": f"{MESSAGES[i % len(MESSAGES)]} (request {i})",
+        }),
+        "tasks": lambda i: post("/tasks", {
+            "description": f"Benchmark task {i}", "task_type": TASK_TYPES[i % len(TASK_TYPES)],
+            "payload": {"recipient": f"user{i}@company.com"},
+        }),
+        "workflow": lambda i: post("/workflow", {"mode": "parallel", "tasks": [
+            {"description": f"Workflow step {j}", "task_type": task_type, "payload": {"n": i}}
+            for j, task_type in enumerate(TASK_TYPES)
+        ]}),
+    }
+
+def parse_limits(items: List[str]) -> Dict[str, float]:
+    """["conversation=150"] -> {"conversation": 150.0}"""
+    limits = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario in threshold: {name}")
+        limits[name] = float(value)
+    return limits
+
+def check_regressions(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None,
+                      tolerance: float = 0.2, max_p95: Optional[Dict[str, float]] = None,
+                      min_throughput: Optional[Dict[str, float]] = None) -> List[str]:
+    """Human-readable failures; empty when every scenario is within its limits"""
+    failures = []
+    for name, result in results.items():
+        before = (baseline or {}).get(name)
+        if before:
+            if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                failures.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs baseline {before['p95_ms']:.2f} ms")
+            if result["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+                failures.append(f"{name}: throughput {result['throughput_per_s']:.0f}/s "
+                                f"vs baseline {before['throughput_per_s']:.0f}/s")
+        if max_p95 and name in max_p95 and result["p95_ms"] > max_p95[name]:
+            failures.append(f"{name}: p95 {result['p95_ms']:.2f} ms exceeds {max_p95[name]:.2f} ms")
+        if min_throughput and name in min_throughput and result["throughput_per_s"] < min_throughput[name]:
+            failures.append(f"{name}: throughput {result['throughput_per_s']:.0f}/s "
+                            f"below {min_throughput[name]:.0f}/s")
+    return failures
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset to run")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--llm-latency", default="fixed:0.02", help="fake LLM latency distribution (see fake_llm.py)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--cassette", help="replay LLM answers from this cassette instead of the fake LLM")
+    parser.add_argument("--cassette-match", choices=["exact", "normalized"], default="exact")
+    parser.add_argument("--cassette-latency-scale", type=float, default=0.0,
+                        help="sleep this fraction of the recorded LLM latency on replay")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression vs baseline")
+    parser.add_argument("--max-p95", action="append", default=[], metavar="SCENARIO=MS")
+    parser.add_argument("--min-throughput", action="append", default=[], metavar="SCENARIO=PER_S")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    fake_llm.install(args.llm_latency, args.seed, cache=args.llm_cache)
+    if args.cassette:
+        # Recorded agent runs are answered before the fake LLM is reached
+        from agents.cassette import cassette
+        cassette.configure(args.cassette, "replay", args.cassette_match, args.cassette_latency_scale)
+    operations = build_scenarios(args.llm_cache)
+
+    results = {}
+    print(f"{'scenario':<20} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in selected:
+        result = measure(operations[name], args.iterations, args.warmup)
+        results[name] = result
+        print(f"{name:<20} {result['throughput_per_s']:10.1f} {result['p50_ms']:9.2f} "
+              f"{result['p95_ms']:9.2f} {result['p99_ms']:9.2f}")
+
+    report = {
+        "config": {"iterations": args.iterations, "warmup": args.warmup, "llm_latency": args.llm_latency,
+                   "seed": args.seed, "llm_cache": args.llm_cache,
+                   "cassette": args.cassette, "python": platform.python_version()},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    failures = check_regressions(results, baseline, args.tolerance,
+                                 parse_limits(args.max_p95), parse_limits(args.min_throughput))
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tail latency of the LLM provider router when one backend degrades.
+
+Two fake backends with the same latency distribution sit behind a router.
+Each scenario first warms the router on healthy backends, then runs with the
+primary healthy, slowed down, or failing, once without and once with hedging.
+
+    python benchmarks/bench_providers.py
+    python benchmarks/bench_providers.py --latency lognormal:-3,0.3 --degraded-latency fixed:1.0 --json providers.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_pipeline import measure
+from agents.providers import FakeBackend, ProviderRouter
+
+MESSAGES = [{"role": "user", "content": "Summarize my open tickets"}]
+
+def run_scenario(scenario: str, hedge: bool, args) -> dict:
+    primary = FakeBackend("primary", args.latency, seed=args.seed)
+    secondary = FakeBackend("secondary", args.latency, seed=args.seed + 1)
+    router = ProviderRouter("bench", [primary, secondary], hedge=hedge, hedge_after=args.hedge_after)
+    call = lambda i: router.call(lambda backend: backend.complete(MESSAGES))
+    for i in range(args.warmup):
+        call(i)
+    if scenario == "primary_slow":
+        primary.set_latency(args.degraded_latency, args.seed)
+    elif scenario == "primary_down":
+        primary.error_rate = 1.0
+    return measure(call, args.iterations, 0)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=30, help="healthy calls before the scenario starts")
+    parser.add_argument("--latency", default="lognormal:-4,0.3", help="healthy backend latency")
+    parser.add_argument("--degraded-latency", default="fixed:0.5", help="primary latency in primary_slow")
+    parser.add_argument("--hedge-after", type=float, default=3.0, help="hedge delay before p95 samples exist")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'scenario':<14} {'hedge':<6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for scenario in ("healthy", "primary_slow", "primary_down"):
+        for hedge in (False, True):
+            result = run_scenario(scenario, hedge, args)
+            results[f"{scenario}.{'hedged' if hedge else 'unhedged'}"] = result
+            print(f"{scenario:<14} {str(hedge).lower():<6} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                  f"{result['p99_ms']:9.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
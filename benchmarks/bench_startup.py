@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start cost: module import time and first-request latency of
+the backend, each measured in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--preload]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = ["agents.personas", "ai_agent", "tools", "backend.main"]
+
+IMPORT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+REQUEST_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import backend.main as backend
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+if {preload}:
+    backend.preload_system()
+preloaded = time.perf_counter()
+client = TestClient(backend.app)
+response = client.post("/conversation", json={{"persona": "it_support", "message": "My laptop is broken"}})
+assert response.status_code == 200, response.text
+finished = time.perf_counter()
+print(json.dumps({{"import": imported - started, "preload": preloaded - imported, "first_request": finished - preloaded}}))
+"""
+
+def run(script: str) -> dict:
+    """Run a script in a fresh interpreter from the repository root and parse its JSON output"""
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--preload", action="store_true", help="Also measure first-request latency after preload_system()")
+    args = parser.parse_args()
+
+    print(f"median of {args.runs} fresh interpreters")
+    for module in MODULES:
+        try:
+            seconds = [run(IMPORT_SCRIPT.format(module=module))["seconds"] for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"import {module:<16}: failed ({e.stderr.strip().splitlines()[-1]})")
+            continue
+        print(f"import {module:<16}: {statistics.median(seconds) * 1000:8.1f} ms")
+
+    for preload in ([False, True] if args.preload else [False]):
+        samples = [run(REQUEST_SCRIPT.format(preload=preload)) for _ in range(args.runs)]
+        label = "preloaded" if preload else "cold"
+        for key in ("import", "preload", "first_request"):
+            if key == "preload" and not preload:
+                continue
+            value = statistics.median(sample[key] for sample in samples)
+            print(f"{label:<9} {key:<14}: {value * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Deterministic stand-in for the Gemini ReAct agent used by the benchmarks.
+
+install() swaps ai_agent's LLM and ReAct agent factory for fakes, so the full
+ask_agent path (cache lookup, single-flight, prompt generation) runs without
+network access. Replies depend only on the persona and the message, and each
+call sleeps for a latency drawn from a seeded distribution (the spec format
+is shared with the mock platform server, see agents/mock_platforms.py):
+
+    fixed:0.05              always 50 ms
+    lognormal:-3.0,0.5      exp(N(-3.0, 0.5)) seconds, a long-tailed distribution
+
+With use_tools=True the fake agent behaves like the real ReAct loop for
+webcam questions: a model call that emits the tool call, the tool itself, and
+a second model call. FakeLLM.invoke() stands in for the single multimodal call
+of the fast path (agents/multimodal.py), with image_latency added when a frame
+is attached.
+"""
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Sequence
+
+from agents.mock_platforms import parse_latency
+from agents.multimodal import needs_vision
+from agents.providers import Backend
+
+def _reply(prompt: str, query: str) -> str:
+    digest = hashlib.sha1(f"{prompt}\n{query}".encode()).hexdigest()[:8]
+    return f"Happy to help with that ({digest}). Here is what I suggest for: {query}"
+
+class FakeReactAgent:
+    """Mimics the compiled LangGraph agent: invoke() returns {"messages": [..., reply]}"""
+
+    def __init__(self, prompt: str, latency: Callable[[], float], tools: Sequence[Callable] = ()):
+        self.prompt = prompt
+        self.latency = latency
+        self.tools = tools
+
+    def invoke(self, input_messages):
+        query = input_messages["messages"][-1]["content"]
+        messages = []
+        if self.tools and needs_vision(query):
+            # Model round trip that decides to call the webcam tool, then the tool itself
+            time.sleep(self.latency())
+            messages.append(SimpleNamespace(type="ai", content="", tool_calls=[{"name": "analyze_image_with_query"}]))
+            messages.append(SimpleNamespace(type="tool", content=self.tools[0](query), tool_calls=[]))
+        time.sleep(self.latency())
+        messages.append(SimpleNamespace(type="ai", content=_reply(self.prompt, query), tool_calls=[]))
+        return {"messages": messages}
+
+class FakeLLM:
+    """Counts calls; installed as ai_agent's LLM and agent factory"""
+
+    def __init__(self, latency: str = "fixed:0.05", seed: int = 0, use_tools: bool = False,
+                 image_latency: str = "fixed:0"):
+        self.latency = parse_latency(latency, seed)
+        self.image_latency = parse_latency(image_latency, seed + 1)
+        self.use_tools = use_tools
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create_react_agent(self, model, tools, prompt):
+        with self._lock:
+            self.calls += 1
+        return FakeReactAgent(prompt, self.latency, tools if self.use_tools else ())
+
+    def invoke(self, messages):
+        """One direct model call with chat messages (the multimodal fast path)"""
+        with self._lock:
+            self.calls += 1
+        content = messages[-1]["content"]
+        query = content if isinstance(content, str) else content[0]["text"]
+        time.sleep(self.latency() + (0.0 if isinstance(content, str) else self.image_latency()))
+        return SimpleNamespace(content=_reply(messages[0]["content"], query))
+
+class FakeLLMBackend(Backend):
+    """Chat and vision backend answering through a FakeLLM"""
+
+    provider = "fake"
+
+    def __init__(self, fake: FakeLLM):
+        self.fake = fake
+        super().__init__("bench")
+
+    def _build_chat_model(self):
+        return self.fake
+
+    def warm(self):
+        pass
+
+def install(latency: str = "fixed:0.05", seed: int = 0, cache: bool = False, use_tools: bool = False,
+            image_latency: str = "fixed:0") -> FakeLLM:
+    """Route every persona LLM call through a FakeLLM (the response cache is disabled unless cache=True)"""
+    import ai_agent
+    import agents.personas
+    from agents.providers import chat_router, vision_router
+
+    fake = FakeLLM(latency, seed, use_tools, image_latency)
+    chat_router.configure([FakeLLMBackend(fake)])
+    vision_router.configure([FakeLLMBackend(fake)])
+    ai_agent._react_agent_factory = lambda: fake.create_react_agent
+    if not cache:
+        ai_agent.response_cache = None
+    agents.personas.ask_agent = ai_agent.ask_agent
+    agents.personas.AI_AVAILABLE = True
+    return fake
@@ -1,8 +1,10 @@
 import os
+import base64
 import gradio as gr
 from speech_to_text import record_audio, transcribe_with_groq
 from ai_agent import ask_agent
 from text_to_speech import text_to_speech_with_elevenlabs, text_to_speech_with_gtts
+from agents.voice_timing import voice_timing_log
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 audio_filepath = "audio_question.mp3"
@@ -16,25 +18,40 @@ def process_audio_and_chat(personality_input):
     
     chat_history = []
     while True:
+        # Per-stage timings of this turn go to the rolling voice timing log
+        turn = voice_timing_log.start_turn(current_personality)
         try:
-            record_audio(file_path=audio_filepath)
-            user_input = transcribe_with_groq(audio_filepath)
+            with turn.active():
+                record_audio(file_path=audio_filepath)
+                user_input = transcribe_with_groq(audio_filepath)
 
-            if "goodbye" in user_input.lower():
-                break
+                if "goodbye" in user_input.lower():
+                    break
 
-            response = ask_agent(user_query=user_input, personality_type=current_personality)
+                with turn.llm():
+                    response = ask_agent(user_query=user_input, personality_type=current_personality)
 
-            voice_of_doctor = text_to_speech_with_elevenlabs(input_text=response, output_filepath="final.mp3")
+                voice_of_doctor = text_to_speech_with_elevenlabs(input_text=response, output_filepath="final.mp3")
+            voice_timing_log.finish(turn)
 
             chat_history.append([user_input, response])
 
-            yield chat_history
+            yield chat_history, voice_timing_rows()
 
         except Exception as e:
+            voice_timing_log.finish(turn, error=str(e))
             print(f"Error in continuous recording: {e}")
             break
 
+def voice_timing_rows():
+    """Percentile table (milliseconds) of the voice turns in the timing log"""
+    return [[stage, stats["count"]] + [round(stats[key] * 1000) for key in ("p50", "p95", "p99", "mean")]
+            for stage, stats in voice_timing_log.summary()["stages"].items()]
+
+def export_voice_timing():
+    """Write the voice timing log to a JSONL file for download"""
+    return voice_timing_log.export_jsonl("voice_timing.jsonl")
+
 def process_text_chat(message, chat_history, personality_input):
     """Process text-based chat messages"""
     global current_personality
@@ -50,7 +67,8 @@ def process_text_chat(message, chat_history, personality_input):
     return "", chat_history
 
 # Code for frontend
-import cv2
+from tools import get_cv2, release_camera, set_frame_source  # OpenCV is imported on first camera use
+from agents.prewarm import session_prewarmer
 # Global variables
 camera = None
 is_running = False
@@ -60,6 +78,8 @@ def initialize_camera():
     """Initialize the camera with optimized settings"""
     global camera
     if camera is None:
+        release_camera()  # the device may still be held open by a session prewarm
+        cv2 = get_cv2()
         camera = cv2.VideoCapture(0)
         if camera.isOpened():
             # Optimize camera settings for better performance
@@ -78,7 +98,7 @@ def start_webcam():
     
     ret, frame = camera.read()
     if ret and frame is not None:
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame = get_cv2().cvtColor(frame, get_cv2().COLOR_BGR2RGB)
         last_frame = frame
         return frame
     return last_frame
@@ -99,6 +119,7 @@ def get_webcam_frame():
     if not is_running or camera is None:
         return last_frame
     
+    cv2 = get_cv2()
     # Skip frames if buffer is full to avoid lag
     if camera.get(cv2.CAP_PROP_BUFFERSIZE) > 1:
         for _ in range(int(camera.get(cv2.CAP_PROP_BUFFERSIZE)) - 1):
@@ -111,6 +132,23 @@ def get_webcam_frame():
         return frame
     return last_frame
 
+def latest_frame_jpeg():
+    """The live feed's last frame as base64 JPEG, so vision calls skip reopening the camera"""
+    if not is_running or last_frame is None:
+        return None
+    cv2 = get_cv2()
+    ok, buffer = cv2.imencode(".jpg", cv2.cvtColor(last_frame, cv2.COLOR_RGB2BGR))
+    return base64.b64encode(buffer).decode("utf-8") if ok else None
+
+set_frame_source(latest_frame_jpeg)
+
+def prewarm_session(personality_input):
+    """Warm clients, connections and the agent for a new session (see agents/prewarm.py)"""
+    personality = personality_input if personality_input.strip() else "general assistant"
+    # The webcam is only ever opened by "Start Camera"; once its feed runs the speculative
+    # first vision analysis can read a frame from it
+    session_prewarmer.start(personality, voice=True, camera=False, vision=is_running)
+
 # Setup UI
 
 with gr.Blocks() as demo:
@@ -173,11 +211,39 @@ with gr.Blocks() as demo:
             with gr.Row():
                 start_voice_btn = gr.Button("Start Voice Chat", variant="primary")
                 clear_btn = gr.Button("Clear Chat", variant="secondary")
+            
+            with gr.Accordion("⏱️ Voice Turn Latency", open=False):
+                voice_timing_table = gr.Dataframe(
+                    headers=["stage", "turns", "p50 ms", "p95 ms", "p99 ms", "mean ms"],
+                    value=voice_timing_rows,
+                    interactive=False
+                )
+                with gr.Row():
+                    refresh_timing_btn = gr.Button("Refresh", variant="secondary")
+                    export_timing_btn = gr.Button("Export JSONL", variant="secondary")
+                voice_timing_file = gr.File(label="Voice timing log", interactive=False)
     
     # Event handlers
     start_btn.click(
         fn=start_webcam,
         outputs=webcam_output
+    ).then(
+        fn=prewarm_session,
+        inputs=[personality_input]
+    )
+
+    # A session starts when the page loads, the personality is chosen or the camera is started (above)
+    demo.load(
+        fn=prewarm_session,
+        inputs=[personality_input]
+    )
+    personality_input.submit(
+        fn=prewarm_session,
+        inputs=[personality_input]
+    )
+    personality_input.blur(
+        fn=prewarm_session,
+        inputs=[personality_input]
     )
     
     stop_btn.click(
@@ -213,13 +279,29 @@ with gr.Blocks() as demo:
     start_voice_btn.click(
         fn=process_audio_and_chat,
         inputs=[personality_input],
-        outputs=chatbot
+        outputs=[chatbot, voice_timing_table]
+    )
+    
+    refresh_timing_btn.click(
+        fn=voice_timing_rows,
+        outputs=voice_timing_table
+    )
+    
+    export_timing_btn.click(
+        fn=export_voice_timing,
+        outputs=voice_timing_file
     )
 
 ## Launch the app
 app = demo
 
 if __name__ == "__main__":
+    import argparse
+    from agents.lazy import preload
+    parser = argparse.ArgumentParser(description="Run the voice and webcam assistant UI")
+    parser.add_argument("--preload", action="store_true", help="Load SDKs, model clients and OpenCV before serving")
+    if parser.parse_args().preload:
+        print(f"Preloaded: {preload()}")
     demo.launch(
         server_name="0.0.0.0",
         server_port=7860,
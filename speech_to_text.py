@@ -1,7 +1,6 @@
 import logging
-import speech_recognition as sr
-from pydub import AudioSegment
 from io import BytesIO
+from agents.voice_timing import current_turn, voice_stage
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -14,6 +13,10 @@ def record_audio(file_path, timeout=20, phrase_time_limit=None):
     timeout (int): Maximum time to wait for a phrase to start (in seconds).
     phrase_time_lfimit (int): Maximum time for the phrase to be recorded (in seconds).
     """
+    # Audio libraries are imported on first use to keep app startup fast
+    import speech_recognition as sr
+    from pydub import AudioSegment
+
     recognizer = sr.Recognizer()
     
     try:
@@ -23,13 +26,20 @@ def record_audio(file_path, timeout=20, phrase_time_limit=None):
             logging.info("Start speaking now...")
             
             # Record the audio
-            audio_data = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+            with voice_stage("listening"):
+                audio_data = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+            turn = current_turn()
+            if turn is not None:
+                turn.mark_speech_end()
+                # listen() only returns after pause_threshold seconds of silence
+                turn.add("endpointing", recognizer.pause_threshold)
             logging.info("Recording complete.")
             
             # Convert the recorded audio to an MP3 file
-            wav_data = audio_data.get_wav_data()
-            audio_segment = AudioSegment.from_wav(BytesIO(wav_data))
-            audio_segment.export(file_path, format="mp3", bitrate="128k")
+            with voice_stage("audio_encode"):
+                wav_data = audio_data.get_wav_data()
+                audio_segment = AudioSegment.from_wav(BytesIO(wav_data))
+                audio_segment.export(file_path, format="mp3", bitrate="128k")
             
             logging.info(f"Audio saved to {file_path}")
 
@@ -39,19 +49,32 @@ def record_audio(file_path, timeout=20, phrase_time_limit=None):
 
 
 import os
-from groq import Groq
+from tools import get_groq_client
+from agents.cassette import file_digest, recorded
 
 
+@recorded("stt", key=file_digest)
 def transcribe_with_groq(audio_filepath):
-    GROQ_API_KEY=os.environ.get("GROQ_API_KEY")
-    client=Groq(api_key=GROQ_API_KEY)
+    client=get_groq_client()
     stt_model="whisper-large-v3"
-    audio_file=open(audio_filepath, "rb")
-    transcription=client.audio.transcriptions.create(
-        model=stt_model,
-        file=audio_file,
-        language="en"
-    )
+    turn = current_turn()
+    started = turn.clock() if turn is not None else 0.0
+    with open(audio_filepath, "rb") as audio_file:
+        # Raw response so the server-reported processing time can split upload from inference
+        raw=client.audio.transcriptions.with_raw_response.create(
+            model=stt_model,
+            file=audio_file,
+            language="en"
+        )
+    transcription=raw.parse()
+
+    if turn is not None:
+        elapsed = turn.clock() - started
+        processing_ms = raw.headers.get("openai-processing-ms")
+        inference = min(float(processing_ms) / 1000, elapsed) if processing_ms else 0.0
+        turn.add("stt_upload", elapsed - inference)
+        if processing_ms:
+            turn.add("stt_inference", inference)
 
     return transcription.text
 
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline JSONL batch processor.
+"""
+import json
+import os
+import tempfile
+
+import pytest
+
+from agents.batch import BatchProcessor, completed_lines
+
+RECORDS = [
+    {"id": "t1", "persona": "it_support", "message": "My laptop is broken, can you create a ticket"},
+    {"id": "t2", "persona": "hr_manager", "message": "I need to onboard a new hire"},
+    {"id": "t3", "persona": "nobody", "message": "Hello"},
+    {"id": "t4", "persona": "doctor", "message": "What are the symptoms of a cold"},
+    {"id": "t5", "message": "Please reset my password"},
+]
+
+def _write_input(directory):
+    path = os.path.join(directory, "input.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for record in RECORDS[:2]:
+            f.write(json.dumps(record) + "\n")
+        f.write("{not json\n\n")
+        for record in RECORDS[2:]:
+            f.write(json.dumps(record) + "\n")
+    return path
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_ordered_output_and_errors():
+    """Results follow input order; bad lines and unknown personas become error records"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "out.jsonl")
+        stats = BatchProcessor(workers=3, max_in_flight=2, default_persona="it_support").run(_write_input(directory), output)
+        results = _read(output)
+
+    assert [r["line"] for r in results] == [1, 2, 3, 5, 6, 7]
+    assert [r["id"] for r in results] == ["t1", "t2", None, "t3", "t4", "t5"]
+    assert "invalid JSON" in results[2]["error"]
+    assert results[3]["error"] == "unknown persona: nobody"
+    assert results[0]["error"] is None and results[0]["tasks"][0]["task_type"] == "create_ticket"
+    assert results[5]["persona"] == "it_support"
+    assert stats["processed"] == 6 and stats["errors"] == 2
+
+def test_unordered_output_has_every_record():
+    """Unordered mode writes the same results, in completion order"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "out.jsonl")
+        BatchProcessor(workers=4, ordered=False).run(_write_input(directory), output)
+        assert sorted(r["line"] for r in _read(output)) == [1, 2, 3, 5, 6, 7]
+
+def test_resume_skips_completed_lines():
+    """A resumed run drops the torn last line and processes only what is missing"""
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = _write_input(directory)
+        output = os.path.join(directory, "out.jsonl")
+        BatchProcessor(workers=2).run(input_path, output, limit=3)
+        with open(output, "a", encoding="utf-8") as f:
+            f.write('{"line": 5, "id": "t3", "err')
+
+        assert completed_lines(output) == {1, 2, 3}
+        with pytest.raises(FileExistsError):
+            BatchProcessor().run(input_path, output)
+        stats = BatchProcessor(workers=2).run(input_path, output, resume=True)
+        results = _read(output)
+
+    assert stats["skipped"] == 3 and stats["processed"] == 3
+    assert [r["line"] for r in results] == [1, 2, 3, 5, 6, 7]
+
+def test_process_pool():
+    """Process workers build their own agent system and return the same result records"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "out.jsonl")
+        stats = BatchProcessor(workers=2, executor="process").run(_write_input(directory), output, limit=2)
+        results = _read(output)
+    assert stats["processed"] == 2
+    assert [r["id"] for r in results] == ["t1", "t2"]
+    assert all(r["error"] is None for r in results)
+
+if __name__ == "__main__":
+    print("🧪 Running Batch Processing Tests")
+    test_ordered_output_and_errors()
+    test_unordered_output_has_every_record()
+    test_resume_skips_completed_lines()
+    test_process_pool()
+    print("✅ All batch processing tests passed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline benchmark helpers and the fake LLM.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import pytest
+
+from bench_pipeline import percentile, check_regressions
+from fake_llm import FakeLLM, parse_latency
+
+def test_percentile_interpolates():
+    """Percentiles of sorted samples"""
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 95) == 0.0
+
+def test_regressions_against_baseline_and_thresholds():
+    """Slower p95 or lower throughput beyond the tolerance, or a missed threshold, is reported"""
+    baseline = {"tasks": {"p95_ms": 10.0, "throughput_per_s": 100.0}}
+    within = {"tasks": {"p95_ms": 11.0, "throughput_per_s": 90.0}}
+    slower = {"tasks": {"p95_ms": 13.0, "throughput_per_s": 70.0}}
+    assert check_regressions(within, baseline, tolerance=0.2) == []
+    assert len(check_regressions(slower, baseline, tolerance=0.2)) == 2
+    assert len(check_regressions(within, None, max_p95={"tasks": 5.0}, min_throughput={"tasks": 95.0})) == 2
+
+def test_fake_llm_is_deterministic():
+    """Same seed, same latencies; same prompt and message, same reply"""
+    assert [parse_latency("uniform:0.01,0.02", seed=3)() for _ in range(2)] == \
+           [parse_latency("uniform:0.01,0.02", seed=3)() for _ in range(2)]
+    assert parse_latency("fixed:0.5")() == 0.5
+    with pytest.raises(ValueError):
+        parse_latency("poisson:1")
+
+    fake = FakeLLM("fixed:0")
+    ask = lambda: fake.create_react_agent(None, [], "prompt").invoke({"messages": [{"role": "user", "content": "hi"}]})
+    assert ask()["messages"][-1].content == ask()["messages"][-1].content
+    assert fake.calls == 2
+
+if __name__ == "__main__":
+    print("🧪 Running Pipeline Benchmark Tests")
+    test_percentile_interpolates()
+    test_regressions_against_baseline_and_thresholds()
+    test_fake_llm_is_deterministic()
+    print("✅ All pipeline benchmark tests passed!")
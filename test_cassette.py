@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the record/replay cassette layer.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# test_integration.py leaves stub modules in sys.modules at collection time
+for name in ("tools", "dotenv"):
+    if type(sys.modules.get(name)).__name__ == "MockModule":
+        del sys.modules[name]
+
+import text_to_speech
+from agents.cassette import Cassette, CassetteMiss, cassette, recorded
+
+@recorded("echo", key=lambda text, calls: text)
+def _echo(text, calls):
+    calls.append(text)
+    return [text.upper(), len(calls)]
+
+@pytest.fixture
+def cassette_path():
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "calls.jsonl.gz")
+    cassette.configure(None)
+
+def test_record_then_replay(cassette_path):
+    """Replay serves recorded responses without calling through, in recording order"""
+    calls = []
+    cassette.configure(cassette_path, "record")
+    assert _echo("hi", calls) == ["HI", 1]
+    assert _echo("hi", calls) == ["HI", 2]
+    assert cassette.stats()["recorded"] == 2
+
+    cassette.configure(cassette_path, "replay")
+    replayed = []
+    assert [_echo("hi", replayed) for _ in range(3)] == [["HI", 1], ["HI", 2], ["HI", 2]]
+    assert replayed == []
+    with pytest.raises(CassetteMiss):
+        _echo("Hi!", replayed)
+
+    # Normalized matching ignores case, punctuation and spacing
+    cassette.configure(cassette_path, "replay", match="normalized")
+    assert _echo("  Hi! ", replayed) == ["HI", 1]
+
+def test_auto_mode_records_misses(cassette_path):
+    calls = []
+    cassette.configure(cassette_path, "auto")
+    _echo("one", calls)
+    _echo("one", calls)
+    assert calls == ["one"]
+    assert cassette.stats() == {"replayed": 1, "recorded": 1, "misses": 1, "mode": "auto",
+                                "match": "exact", "entries": 1}
+
+def test_replay_with_recorded_latency(cassette_path):
+    """latency_scale sleeps a fraction of the recorded latency"""
+    recorder = Cassette(cassette_path, "record")
+    recorder.record("llm", ["doctor", "hello"], "Hi there", latency=2.0)
+    slept = []
+    player = Cassette(cassette_path, "replay", latency_scale=0.5, sleep=slept.append)
+    assert player.call("llm", ("doctor", "hello"), lambda: "live") == "Hi there"
+    assert slept == [1.0]
+
+def test_tts_audio_round_trips_as_bytes(cassette_path):
+    """Synthesized audio is stored base64 encoded and written back to the output file on replay"""
+    Cassette(cassette_path, "record").record("tts", ["elevenlabs", "Hello"], b"\x00ID3audio", latency=0.3)
+    cassette.configure(cassette_path, "replay")
+    played = []
+    original = text_to_speech.play_audio
+    text_to_speech.play_audio = played.append
+    try:
+        output = cassette_path + ".mp3"
+        text_to_speech.text_to_speech_with_elevenlabs("Hello", output)
+        with open(output, "rb") as f:
+            assert f.read() == b"\x00ID3audio"
+    finally:
+        text_to_speech.play_audio = original
+    assert played == [output]
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        Cassette(mode="replay")
+    with pytest.raises(ValueError):
+        Cassette("x.jsonl", mode="rewind")
+
+if __name__ == "__main__":
+    print("🧪 Running Cassette Tests")
+    for test in (test_record_then_replay, test_auto_mode_records_misses, test_replay_with_recorded_latency,
+                 test_tts_audio_round_trips_as_bytes):
+        directory = tempfile.mkdtemp()
+        test(os.path.join(directory, "calls.jsonl.gz"))
+        cassette.configure(None)
+    test_invalid_configuration()
+    print("✅ All cassette tests passed!")
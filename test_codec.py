@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the Task/AgentResponse dict helpers and binary codec.
+"""
+import uuid
+
+import pytest
+
+from agents import codec
+from agents.base import Task, AgentResponse, TaskStatus, TaskPriority
+from agents.codec import (encode, decode, task_to_dict, task_from_dict, response_to_dict, response_from_dict,
+                          CodecError, CODEC_VERSION)
+from agents.reflection import ReflectionAgent
+
+def _task(**overrides):
+    fields = dict(id=str(uuid.uuid4()), description="Send welcome email", task_type="send_email",
+                  payload={"recipient": "new.hire@company.com", "attempts": 3, "score": 0.5, "tags": ["onboarding", None],
+                           "big": 2 ** 40, "negative": -70000, "unicode": "café " * 20, "blob": b"\x00\x01"},
+                  status=TaskStatus.COMPLETED, priority=TaskPriority.URGENT, assigned_agent="gmail_platform",
+                  result={"email_id": "abc"}, parent_task_id="parent", created_by="hr_manager")
+    fields.update(overrides)
+    return Task(**fields)
+
+def _response():
+    return AgentResponse(success=True, message="Done", data={"n": 1}, tasks_created=[_task(), _task(payload={})],
+                         requires_clarification=True, clarification_question="Which team?")
+
+@pytest.fixture(params=["builtin", "msgpack"])
+def backend(request, monkeypatch):
+    if request.param == "msgpack":
+        if not codec.MSGPACK_AVAILABLE:
+            pytest.skip("msgpack not installed")
+    else:
+        monkeypatch.setattr(codec, "MSGPACK_AVAILABLE", False)
+    return request.param
+
+def test_slotted_dataclasses():
+    """No per-instance __dict__"""
+    assert not hasattr(_task(), "__dict__")
+    assert not hasattr(_response(), "__dict__")
+
+def test_dict_roundtrip_handles_enums():
+    """Enums become values and come back from values or members"""
+    task, response = _task(), _response()
+    data = task_to_dict(task)
+    assert data["status"] == "completed" and data["priority"] == "urgent"
+    assert task_from_dict(data) == task
+    assert task_from_dict({**data, "status": TaskStatus.COMPLETED}) == task
+    assert response_from_dict(response_to_dict(response)) == response
+
+def test_binary_roundtrip(backend):
+    """Single objects and lists survive encode/decode; the positional form is smaller than JSON"""
+    task, response = _task(), _response()
+    assert decode(encode(task)) == task
+    assert decode(encode(response)) == response
+    batch = [task, response, _task(status=TaskStatus.PENDING)]
+    assert decode(encode(batch)) == batch
+    assert decode(encode([])) == []
+    assert encode(task)[0] == CODEC_VERSION
+
+def test_binary_rejects_bad_input(backend):
+    """Unsupported objects, unknown versions and truncated data raise CodecError"""
+    with pytest.raises(CodecError):
+        encode({"not": "a task"})
+    blob = encode(_task())
+    with pytest.raises(CodecError):
+        decode(bytes([CODEC_VERSION + 1]) + blob[1:])
+    with pytest.raises((CodecError, ValueError)):
+        decode(blob[:-3])
+
+def test_reflection_accepts_serialized_payloads():
+    """evaluate_completion tasks carrying dicts with string enums no longer break"""
+    target = _task()
+    request = Task(id=str(uuid.uuid4()), description="Evaluate", task_type="evaluate_completion", payload={
+        "target_task": task_to_dict(target),
+        "target_response": response_to_dict(AgentResponse(success=True, message="Email sent to the team")),
+    })
+    response = ReflectionAgent().execute_task(request)
+    assert response.success and response.data["task_id"] == target.id
+
+if __name__ == "__main__":
+    print("🧪 Running Codec Tests")
+    test_slotted_dataclasses()
+    test_dict_roundtrip_handles_enums()
+    test_binary_roundtrip("builtin")
+    test_binary_rejects_bad_input("builtin")
+    test_reflection_accepts_serialized_payloads()
+    print("✅ All codec tests passed!")
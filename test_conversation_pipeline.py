@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent conversation pipeline.
+"""
+import time
+
+from agents.pipeline import ConversationPipeline
+from agents.personas import HRManagerAgent
+from agents.platforms import GitHubPlatformAgent, GmailPlatformAgent
+from agents.reflection import ReflectionAgent
+from agents.supervisor import HierarchicalSupervisor
+
+def _slow(fn, delay):
+    """Wrap fn so it sleeps for delay seconds first"""
+    def wrapped(*args, **kwargs):
+        time.sleep(delay)
+        return fn(*args, **kwargs)
+    return wrapped
+
+def test_onboarding_turn_overlaps_llm_and_tasks():
+    """GitHub and email tasks run while the LLM generates, so the turn takes max(LLM, tasks)"""
+    supervisor = HierarchicalSupervisor()
+    github = GitHubPlatformAgent()
+    gmail = GmailPlatformAgent()
+    supervisor.register_platform_agent("github", github)
+    supervisor.register_platform_agent("gmail", gmail)
+
+    github.execute_task = _slow(github.execute_task, 0.2)
+    gmail.execute_task = _slow(gmail.execute_task, 0.2)
+
+    hr = HRManagerAgent()
+    hr.generate_response = _slow(lambda message, context=None: "Welcome aboard!", 0.3)
+
+    pipeline = ConversationPipeline(supervisor, ReflectionAgent())
+    started = time.monotonic()
+    result = pipeline.run(hr, "I need to onboard a new hire. They need GitHub access and a welcome email.")
+    elapsed = time.monotonic() - started
+    pipeline.shutdown()
+
+    assert result.response.message == "Welcome aboard!"
+    assert [o.task.task_type for o in result.task_outcomes] == ["github_create_issue", "send_email"]
+    assert all("quality_score" in o.evaluation for o in result.task_outcomes)
+    # Sequential execution would take 0.3 + 0.2 + 0.2 = 0.7s
+    assert elapsed < 0.55
+
+if __name__ == "__main__":
+    print("🧪 Running Conversation Pipeline Tests")
+    test_onboarding_turn_overlaps_llm_and_tasks()
+    print("✅ All conversation pipeline tests passed!")
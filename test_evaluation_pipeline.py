@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the background evaluation pipeline.
+"""
+import threading
+import time
+import uuid
+
+from agents.base import Task, AgentResponse
+from agents.evaluation_pipeline import EvaluationPipeline
+from agents.reflection import ReflectionAgent
+
+def _task(task_type="send_email"):
+    return Task(id=str(uuid.uuid4()), description=task_type, task_type=task_type, payload={})
+
+def _ok():
+    return AgentResponse(success=True, message="Email sent to the team", data={"id": 1})
+
+def test_async_submit_returns_immediately_and_batches():
+    """Evaluations are queued, recorded in batches by the worker and visible after flush"""
+    reflection = ReflectionAgent()
+    release = threading.Event()
+    batches = []
+    evaluate_batch = reflection.evaluate_batch
+
+    def slow_batch(completed, latencies=None):
+        release.wait(2)
+        batches.append(len(completed))
+        return evaluate_batch(completed, latencies)
+
+    reflection.evaluate_batch = slow_batch
+    pipeline = EvaluationPipeline(reflection, batch_size=8, batch_wait=0.05)
+    started = time.monotonic()
+    results = [pipeline.submit(_task(), _ok()) for _ in range(20)]
+    assert time.monotonic() - started < 0.1
+    assert results == [None] * 20
+    time.sleep(0.05)
+    assert pipeline.stats()["lag_seconds"] > 0
+
+    release.set()
+    assert pipeline.flush(timeout=2)
+    assert reflection.get_evaluation_summary()["total_evaluations"] == 20
+    assert sum(batches) == 20 and max(batches) <= 8 and len(batches) < 20
+    stats = pipeline.stats()
+    assert stats["evaluated"] == 20 and stats["queue_depth"] == 0 and stats["lag_seconds"] == 0
+    pipeline.shutdown()
+
+def test_inline_mode_and_per_call_override_return_scores():
+    """Inline evaluation returns the score; a full queue degrades to inline instead of dropping"""
+    reflection = ReflectionAgent()
+    assert EvaluationPipeline(reflection, mode="inline").submit(_task(), _ok())["quality_score"] == 100
+
+    pipeline = EvaluationPipeline(reflection, max_queue=1)
+    assert pipeline.submit(_task(), _ok(), inline=True)["quality_score"] == 100
+    pipeline.shutdown()
+
+    blocked = threading.Event()
+    reflection.evaluate_batch = lambda completed, latencies=None: blocked.wait(2)
+    pipeline = EvaluationPipeline(reflection, max_queue=1, batch_wait=0)
+    outcomes = [pipeline.submit(_task(), _ok()) for _ in range(3)]
+    assert any(outcome is not None for outcome in outcomes)
+    assert pipeline.stats()["overflowed"] >= 1
+    blocked.set()
+    pipeline.shutdown()
+
+if __name__ == "__main__":
+    print("🧪 Running Evaluation Pipeline Tests")
+    test_async_submit_returns_immediately_and_batches()
+    test_inline_mode_and_per_call_override_return_scores()
+    print("✅ All evaluation pipeline tests passed!")
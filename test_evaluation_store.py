@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar evaluation store.
+"""
+import threading
+import uuid
+
+import numpy as np
+import pytest
+
+from agents.base import Task, AgentResponse
+from agents.evaluation_store import EvaluationStore
+from agents.reflection import ReflectionAgent
+
+def _evaluation(task_type, success, quality, issues=(), recommendations=()):
+    return {"task_type": task_type, "success": success, "completeness_score": 100 if success else 20,
+            "quality_score": quality, "issues_identified": list(issues), "recommendations": list(recommendations)}
+
+def _store():
+    store = EvaluationStore(initial_capacity=2)
+    store.extend([
+        _evaluation("send_email", True, 100, recommendations=["Track delivery"]),
+        _evaluation("send_email", False, 20, issues=["Task execution failed"]),
+        _evaluation("create_ticket", True, 60, issues=["Requires user clarification"]),
+    ], timestamps=[0, 30, 3700], latencies=[0.1, None, 0.3])
+    store.append(_evaluation("send_email", True, 80, issues=["Task execution failed"]), timestamp=3800, latency=0.2)
+    return store
+
+def test_queries_match_python_computation():
+    """Percentiles, breakdowns, trends and label counts over the columns"""
+    store = _store()
+    assert len(store) == 4
+    assert store.percentiles("quality", q=(50,)) == {"p50": float(np.percentile([100, 20, 60, 80], 50))}
+    assert store.percentiles("latency", q=(50,))["p50"] == pytest.approx(0.2)
+    assert store.percentiles("quality", task_type="create_ticket", q=(90,)) == {"p90": 60.0}
+    assert store.by_task_type()["send_email"] == {
+        "count": 3, "success_rate": pytest.approx(200 / 3), "average_quality": pytest.approx(200 / 3),
+        "average_completeness": pytest.approx(220 / 3)}
+    assert store.by_task_type(since=3600) == {
+        "create_ticket": {"count": 1, "success_rate": 100.0, "average_quality": 60.0, "average_completeness": 100.0},
+        "send_email": {"count": 1, "success_rate": 100.0, "average_quality": 80.0, "average_completeness": 100.0}}
+    assert store.trend("quality", bucket_seconds=3600) == {"bucket_start": [0.0, 3600.0], "mean": [60.0, 70.0], "count": [2, 2]}
+    assert store.moving_average("quality", window=2).tolist() == [100, 60, 40, 70]
+    assert store.label_counts("issues") == [("Task execution failed", 2), ("Requires user clarification", 1)]
+    with pytest.raises(ValueError):
+        store.percentiles("task_id")
+
+def test_export_roundtrip(tmp_path):
+    """save() loads back memory mapped; to_npz() loads back from one file; both answer the same queries"""
+    store = _store()
+    views = store.columns()
+    assert np.shares_memory(views["quality"], store._columns["quality"])
+
+    store.save(str(tmp_path / "columns"))
+    store.to_npz(str(tmp_path / "evaluations.npz"))
+    mapped = EvaluationStore.load(str(tmp_path / "columns"))
+    bundled = EvaluationStore.load(str(tmp_path / "evaluations.npz"))
+    assert isinstance(mapped.columns()["quality"], np.memmap)
+    for loaded in (mapped, bundled):
+        assert loaded.summary() == store.summary()
+    mapped.append(_evaluation("code_review", True, 100))
+    assert mapped.by_task_type()["code_review"]["count"] == 1
+
+def test_reflection_feeds_store_with_latency():
+    """The reflection agent appends every evaluation with its task latency"""
+    store = EvaluationStore()
+    reflection = ReflectionAgent(store=store, history_limit=1)
+    task = Task(id=str(uuid.uuid4()), description="Send email", task_type="send_email", payload={})
+    reflection.evaluate_task_completion(task, AgentResponse(success=True, message="Email sent to the team"), latency=0.25)
+    reflection.evaluate_batch([(task, AgentResponse(success=False, message="failed"))], [0.75])
+
+    assert len(store) == 2 and len(reflection.evaluation_history) == 1
+    assert store.percentiles("latency", q=(50,)) == {"p50": pytest.approx(0.5)}
+    assert store.by_task_type()["send_email"]["success_rate"] == 50
+
+def test_max_rows_keeps_most_recent():
+    """Past max_rows the oldest rows (and their issue lists) are dropped"""
+    store = EvaluationStore(initial_capacity=2, max_rows=4)
+    for i in range(6):
+        store.append(_evaluation("send_email", True, i * 10, issues=[f"issue {i}"] * (i % 2)), timestamp=i)
+
+    # The fifth row crossed max_rows and dropped the two oldest; the sixth fits again
+    assert len(store) == 4
+    assert list(store.columns()["quality"]) == [20, 30, 40, 50]
+    assert sorted(store.label_counts("issues")) == [("issue 3", 1), ("issue 5", 1)]
+    assert list(store.columns()["issues_offsets"]) == [0, 0, 1, 1, 2]
+
+def test_reads_are_consistent_while_rows_are_dropped():
+    """Views taken before a drop keep their rows; concurrent readers see lined-up columns"""
+    store = EvaluationStore(initial_capacity=2, max_rows=8)
+    for i in range(8):
+        store.append(_evaluation("send_email", True, i, issues=[f"issue {i}"]), timestamp=i)
+    before = store.columns()
+    store.append(_evaluation("send_email", True, 8, issues=["issue 8"]), timestamp=8)
+    assert list(before["quality"]) == list(range(8))
+    assert list(before["issues_offsets"]) == list(range(9))
+
+    # Every row has quality == timestamp and one issue, so any torn read shows up as a mismatch
+    def write():
+        for i in range(9, 3000):
+            store.append(_evaluation("send_email", True, i % 100, issues=[f"issue {i}"]), timestamp=i % 100)
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        view = store.columns()
+        assert np.array_equal(view["quality"], view["timestamp"])
+        assert len(view["issues_codes"]) == len(view["quality"]) == view["issues_offsets"][-1]
+        assert store.summary()["total_evaluations"] <= 8
+    writer.join()
+    assert len(store) <= 8
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    print("🧪 Running Evaluation Store Tests")
+    test_queries_match_python_computation()
+    with tempfile.TemporaryDirectory() as directory:
+        test_export_roundtrip(Path(directory))
+    test_reflection_feeds_store_with_latency()
+    test_max_rows_keeps_most_recent()
+    test_reads_are_consistent_while_rows_are_dropped()
+    print("✅ All evaluation store tests passed!")
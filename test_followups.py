@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the automatic follow-up stage.
+"""
+import uuid
+
+from agents.base import Task, AgentResponse
+from agents.followups import FollowUpStage, TokenBucket, parse_rate_limits
+from agents.platforms import GitHubPlatformAgent, GmailPlatformAgent
+from agents.reflection import ReflectionAgent
+from agents.supervisor import HierarchicalSupervisor
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _stage(**kwargs):
+    supervisor = HierarchicalSupervisor()
+    supervisor.register_platform_agent("github", GitHubPlatformAgent())
+    supervisor.register_platform_agent("gmail", GmailPlatformAgent())
+    return FollowUpStage(supervisor, ReflectionAgent(), **kwargs)
+
+def _issue_created():
+    task = Task(id=str(uuid.uuid4()), description="Create onboarding issue", task_type="github_create_issue", payload={})
+    return task, AgentResponse(success=True, message="Issue created", data={"issue_id": 42})
+
+def test_follow_up_chain_runs_in_batches():
+    """An issue gets a confirmation email, which in turn gets delivery tracking"""
+    stage = _stage()
+    task, response = _issue_created()
+    stage.supervisor.state.save_task(task)
+
+    accepted = stage.submit(task, response)
+    assert [t.task_type for t in accepted] == ["send_email"]
+    assert stage.drain() == 2
+
+    chain = stage.chain(task.id)
+    assert chain["follow_ups"][0]["task_type"] == "send_email"
+    assert chain["follow_ups"][0]["status"] == "completed"
+    assert chain["follow_ups"][0]["follow_ups"][0]["task_type"] == "email_followup"
+    assert stage.depth(chain["follow_ups"][0]["follow_ups"][0]["task_id"]) == 2
+    assert stage.stats()["batches"] == 2
+
+def test_duplicates_coalesced_within_window():
+    """A second follow-up for the same parent is dropped until the window passes"""
+    clock = FakeClock()
+    stage = _stage(dedup_window=60, clock=clock)
+    task, response = _issue_created()
+
+    assert len(stage.submit(task, response)) == 1
+    assert stage.submit(task, response) == []
+    assert stage.stats()["coalesced"] == 1
+    clock.now += 61
+    assert len(stage.submit(task, response)) == 1
+
+    recipient = lambda: Task(id=str(uuid.uuid4()), description="Reminder", task_type="send_email",
+                             payload={"to": "new.hire@company.com", "subject": "Reminder"}, parent_task_id=str(uuid.uuid4()))
+    assert FollowUpStage.dedup_key(recipient()) == FollowUpStage.dedup_key(recipient())
+
+def test_rate_limit_defers_platform_tasks():
+    """Only `rate` tasks per second run for a limited platform; the rest wait in order"""
+    clock = FakeClock()
+    stage = _stage(rate_limits=parse_rate_limits("gmail=2"), clock=clock)
+    for _ in range(5):
+        stage.submit(*_issue_created())
+
+    assert len(stage.process()) == 2
+    # Three queued confirmations plus the delivery tracking for the two that ran
+    assert stage.pending() == 5
+    assert stage.process() == []
+    clock.now += 1
+    assert len(stage.process()) == 2
+
+    bucket = TokenBucket(rate=2, clock=clock)
+    bucket.try_acquire(), bucket.try_acquire()
+    assert bucket.wait_time() == 0.5
+
+def test_pending_queue_is_bounded():
+    """Without a worker draining it the queue stops at max_pending and counts the rest"""
+    stage = _stage(max_pending=3)
+    for _ in range(5):
+        stage.submit(*_issue_created())
+
+    assert stage.pending() == 3
+    assert stage.stats()["dropped"] == 2
+
+if __name__ == "__main__":
+    print("🧪 Running Follow-up Stage Tests")
+    test_follow_up_chain_runs_in_batches()
+    test_duplicates_coalesced_within_window()
+    test_rate_limit_defers_platform_tasks()
+    test_pending_queue_is_bounded()
+    print("✅ All follow-up stage tests passed!")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared single-pass intent engine (agents/intents.py).
+"""
+import re
+
+from agents.intents import IntentEngine, split_alternatives, literal_prefix
+from agents.intent_classifier import IntentClassifier
+from agents.personas import HRManagerAgent, ITSupportAgent, DoctorAgent
+
+MESSAGES = [
+    "I need to onboard a new software developer. They need GitHub access and a welcome email.",
+    "My laptop is running very slowly and I can't access the company VPN. Can you help?",
+    "I've been having persistent headaches for the past week. Can I schedule an appointment?",
+    "Please FOLLOW me UP on the lab results",
+    "Setup a repo for the new employee and send them a message",
+    "hello there",
+    "",
+]
+
+def _legacy(groups, message):
+    """Reference implementation: one re.search per pattern"""
+    return {
+        name for name, patterns in groups.items()
+        if any(re.search(pattern, message, re.IGNORECASE) for pattern in patterns)
+    }
+
+def test_split_alternatives_respects_groups_and_classes():
+    """Only top-level bars split a pattern"""
+    assert split_alternatives(r"a|b(c|d)|[|]|e\|f") == ["a", "b(c|d)", "[|]", r"e\|f"]
+
+def test_literal_prefix():
+    """The literal prefix stops at metacharacters and excludes quantified characters"""
+    assert literal_prefix("create.*issue") == ("create", ".*issue")
+    assert literal_prefix("colou?r") == ("colo", "u?r")
+    assert literal_prefix("email") == ("email", "")
+
+def test_engine_matches_legacy_semantics():
+    """The combined matcher returns exactly the groups the per-pattern loop finds"""
+    personas = [HRManagerAgent(), ITSupportAgent(), DoctorAgent()]
+    engine = IntentEngine()
+    for persona in personas:
+        engine.register_scope(persona.agent_id, type(persona).intent_patterns)
+
+    for message in MESSAGES:
+        for persona in personas:
+            expected = _legacy(type(persona).intent_patterns, message)
+            assert engine.match_scope(persona.agent_id, message) == expected, (persona.agent_id, message)
+
+def test_overlapping_alternatives_at_same_position():
+    """Alternatives sharing a start position in different groups are all reported"""
+    engine = IntentEngine()
+    engine.register("s", "short", ["repo"])
+    engine.register("s", "long", ["repository"])
+    engine.register("s", "wild", ["rep.*ticket"])
+
+    assert engine.match_scope("s", "open the Repository ticket") == {"short", "long", "wild"}
+    assert engine.match_scope("s", "repo") == {"short"}
+
+def test_personas_create_same_tasks():
+    """Persona task creation is unchanged by the engine"""
+    hr_tasks = HRManagerAgent().interpret_user_intent(MESSAGES[0])
+    assert [t.task_type for t in hr_tasks] == ["github_create_issue", "send_email"]
+
+    it_tasks = ITSupportAgent().interpret_user_intent(MESSAGES[1])
+    assert [t.payload["category"] for t in it_tasks] == ["technical_support", "software_request"]
+
+    doctor_tasks = DoctorAgent().interpret_user_intent(MESSAGES[2])
+    assert [t.task_type for t in doctor_tasks] == ["schedule_meeting"]
+
+    assert HRManagerAgent().interpret_user_intent("hello there") == []
+
+def test_vector_classifier_batch_and_thresholds():
+    """The vector backend scores paraphrases and honours per-intent thresholds"""
+    classifier = IntentClassifier()
+    classifier.register_scope("it_support", ITSupportAgent.intent_exemplars)
+
+    results = classifier.classify_batch(
+        ["My computer keeps freezing", "I forgot my password", "hi there"],
+        scope="it_support"
+    )
+    assert results == [{"issue"}, {"software"}, set()]
+
+    classifier.set_threshold("it_support", "issue", 0.99)
+    assert classifier.classify("My computer keeps freezing", scope="it_support") == set()
+    assert classifier.classify("anything", scope="unknown_persona") == set()
+
+def test_persona_vector_backend():
+    """Personas can switch interpret_user_intent to the vector or hybrid backend"""
+    it = ITSupportAgent()
+    it.intent_backend = "vector"
+    tasks = it.interpret_user_intent("The printer on floor 3 is broken again")
+    assert [t.payload["category"] for t in tasks] == ["technical_support"]
+
+    it.intent_backend = "hybrid"
+    assert it.match_intents("please install the tool") >= {"software"}
+
+if __name__ == "__main__":
+    print("🧪 Running Intent Engine Tests")
+    test_split_alternatives_respects_groups_and_classes()
+    test_literal_prefix()
+    test_engine_matches_legacy_semantics()
+    test_overlapping_alternatives_at_same_position()
+    test_personas_create_same_tasks()
+    test_vector_classifier_batch_and_thresholds()
+    test_persona_vector_backend()
+    print("✅ All intent engine tests passed!")
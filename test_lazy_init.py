@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy initialization of heavy SDKs and clients.
+"""
+import subprocess
+import sys
+
+from agents.lazy import Lazy, lazy, preload, loaded_resources
+
+def test_lazy_builds_once_and_retries_after_errors():
+    """The factory runs on first call only; a failed build is retried next time"""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("missing api key")
+        return object()
+
+    resource = Lazy(factory)
+    assert not resource.loaded
+    try:
+        resource()
+        assert False, "expected the first build to fail"
+    except RuntimeError:
+        pass
+    value = resource()
+    assert resource() is value
+    assert len(calls) == 2 and resource.loaded
+
+def test_preload_reports_timings_and_errors():
+    """preload builds the named resources and never raises"""
+    @lazy("test_ok")
+    def ok():
+        return "client"
+
+    @lazy("test_broken")
+    def broken():
+        raise ValueError("no credentials")
+
+    report = preload(["test_ok", "test_broken"])
+    assert isinstance(report["test_ok"], float)
+    assert report["test_broken"] == "error: no credentials"
+    assert loaded_resources()["test_ok"] is True
+    assert loaded_resources()["test_broken"] is False
+
+def test_importing_agents_does_not_load_sdks():
+    """Importing the persona agents and reflection leaves the LLM SDKs, Groq, OpenCV and NumPy unloaded"""
+    script = (
+        "import sys, agents.personas, agents.reflection, ai_agent, tools\n"
+        "heavy = ['langchain_google_genai', 'langgraph', 'groq', 'cv2', 'numpy']\n"
+        "print([name for name in heavy if name in sys.modules])\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+if __name__ == "__main__":
+    print("🧪 Running Lazy Initialization Tests")
+    test_lazy_builds_once_and_retries_after_errors()
+    test_preload_reports_timings_and_errors()
+    test_importing_agents_does_not_load_sdks()
+    print("✅ All lazy initialization tests passed!")
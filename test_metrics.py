@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharded metrics registry and Prometheus exposition.
+"""
+import threading
+import uuid
+
+from agents.base import Task
+from agents.metrics import MetricsRegistry, agent_task_duration, agent_tasks, tasks_in_flight
+from agents.platforms import GmailPlatformAgent
+from agents.supervisor import HierarchicalSupervisor
+
+def test_sharded_counter_is_exact_across_threads():
+    """Concurrent increments from many short-lived threads are neither lost nor double counted"""
+    registry = MetricsRegistry()
+    counter = registry.counter("work_total", "Work done", ["kind"])
+
+    def work():
+        for _ in range(10000):
+            counter.inc("a")
+        counter.inc("b", amount=2)
+
+    for _ in range(3):
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Shards of finished threads are folded into the retired total
+        counter.value("a")
+
+    assert counter.value("a") == 240000 and counter.value("b") == 48
+    assert len(counter._shards._shards) == 0
+
+def test_dead_thread_shards_fold_without_scrapes():
+    """One-shot threads do not grow the shard list when nothing scrapes"""
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls")
+    for _ in range(1000):
+        thread = threading.Thread(target=counter.inc)
+        thread.start()
+        thread.join()
+
+    assert len(counter._shards._shards) < counter._shards.FOLD_THRESHOLD
+    assert counter.value() == 1000
+
+def test_histogram_buckets_and_exposition():
+    """Bucket counts are cumulative with +Inf, and the text format has HELP/TYPE, _sum and _count"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Operation latency", ["op"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "read")
+    registry.gauge("in_flight", "In flight").inc(amount=3)
+    registry.callback("depth", "Queue depth", ["queue"], lambda: {("say \"hi\"",): 4})
+    registry.callback("broken", "Raises", [], lambda: 1 / 0)
+
+    snapshot = latency.snapshot("read")
+    assert snapshot["count"] == 4 and snapshot["sum"] == 3.65
+    assert list(snapshot["buckets"].values()) == [2, 3, 4]
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP op_seconds Operation latency", "# TYPE op_seconds histogram"]
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in lines
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in lines
+    assert 'op_seconds_count{op="read"} 4' in lines
+    assert "in_flight 3" in lines
+    assert 'depth{queue="say \\"hi\\""} 4' in lines
+    assert "# TYPE broken gauge" in lines
+
+def test_agent_dispatch_records_latency_and_outcomes():
+    """Every execute_task is timed and counted per agent, task type and outcome"""
+    supervisor = HierarchicalSupervisor()
+    supervisor.register_platform_agent("gmail", GmailPlatformAgent())
+    before_ok = agent_tasks.value("email_sender_agent", "send_email", "success")
+    before_count = agent_task_duration.snapshot("gmail_platform", "send_email")["count"]
+    before_missing = agent_tasks.value("hierarchical_supervisor", "create_ticket", "failure")
+
+    supervisor.execute_task(Task(id=str(uuid.uuid4()), description="Mail", task_type="send_email", payload={}))
+    supervisor.execute_task(Task(id=str(uuid.uuid4()), description="No Jira", task_type="create_ticket", payload={}))
+
+    assert agent_tasks.value("email_sender_agent", "send_email", "success") == before_ok + 1
+    assert agent_task_duration.snapshot("gmail_platform", "send_email")["count"] == before_count + 1
+    assert agent_tasks.value("hierarchical_supervisor", "create_ticket", "failure") == before_missing + 1
+    assert tasks_in_flight.value("send_email") == 0
+
+if __name__ == "__main__":
+    print("🧪 Running Metrics Tests")
+    test_sharded_counter_is_exact_across_threads()
+    test_dead_thread_shards_fold_without_scrapes()
+    test_histogram_buckets_and_exposition()
+    test_agent_dispatch_records_latency_and_outcomes()
+    print("✅ All metrics tests passed!")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the mock platform server and the platform agents' HTTP paths.
+"""
+import os
+import uuid
+from contextlib import contextmanager
+
+import requests
+
+from agents.base import Task
+from agents.mock_platforms import MockPlatformServer
+from agents.platforms import GitHubPlatformAgent, GmailPlatformAgent, JiraPlatformAgent, CalendarPlatformAgent, _retry_after
+
+@contextmanager
+def _server(**kwargs):
+    """Running server with the platform base URLs pointed at it"""
+    with MockPlatformServer(**kwargs) as server:
+        saved = {name: os.environ.get(name) for name in server.env()}
+        os.environ.update(server.env())
+        try:
+            yield server
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+def _task(task_type, **payload):
+    return Task(id=str(uuid.uuid4()), description=f"Mock {task_type}", task_type=task_type, payload=payload)
+
+def test_agents_use_configured_base_urls():
+    """Every platform's create call goes to the server and returns its ids"""
+    with _server() as server:
+        issue = GitHubPlatformAgent().execute_task(_task("github_create_issue", repository="acme/app", title="Bug"))
+        email = GmailPlatformAgent().execute_task(_task("send_email", recipient="a@company.com", subject="Hi"))
+        ticket = JiraPlatformAgent().execute_task(_task("create_ticket", title="Laptop", project="IT"))
+        meeting = CalendarPlatformAgent().execute_task(_task("schedule_meeting", title="Sync", duration=45))
+
+        assert issue.success and issue.data == {"issue_id": 1, "url": "https://github.com/acme/app/issues/1"}
+        assert email.success and email.data["email_id"].startswith("msg")
+        assert ticket.success and ticket.data["ticket_id"] == "IT-1"
+        assert meeting.success and meeting.data["meeting_id"] == "event1"
+        assert server.stats()["requests"] == 4
+        assert {k: server.stats()[k] for k in ("issues", "tickets", "messages", "events")} == \
+               {"issues": 1, "tickets": 1, "messages": 1, "events": 1}
+
+def test_pagination_styles():
+    """GitHub Link headers are followed by the agent; Jira and Google use offsets and page tokens"""
+    with _server(page_size=2) as server:
+        github = GitHubPlatformAgent()
+        for i in range(5):
+            github.execute_task(_task("github_create_issue", repository="acme/app", title=f"Issue {i}"))
+            JiraPlatformAgent().execute_task(_task("create_ticket", title=f"Ticket {i}"))
+
+        listed = github.execute_task(_task("github_list_issues", repository="acme/app", per_page=2))
+        assert listed.success and listed.data["count"] == 5
+        assert [issue["issue_id"] for issue in listed.data["issues"]] == [1, 2, 3, 4, 5]
+
+        first = requests.get(f"{server.url}/repos/acme/app/issues", params={"per_page": 2})
+        assert 'rel="next"' in first.headers["Link"] and 'rel="last"' in first.headers["Link"]
+
+        search = requests.get(f"{server.url}/rest/api/2/search", params={"startAt": 4}).json()
+        assert search["total"] == 5 and [issue["key"] for issue in search["issues"]] == ["PROJ-5"]
+
+        for i in range(3):
+            GmailPlatformAgent().execute_task(_task("send_email", recipient=f"u{i}@company.com"))
+        page = requests.get(f"{server.url}/gmail/v1/users/me/messages").json()
+        assert len(page["messages"]) == 2 and page["nextPageToken"] == "2"
+        rest = requests.get(f"{server.url}/gmail/v1/users/me/messages", params={"pageToken": "2"}).json()
+        assert len(rest["messages"]) == 1 and "nextPageToken" not in rest
+
+def test_rate_limit_headers_and_429():
+    """Each platform has its own window; exceeding it returns 429 with Retry-After"""
+    with _server(rate_limit=2, rate_window=60) as server:
+        agent = JiraPlatformAgent()
+        assert agent.execute_task(_task("create_ticket")).success
+        second = requests.post(f"{server.url}/rest/api/2/issue", json={"fields": {}})
+        assert second.headers["X-RateLimit-Remaining"] == "0"
+
+        limited = agent.execute_task(_task("create_ticket"))
+        assert not limited.success
+        assert limited.data["status_code"] == 429 and limited.data["retry_after"] >= 1
+
+        # Gmail has an independent budget
+        assert GmailPlatformAgent().execute_task(_task("send_email")).success
+        assert server.stats()["rate_limited"] == 1
+
+def test_injected_failures_and_latency():
+    """error_rate=1 fails every call; latency is applied per request"""
+    with _server(error_rate=1.0) as server:
+        response = GmailPlatformAgent().execute_task(_task("send_email"))
+        assert not response.success and response.data["status_code"] == 503
+        assert server.stats()["injected_errors"] == 1 and server.stats()["messages"] == 0
+
+    with _server(latency="fixed:0.05") as server:
+        elapsed = requests.get(f"{server.url}/user").elapsed.total_seconds()
+        assert elapsed >= 0.05
+
+def test_retry_after_forms():
+    """Retry-After is delay seconds or an HTTP date; anything else is ignored"""
+    assert _retry_after("120") == 120
+    assert _retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert _retry_after("soon") is None
+    assert _retry_after(None) is None
+
+def test_invalid_meeting_times_fail_the_task():
+    """A bad start_time or duration is a failed response, not an exception"""
+    with _server() as server:
+        agent = CalendarPlatformAgent()
+        bad_start = agent.execute_task(_task("schedule_meeting", start_time="tomorrow at noon"))
+        bad_duration = agent.execute_task(_task("schedule_meeting", duration="half an hour"))
+        assert not bad_start.success and bad_start.message.startswith("Invalid meeting time")
+        assert not bad_duration.success and bad_duration.message.startswith("Invalid meeting time")
+        assert agent.execute_task(_task("schedule_meeting", duration="45")).success
+        assert server.stats()["events"] == 1
+
+def test_meeting_end_is_utc_for_offset_and_naive_starts():
+    """The end time (with a Z suffix) is computed in UTC whatever offset the start carries"""
+    with _server():
+        agent = CalendarPlatformAgent()
+        for start, end in (("2026-10-19T10:00:00+02:00", "2026-10-19T08:30:00Z"),
+                           ("2026-10-19T10:00:00", "2026-10-19T10:30:00Z")):
+            response = agent.execute_task(_task("schedule_meeting", start_time=start, duration=30))
+            assert response.success
+            events = requests.get(f"{os.environ['CALENDAR_API_URL']}/calendar/v3/calendars/primary/events").json()
+            assert events["items"][-1]["end"] == {"dateTime": end}
+
+def test_simulation_without_base_urls():
+    """Without a base URL the agents keep their simulated results"""
+    for name in ("JIRA_BASE_URL", "GMAIL_API_URL", "CALENDAR_API_URL"):
+        os.environ.pop(name, None)
+    ticket = JiraPlatformAgent().execute_task(_task("create_ticket"))
+    assert ticket.success and ticket.data["ticket_id"] == "PROJ-123"
+
+if __name__ == "__main__":
+    print("🧪 Running Mock Platform Server Tests")
+    test_agents_use_configured_base_urls()
+    test_pagination_styles()
+    test_rate_limit_headers_and_429()
+    test_injected_failures_and_latency()
+    test_retry_after_forms()
+    test_invalid_meeting_times_fail_the_task()
+    test_meeting_end_is_utc_for_offset_and_naive_starts()
+    test_simulation_without_base_urls()
+    print("✅ All mock platform server tests passed!")
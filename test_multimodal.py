@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-call multimodal fast path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+# test_integration.py leaves stub modules in sys.modules at collection time
+for name in ("tools", "dotenv"):
+    if type(sys.modules.get(name)).__name__ == "MockModule":
+        del sys.modules[name]
+
+import pytest
+
+import ai_agent
+import tools
+from agents.multimodal import build_messages, needs_vision
+from agents.metrics import llm_turn_duration
+from agents.providers import ProviderRouter
+from fake_llm import FakeLLM, FakeLLMBackend
+
+def test_needs_vision_keywords():
+    assert needs_vision("Do I have a beard?")
+    assert needs_vision("What do you SEE behind me")
+    assert needs_vision("How do I look today?")
+    assert needs_vision("What color is my shirt?")
+    assert needs_vision("How many fingers am I holding up?")
+    assert not needs_vision("What are the symptoms of a cold?")
+    assert not needs_vision("")
+
+def test_needs_vision_ignores_everyday_words():
+    """Common words that only sometimes refer to the camera do not upload a frame"""
+    for query in ("Can you look up the meeting room schedule?", "I'll see you tomorrow",
+                  "Watch out for the deadline", "Please hand me the quarterly report",
+                  "Let's face it, the launch slipped", "Give me some background on the project",
+                  "Book a room for the offsite", "Can you see if Bob is free at 3?"):
+        assert not needs_vision(query), query
+
+def test_build_messages_attaches_frame():
+    text_only = build_messages("You are a doctor", "Hello")
+    assert text_only[1] == {"role": "user", "content": "Hello"}
+    with_frame = build_messages("You are a doctor", "How do I look?", "abc")
+    assert with_frame[1]["content"][1]["image_url"] == {"url": "data:image/jpeg;base64,abc"}
+
+def test_current_frame_prefers_live_source(monkeypatch):
+    """The registered capture serves the frame; without one (or without a frame) the webcam is opened"""
+    monkeypatch.setattr(tools, "capture_image", lambda: "opened")
+    try:
+        tools.set_frame_source(lambda: "live")
+        assert tools.current_frame() == "live"
+        tools.set_frame_source(lambda: None)
+        assert tools.current_frame() == "opened"
+    finally:
+        tools.set_frame_source(None)
+
+def _install_fast_path(monkeypatch) -> FakeLLM:
+    fake = FakeLLM("fixed:0")
+    monkeypatch.setattr(ai_agent, "chat_router", ProviderRouter("chat", [FakeLLMBackend(fake)]))
+    monkeypatch.setattr(ai_agent, "vision_router", ProviderRouter("vision", [FakeLLMBackend(fake)]))
+    monkeypatch.setattr(ai_agent, "multimodal_fast_path", True)
+    return fake
+
+@pytest.fixture
+def fast_path(monkeypatch):
+    return _install_fast_path(monkeypatch)
+
+def test_fast_path_sends_frame_in_one_call(fast_path, monkeypatch):
+    """A webcam question is one model call with the frame; it is reported as a tool turn"""
+    frames = []
+    monkeypatch.setattr(ai_agent, "current_frame", lambda: frames.append(1) or "abc")
+    before = llm_turn_duration.snapshot("fast", "true")["count"]
+
+    answer, used_tools = ai_agent._run_agent("Do I have a beard?", "general assistant")
+    assert "Do I have a beard?" in answer
+    assert used_tools is True
+    assert frames == [1] and fast_path.calls == 1
+    assert llm_turn_duration.snapshot("fast", "true")["count"] == before + 1
+
+    answer, used_tools = ai_agent._run_agent("Help me plan my week", "general assistant")
+    assert used_tools is False and frames == [1]
+
+def test_fast_path_without_camera_answers_text_only(fast_path, monkeypatch):
+    def no_camera():
+        raise RuntimeError("Could not open any webcam")
+    monkeypatch.setattr(ai_agent, "current_frame", no_camera)
+    answer, used_tools = ai_agent._run_agent("How do I look?", "general assistant")
+    assert used_tools is False and fast_path.calls == 1
+
+if __name__ == "__main__":
+    print("🧪 Running Multimodal Fast Path Tests")
+    test_needs_vision_keywords()
+    test_needs_vision_ignores_everyday_words()
+    test_build_messages_attaches_frame()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_current_frame_prefers_live_source(monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_fast_path_sends_frame_in_one_call(_install_fast_path(monkeypatch), monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_fast_path_without_camera_answers_text_only(_install_fast_path(monkeypatch), monkeypatch)
+    print("✅ All multimodal fast path tests passed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the data-driven persona registry and cached system prompts.
+"""
+import json
+import os
+
+from agents.personas import HRManagerAgent, DefinedPersonaAgent
+from agents.prompts import get_system_prompt
+from agents.registry import PersonaRegistry, DEFINITIONS_DIR
+
+MARKETING = {
+    "name": "Marketing Lead",
+    "description": "Plans campaigns and announcements",
+    "personality_type": "marketing lead",
+    "capabilities": ["conversation", "campaign"],
+    "intent_patterns": {"campaign": [r"campaign|launch"], "email": [r"newsletter|email"]},
+    "tasks": [
+        {"when": ["campaign", "email"], "task_type": "send_email", "description": "Announce the campaign",
+         "payload": {"subject": "Campaign", "content": "{message}"}, "priority": "high"}
+    ],
+    "fallback_response": "Marketing here, about '{message}'.",
+    "system_prompt": ["You are a marketing lead.", "{base_instructions}"]
+}
+
+def _write(directory, persona_id, definition):
+    path = os.path.join(directory, f"{persona_id}.json")
+    with open(path, "w") as f:
+        json.dump(definition, f)
+    return path
+
+def test_builtin_personas_resolve_from_definitions():
+    """The legacy class names are built from the shipped definitions"""
+    hr = HRManagerAgent()
+    assert isinstance(hr, DefinedPersonaAgent)
+    assert type(hr).__name__ == "HRManagerAgent"
+    assert hr.agent_id == "hr_manager"
+    assert hr.get_capabilities() == ["conversation", "hr_consultation", "onboarding"]
+
+def test_definitions_are_loaded_and_instantiated_lazily(tmp_path):
+    """Listing personas parses nothing; get() instantiates once and applies configurators"""
+    _write(str(tmp_path), "marketing", MARKETING)
+    registry = PersonaRegistry([DEFINITIONS_DIR, str(tmp_path)])
+    registry.add_configurator(lambda agent: setattr(agent, "latency_budget", 3.0))
+
+    assert registry.ids() == ["doctor", "hr_manager", "it_support", "marketing"]
+    assert registry.loaded() == []
+    assert registry.describe("marketing")["capabilities"] == ["conversation", "campaign"]
+    assert registry.loaded() == []
+
+    agent = registry.get("marketing")
+    assert registry.get("marketing") is agent
+    assert registry.loaded() == ["marketing"]
+    assert agent.latency_budget == 3.0
+
+    tasks = agent.interpret_user_intent("Launch the spring campaign with a newsletter")
+    assert [(t.task_type, t.payload["content"]) for t in tasks] == [
+        ("send_email", "Launch the spring campaign with a newsletter")
+    ]
+    assert agent.interpret_user_intent("launch only") == []
+    assert agent.fallback_response("hi") == "Marketing here, about 'hi'."
+    assert get_system_prompt("marketing lead").startswith("You are a marketing lead.\n")
+
+def test_reload_only_touches_changed_files(tmp_path):
+    """Unchanged personas keep their instances; changed ones are rebuilt on next use"""
+    path = _write(str(tmp_path), "marketing", MARKETING)
+    _write(str(tmp_path), "sales", {**MARKETING, "name": "Sales"})
+    registry = PersonaRegistry([str(tmp_path)])
+    marketing, sales = registry.get("marketing"), registry.get("sales")
+
+    updated = {**MARKETING, "name": "Brand Lead", "intent_patterns": {"campaign": ["brand"], "email": ["email"]}}
+    _write(str(tmp_path), "marketing", updated)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    _write(str(tmp_path), "support", {**MARKETING, "name": "Support"})
+
+    assert registry.reload() == {"added": ["support"], "changed": ["marketing"], "removed": []}
+    assert registry.get("sales") is sales
+    rebuilt = registry.get("marketing")
+    assert rebuilt is not marketing and rebuilt.name == "Brand Lead"
+    assert [t.task_type for t in rebuilt.interpret_user_intent("brand email")] == ["send_email"]
+    assert rebuilt.interpret_user_intent("campaign newsletter") == []
+
+    os.remove(path)
+    assert registry.reload()["removed"] == ["marketing"]
+    assert "marketing" not in registry
+    # sales shares the personality type and still serves the prompt
+    assert get_system_prompt("marketing lead").startswith("You are a marketing lead.\n")
+
+def test_removed_persona_unregisters_its_prompt(tmp_path):
+    """A removed definition's prompt is no longer served"""
+    path = _write(str(tmp_path), "growth", {**MARKETING, "personality_type": "growth hacker",
+                                             "system_prompt": ["You are a growth hacker.", "{base_instructions}"]})
+    registry = PersonaRegistry([str(tmp_path)])
+    registry.get("growth")
+    assert get_system_prompt("growth hacker").startswith("You are a growth hacker.\n")
+
+    os.remove(path)
+    assert registry.reload()["removed"] == ["growth"]
+    assert not get_system_prompt("growth hacker").startswith("You are a growth hacker.")
+
+def test_system_prompts_are_rendered_once():
+    """Prompts are rendered from the templates file and cached per personality type"""
+    prompt = get_system_prompt("doctor")
+    assert prompt is get_system_prompt("doctor")
+    assert "medical doctor" in prompt and "BE UPBEAT" in prompt
+    assert "seasoned chef" in get_system_prompt("chef")
+
+if __name__ == "__main__":
+    import tempfile
+    print("🧪 Running Persona Registry Tests")
+    test_builtin_personas_resolve_from_definitions()
+    with tempfile.TemporaryDirectory() as directory:
+        test_definitions_are_loaded_and_instantiated_lazily(directory)
+    with tempfile.TemporaryDirectory() as directory:
+        test_reload_only_touches_changed_files(directory)
+    with tempfile.TemporaryDirectory() as directory:
+        test_removed_persona_unregisters_its_prompt(directory)
+    test_system_prompts_are_rendered_once()
+    print("✅ All persona registry tests passed!")
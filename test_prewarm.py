@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for session prewarming: background steps, the compiled agent cache,
+the kept-open webcam and the speculative first vision analysis.
+"""
+import base64
+import os
+import sys
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# test_integration.py leaves stub modules in sys.modules at collection time
+for name in ("tools", "dotenv"):
+    if type(sys.modules.get(name)).__name__ == "MockModule":
+        del sys.modules[name]
+
+import pytest
+
+import ai_agent
+import tools
+from agents.prewarm import SessionPrewarmer, default_steps
+from agents.providers import FakeBackend, ProviderRouter
+
+def test_prewarmer_runs_steps_then_vision():
+    """Steps run in the background, failures are reported, the speculative analysis runs last"""
+    finished = []
+    lock = threading.Lock()
+
+    def step(name):
+        def run(personality):
+            with lock:
+                finished.append(name)
+            return personality
+        return run
+
+    def broken(personality):
+        raise RuntimeError("no webcam")
+
+    def vision(personality):
+        with lock:
+            finished.append("vision")
+        return "primed"
+
+    def steps(voice, camera):
+        return {"clients": step("clients"), "agent": step("agent"), **({"camera": broken} if camera else {})}
+
+    prewarmer = SessionPrewarmer(steps, vision, speculative_vision=True)
+    report = prewarmer.start("doctor", camera=True).result(timeout=5)
+    assert report["done"]
+    assert report["steps"]["agent"] == {"status": "ok", "result": "doctor", "seconds": report["steps"]["agent"]["seconds"]}
+    assert report["steps"]["camera"]["status"] == "error: no webcam"
+    assert report["steps"]["vision"]["result"] == "primed" and finished[-1] == "vision"
+    assert prewarmer.status()["doctor"]["done"]
+
+    # Steps already run for the personality are not repeated; another personality is a new session
+    assert prewarmer.start("doctor", camera=True) is None
+    report = prewarmer.start("lawyer").result(timeout=5)
+    assert set(report["steps"]) == {"clients", "agent"}
+
+    # Without the camera the vision step waits for a live feed; a later trigger adds only that step
+    finished.clear()
+    report = prewarmer.start("lawyer", vision=True).result(timeout=5)
+    assert finished == ["vision"] and report["steps"]["vision"]["result"] == "primed"
+
+    prewarmer.configure(enabled=False)
+    assert prewarmer.start("teacher") is None
+
+def test_default_steps_leave_the_webcam_alone():
+    """The webcam and ElevenLabs steps only run when asked for"""
+    assert list(default_steps()) == ["clients", "connections", "agent"]
+    assert list(default_steps(voice=True, camera=True)) == ["clients", "connections", "agent", "tts", "camera"]
+
+class _CountingFactory:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, model, tools, prompt):
+        self.calls += 1
+        return SimpleNamespace(invoke=lambda inputs: {"messages": [SimpleNamespace(type="ai", content=prompt[:7])]})
+
+def test_prepared_agent_is_reused_by_the_first_turn(monkeypatch):
+    factory = _CountingFactory()
+    monkeypatch.setattr(ai_agent, "_react_agent_factory", lambda: factory)
+    monkeypatch.setattr(ai_agent, "_agents", OrderedDict())
+    monkeypatch.setattr(ai_agent, "chat_router", ProviderRouter("chat", [FakeBackend("a"), FakeBackend("b")]))
+    monkeypatch.setattr(ai_agent, "multimodal_fast_path", False)
+
+    assert ai_agent.prepare_agents("doctor") == 2
+    assert ai_agent.prepare_agents("doctor") == 2
+    assert factory.calls == 2
+
+    answer, used_tools = ai_agent._run_agent("Hello", "doctor")
+    assert answer and used_tools is False
+    assert factory.calls == 2
+
+    monkeypatch.setattr(ai_agent, "AGENT_CACHE_SIZE", 2)
+    ai_agent.prepare_agents("lawyer")
+    assert len(ai_agent._agents) == 2
+
+class _FakeCV2:
+    CAP_AVFOUNDATION = 1200
+
+    def __init__(self):
+        self.opened = 0
+
+    def VideoCapture(self, index, api=None):
+        self.opened += 1
+        return SimpleNamespace(isOpened=lambda: True, read=lambda: (True, "frame"), release=lambda: None)
+
+    def imwrite(self, path, frame):
+        pass
+
+    def imencode(self, ext, frame):
+        return True, b"jpg"
+
+def test_warm_camera_skips_reopening(monkeypatch):
+    cv2 = _FakeCV2()
+    monkeypatch.setattr(tools, "get_cv2", lambda: cv2)
+    try:
+        assert tools.capture_image() == base64.b64encode(b"jpg").decode()
+        assert cv2.opened == 1
+        assert tools.warm_camera()
+        assert tools.warm_camera()
+        tools.capture_image()
+        tools.capture_image()
+        assert cv2.opened == 2
+    finally:
+        tools.release_camera()
+
+def test_speculative_vision_answers_first_call_once(monkeypatch):
+    backend = FakeBackend("vision")
+    monkeypatch.setattr(tools, "vision_router", ProviderRouter("vision", [backend]))
+    tools.set_frame_source(lambda: "abc")
+    try:
+        primed = tools.prime_vision()
+        assert backend.calls == 1
+        # A question the generic description does not answer goes to the vision model
+        assert "fingers" in tools.analyze_image_with_query("How many fingers am I holding up?")
+        assert backend.calls == 2
+        assert tools.analyze_image_with_query("How do I look?") == primed
+        assert backend.calls == 2
+        assert "Do I have a beard?" in tools.analyze_image_with_query("Do I have a beard?")
+        assert backend.calls == 3
+
+        # A stale analysis is dropped
+        monkeypatch.setattr(tools, "speculative_vision_ttl", -1)
+        tools.prime_vision()
+        tools.analyze_image_with_query("How do I look?")
+        assert backend.calls == 5
+    finally:
+        tools.set_frame_source(None)
+
+if __name__ == "__main__":
+    print("🧪 Running Session Prewarm Tests")
+    test_prewarmer_runs_steps_then_vision()
+    test_default_steps_leave_the_webcam_alone()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_prepared_agent_is_reused_by_the_first_turn(monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_warm_camera_skips_reopening(monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_speculative_vision_answers_first_call_once(monkeypatch)
+    print("✅ All session prewarm tests passed!")
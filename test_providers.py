@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for LLM provider routing: failover, circuit breaking, hedging and tiers.
+"""
+import time
+
+import pytest
+
+from agents.metrics import llm_backend_hedges, llm_backend_requests, metrics
+from agents.providers import FakeBackend, ProviderRouter, parse_backends
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+def _complete(backend):
+    return backend.complete(MESSAGES)
+
+def test_failover_and_circuit_breaker():
+    """Errors fail over to the next backend; repeated errors move the backend to the back"""
+    down = FakeBackend("down", error_rate=1.0)
+    up = FakeBackend("up")
+    router = ProviderRouter("chat", [down, up], hedge=False, failure_threshold=2, cooldown=60)
+    errors, successes = llm_backend_requests.value("chat", "fake:down", "error"), \
+        llm_backend_requests.value("chat", "fake:up", "success")
+
+    assert router.call(_complete) == "[fake:up] hello"
+    assert router.call(_complete) == "[fake:up] hello"
+    assert [backend.name for backend in router.candidates()] == ["fake:up", "fake:down"]
+    assert router.call(_complete) == "[fake:up] hello"
+    assert down.calls == 2
+    assert router.status()["backends"]["fake:down"]["healthy"] is False
+    # Outcomes are labelled by router, backend and outcome
+    assert llm_backend_requests.value("chat", "fake:down", "error") == errors + 2
+    assert llm_backend_requests.value("chat", "fake:up", "success") == successes + 3
+    assert 'llm_backend_requests_total{router="chat",backend="fake:up",outcome="success"}' in metrics.render()
+
+def test_every_backend_failing_raises_last_error():
+    router = ProviderRouter("chat", [FakeBackend("a", error_rate=1.0), FakeBackend("b", error_rate=1.0)])
+    with pytest.raises(ConnectionError, match="fake:b"):
+        router.call(_complete)
+
+def test_failover_to_slow_last_backend_does_not_hedge_past_the_end():
+    """After failing over to the last backend there is nothing left to hedge to; its slow answer is returned"""
+    router = ProviderRouter("chat", [FakeBackend("a", error_rate=1.0), FakeBackend("b", latency="fixed:0.3")],
+                            hedge_after=0.1)
+    assert router.call(_complete) == "[fake:b] hello"
+
+def test_hedging_bounds_latency_when_primary_degrades():
+    """Once the primary slows down, hedges to the secondary keep every call near the healthy p95"""
+    primary = FakeBackend("primary", latency="fixed:0.005")
+    secondary = FakeBackend("secondary", latency="fixed:0.005")
+    router = ProviderRouter("chat", [primary, secondary], hedge_after=1.0)
+    hedges = llm_backend_hedges.value("chat")
+    for _ in range(25):
+        router.call(_complete)
+    assert router.hedge_delay() < 0.05
+
+    primary.set_latency("fixed:0.5")
+    slowest = 0.0
+    for _ in range(10):
+        started = time.perf_counter()
+        assert router.call(_complete) == "[fake:secondary] hello"
+        slowest = max(slowest, time.perf_counter() - started)
+    assert slowest < 0.25
+    assert llm_backend_hedges.value("chat") > hedges
+    assert llm_backend_requests.value("chat", "fake:primary", "lost") >= 1
+    # Losing hedges counts against the primary like errors do
+    assert router.candidates()[0] is secondary
+
+def test_simple_queries_prefer_fast_tier():
+    standard = FakeBackend("standard")
+    fast = FakeBackend("fast", tier="fast")
+    router = ProviderRouter("chat", [standard, fast], simple_query_max_chars=40)
+    assert router.call(_complete, query="What time is it?") == "[fake:fast] hello"
+    assert router.call(_complete, query="Please review this contract clause by clause and summarize the risks") \
+        == "[fake:standard] hello"
+
+def test_parse_backends():
+    backends = parse_backends("gemini:gemini-2.0-flash, groq:llama-3.3-70b-versatile,fake:local", tier="fast")
+    assert [backend.name for backend in backends] == ["gemini:gemini-2.0-flash", "groq:llama-3.3-70b-versatile",
+                                                      "fake:local"]
+    assert all(backend.tier == "fast" for backend in backends)
+    assert parse_backends("") == []
+    with pytest.raises(ValueError):
+        parse_backends("openai:gpt")
+
+if __name__ == "__main__":
+    print("🧪 Running Provider Router Tests")
+    test_failover_and_circuit_breaker()
+    test_every_backend_failing_raises_last_error()
+    test_failover_to_slow_last_backend_does_not_hedge_past_the_end()
+    test_hedging_bounds_latency_when_primary_degrades()
+    test_simple_queries_prefer_fast_tier()
+    test_parse_backends()
+    print("✅ All provider router tests passed!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the reflection agent's maintained evaluation aggregates and rollups.
+"""
+import uuid
+
+import pytest
+
+from agents.base import Task, AgentResponse
+from agents.reflection import ReflectionAgent
+from agents.state import InMemoryStateBackend, SQLiteStateBackend
+
+def _task(task_type):
+    return Task(id=str(uuid.uuid4()), description=task_type, task_type=task_type, payload={})
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(params=["memory", "sqlite"])
+def state(request, tmp_path):
+    backend = InMemoryStateBackend() if request.param == "memory" else SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+def _evaluate_sample(reflection):
+    reflection.evaluate_task_completion(_task("send_email"), AgentResponse(success=True, message="Email sent to the team", data={"id": 1}))
+    reflection.evaluate_task_completion(_task("send_email"), AgentResponse(success=False, message="failed"))
+    reflection.evaluate_task_completion(_task("create_ticket"), AgentResponse(success=True, message="Which project?", requires_clarification=True))
+
+def test_summary_matches_full_scan_with_capped_history(state):
+    """Aggregates cover every evaluation even though only the last few raw ones are kept"""
+    reflection = ReflectionAgent(state=state, history_limit=2)
+    _evaluate_sample(reflection)
+
+    assert len(reflection.evaluation_history) == 2
+    summary = reflection.get_evaluation_summary()
+    assert summary["total_evaluations"] == 3
+    assert summary["average_quality"] == pytest.approx((100 + 20 + 40) / 3)
+    assert summary["success_rate"] == pytest.approx(200 / 3)
+    assert dict(summary["common_issues"]) == {"Task execution failed": 1, "Requires user clarification": 1}
+    assert dict(summary["top_recommendations"]) == {
+        "Consider setting up delivery confirmation tracking": 1,
+        "Provide more specific instructions to avoid ambiguity": 1,
+    }
+    assert ReflectionAgent(state=InMemoryStateBackend()).get_evaluation_summary()["total_evaluations"] == 0
+
+def test_rollups_by_task_type_and_platform(state):
+    """Evaluations are bucketed per minute and hour, by task type and by platform"""
+    clock = FakeClock(1_700_000_040.0)
+    reflection = ReflectionAgent(state=state, clock=clock)
+    _evaluate_sample(reflection)
+    clock.now += 60
+    reflection.evaluate_task_completion(_task("schedule_meeting"), AgentResponse(success=True, message="Meeting booked", data={"id": 2}))
+
+    by_type = reflection.get_evaluation_rollups("minute", "task_type")
+    assert list(by_type) == ["2023-11-14T22:14:00+00:00", "2023-11-14T22:15:00+00:00"]
+    first = by_type["2023-11-14T22:14:00+00:00"]
+    assert first["send_email"] == {"count": 2, "average_quality": 60, "success_rate": 50}
+    assert first["create_ticket"]["count"] == 1
+
+    by_platform = reflection.get_evaluation_rollups("hour", "platform")
+    assert by_platform == {"2023-11-14T22:00:00+00:00": {
+        "gmail": {"count": 2, "average_quality": 60, "success_rate": 50},
+        "jira": {"count": 1, "average_quality": 40, "success_rate": 100},
+        "calendar": {"count": 1, "average_quality": 100, "success_rate": 100},
+    }}
+    with pytest.raises(ValueError):
+        reflection.get_evaluation_rollups("day")
+
+def test_old_rollup_buckets_are_pruned():
+    """Only the configured number of buckets per granularity is retained"""
+    clock = FakeClock(1_700_000_040.0)
+    reflection = ReflectionAgent(rollup_retention={"minute": 2}, clock=clock)
+    for _ in range(4):
+        reflection.evaluate_task_completion(_task("send_email"), AgentResponse(success=True, message="Email sent"))
+        clock.now += 60
+
+    assert len(reflection.get_evaluation_rollups("minute")) == 2
+    assert len(reflection.get_evaluation_rollups("hour")) == 1
+    assert reflection.get_evaluation_summary()["total_evaluations"] == 4
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    print("🧪 Running Reflection Aggregate Tests")
+    for make in (lambda d: InMemoryStateBackend(), lambda d: SQLiteStateBackend(os.path.join(d, "state.db"))):
+        with tempfile.TemporaryDirectory() as directory:
+            test_summary_matches_full_scan_with_capped_history(make(directory))
+        with tempfile.TemporaryDirectory() as directory:
+            test_rollups_by_task_type_and_platform(make(directory))
+    test_old_rollup_buckets_are_pruned()
+    print("✅ All reflection aggregate tests passed!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the persona response cache (agents/cache.py).
+"""
+import time
+
+from agents.cache import ResponseCache, normalize_query, fingerprint_context
+
+def test_exact_hit_after_normalization():
+    """Same query modulo case/punctuation/whitespace hits the cache"""
+    cache = ResponseCache()
+    cache.put("doctor", "I need to book an appointment", "Sure, let's book it!")
+
+    assert cache.get("doctor", "  i need to BOOK an appointment!! ") == "Sure, let's book it!"
+    assert cache.get("hr", "I need to book an appointment") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_context_fingerprint_is_part_of_key():
+    """Different context produces a different cache entry"""
+    cache = ResponseCache()
+    cache.put("hr", "hi", "Hello new hire!", context={"user": "alice"})
+
+    assert cache.get("hr", "hi", context={"user": "alice"}) == "Hello new hire!"
+    assert cache.get("hr", "hi", context={"user": "bob"}) is None
+    assert fingerprint_context({"a": 1, "b": 2}) == fingerprint_context({"b": 2, "a": 1})
+
+def test_ttl_expiry():
+    """Entries expire after the TTL"""
+    cache = ResponseCache(ttl_seconds=0.05)
+    cache.put("doctor", "hi", "Hello!")
+    assert cache.get("doctor", "hi") == "Hello!"
+
+    time.sleep(0.06)
+    assert cache.get("doctor", "hi") is None
+    assert cache.get_stats()["expirations"] == 1
+
+def test_lru_eviction():
+    """Least recently used entries are evicted when the cache is full"""
+    cache = ResponseCache(max_entries=2)
+    cache.put("doctor", "one", "1")
+    cache.put("doctor", "two", "2")
+    cache.get("doctor", "one")
+    cache.put("doctor", "three", "3")
+
+    assert len(cache) == 2
+    assert cache.get("doctor", "two") is None
+    assert cache.get("doctor", "one") == "1"
+    assert cache.get_stats()["evictions"] == 1
+
+def test_near_duplicate_lookup():
+    """Near-duplicate queries hit when the similarity index is enabled"""
+    cache = ResponseCache(near_duplicate_threshold=0.8)
+    cache.put("receptionist", "I need to book an appointment", "Let's get you booked!")
+
+    assert cache.get("receptionist", "I need to book an appointment please") == "Let's get you booked!"
+    assert cache.get("receptionist", "What is the weather like?") is None
+    assert cache.get("doctor", "I need to book an appointment please") is None
+    assert cache.get_stats()["near_hits"] == 1
+
+def test_tool_turns_bypass_per_persona():
+    """Turns that called tools are not cached unless bypass is disabled for the persona"""
+    cache = ResponseCache()
+    assert not cache.put("doctor", "do I look tired?", "You look great!", used_tools=True)
+    assert cache.get("doctor", "do I look tired?") is None
+
+    cache.set_tool_bypass("teacher", False)
+    assert cache.put("teacher", "what am I holding?", "A book!", used_tools=True)
+    assert cache.get("teacher", "what am I holding?") == "A book!"
+    assert cache.get_stats()["tool_bypasses"] == 1
+
+def test_normalize_query():
+    """Normalization is case, punctuation and whitespace insensitive"""
+    assert normalize_query("  Hi,   there! ") == "hi there"
+
+if __name__ == "__main__":
+    print("🧪 Running Response Cache Tests")
+    test_exact_hit_after_normalization()
+    test_context_fingerprint_is_part_of_key()
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_near_duplicate_lookup()
+    test_tool_turns_bypass_per_persona()
+    test_normalize_query()
+    print("✅ All response cache tests passed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing of identical concurrent calls.
+"""
+import threading
+import time
+import uuid
+
+from agents.base import Task, TaskStatus
+from agents.singleflight import SingleFlight, stable_key
+from agents.supervisor import HierarchicalSupervisor
+from agents.platforms import JiraPlatformAgent
+
+def _run_concurrently(count, fn):
+    """Start count threads on fn behind a barrier and collect their results"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_calls_share_one_execution():
+    """Concurrent callers with the same key run the function once"""
+    flight = SingleFlight()
+    executions = []
+
+    def slow_call():
+        executions.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    results = _run_concurrently(5, lambda: flight.do("same", slow_call))
+
+    assert [r[0] for r in results] == ["answer"] * 5
+    assert len(executions) == 1
+    assert sum(1 for r in results if r[1]) == 4
+    assert flight.get_stats()["collapsed"] == 4
+
+def test_errors_fan_out_to_waiters():
+    """Waiters receive the leader's exception"""
+    flight = SingleFlight()
+
+    def failing_call():
+        time.sleep(0.05)
+        raise ValueError("provider down")
+
+    def call():
+        try:
+            flight.do("key", failing_call)
+        except ValueError as e:
+            return str(e)
+
+    assert _run_concurrently(3, call) == ["provider down"] * 3
+
+def test_stable_key_ignores_dict_order():
+    """Keys are independent of payload dict ordering"""
+    assert stable_key("create_ticket", {"a": 1, "b": 2}) == stable_key("create_ticket", {"b": 2, "a": 1})
+    assert stable_key("create_ticket", {"a": 1}) != stable_key("create_ticket", {"a": 2})
+
+def _execute_identical_tickets(supervisor):
+    """Run 4 identical create_ticket tasks concurrently; returns the Jira calls and the tasks"""
+    jira = JiraPlatformAgent()
+    supervisor.register_platform_agent("jira", jira)
+
+    ticket_agent = jira.sub_agents[0]
+    original_create = ticket_agent._create_ticket
+    calls = []
+
+    def slow_create(task):
+        calls.append(task.id)
+        time.sleep(0.1)
+        return original_create(task)
+
+    ticket_agent._create_ticket = slow_create
+
+    tasks = [
+        Task(
+            id=str(uuid.uuid4()),
+            description="Create IT support ticket for reported issue",
+            task_type="create_ticket",
+            payload={"title": "IT Support Request", "description": "VPN is broken"}
+        )
+        for _ in range(4)
+    ]
+    it = iter(tasks)
+    lock = threading.Lock()
+
+    def execute():
+        with lock:
+            task = next(it)
+        return supervisor.execute_task(task)
+
+    responses = _run_concurrently(4, execute)
+    assert all(r.success for r in responses)
+    assert all(t.status == TaskStatus.COMPLETED for t in tasks)
+    return calls, tasks
+
+def test_supervisor_collapses_identical_tasks():
+    """With coalescing enabled, identical concurrent create_ticket tasks reach Jira once and all tasks complete"""
+    supervisor = HierarchicalSupervisor(coalesce_identical_tasks=True)
+    calls, tasks = _execute_identical_tickets(supervisor)
+
+    assert len(calls) == 1
+    assert supervisor.get_coalescing_stats()["collapsed"] == 3
+    assert len(supervisor.get_task_history()) == 4
+
+def test_supervisor_runs_identical_tasks_by_default():
+    """Identical side-effecting tasks are not idempotent by default: each one reaches Jira"""
+    supervisor = HierarchicalSupervisor()
+    calls, tasks = _execute_identical_tickets(supervisor)
+
+    assert len(calls) == 4
+    assert supervisor.get_coalescing_stats()["collapsed"] == 0
+
+if __name__ == "__main__":
+    print("🧪 Running Singleflight Tests")
+    test_concurrent_calls_share_one_execution()
+    test_errors_fan_out_to_waiters()
+    test_stable_key_ignores_dict_order()
+    test_supervisor_collapses_identical_tasks()
+    test_supervisor_runs_identical_tasks_by_default()
+    print("✅ All singleflight tests passed!")
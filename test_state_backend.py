@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory and SQLite state backends.
+"""
+import multiprocessing
+import os
+import uuid
+
+import pytest
+
+from agents.base import Task, TaskStatus, TaskPriority, AgentResponse
+from agents.reflection import ReflectionAgent
+from agents.state import InMemoryStateBackend, SQLiteStateBackend, task_to_dict, task_from_dict
+from agents.supervisor import HierarchicalSupervisor
+from agents.platforms import GmailPlatformAgent
+
+def _task(task_type="send_email"):
+    return Task(id=str(uuid.uuid4()), description="Send welcome email", task_type=task_type,
+                payload={"subject": "Welcome"}, priority=TaskPriority.HIGH)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def state(request, tmp_path):
+    backend = InMemoryStateBackend() if request.param == "memory" else SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+def test_task_roundtrip():
+    """Enums survive serialization"""
+    task = _task()
+    task.status = TaskStatus.COMPLETED
+    assert task_from_dict(task_to_dict(task)) == task
+
+def test_tasks_sessions_counters_and_evaluations(state):
+    """Every backend supports the same operations with the same ordering"""
+    first, second = _task(), _task("create_ticket")
+    state.save_task(first)
+    state.save_task(second)
+    first.status = TaskStatus.COMPLETED
+    state.save_task(first)
+
+    assert state.get_task(first.id).status == TaskStatus.COMPLETED
+    assert state.get_task("missing") is None
+    assert [t.id for t in state.list_tasks()] == [first.id, second.id]
+
+    state.append_history("hr_manager_session", {"user_message": "hi"})
+    state.append_history("hr_manager_session", {"user_message": "bye"})
+    assert [e["user_message"] for e in state.get_history("hr_manager_session")] == ["hi", "bye"]
+    assert state.get_history("unknown") == []
+
+    assert state.incr("tasks_processed") == 1
+    assert state.incr("tasks_processed", 2) == 3
+    assert state.counter("tasks_processed") == 3
+    assert state.counter("never") == 0
+
+    for i in range(5):
+        state.append("numbers", {"i": i})
+    assert [item["i"] for item in state.items("numbers", limit=2)] == [3, 4]
+
+def test_agents_keep_history_and_evaluations_in_state(state):
+    """Supervisor history and reflection evaluations are read back from the backend"""
+    supervisor = HierarchicalSupervisor(state=state)
+    supervisor.register_platform_agent("gmail", GmailPlatformAgent())
+    reflection = ReflectionAgent(state=state)
+
+    task = _task()
+    response = supervisor.execute_task(task)
+    reflection.evaluate_task_completion(task, response)
+    reflection.evaluate_task_completion(_task(), AgentResponse(success=False, message="failed"))
+
+    history = supervisor.get_task_history()
+    assert [t.id for t in history] == [task.id]
+    assert history[0].assigned_agent == task.assigned_agent
+    summary = reflection.get_evaluation_summary()
+    assert summary["total_evaluations"] == 2
+    assert summary["success_rate"] == 50
+
+def _worker(path, count):
+    backend = SQLiteStateBackend(path)
+    for _ in range(count):
+        backend.incr("tasks_processed")
+        backend.save_task(_task())
+    backend.close()
+
+def test_sqlite_state_is_shared_across_processes(tmp_path):
+    """Counters and tasks written by several worker processes add up"""
+    path = str(tmp_path / "shared.db")
+    SQLiteStateBackend(path).close()
+    workers = [multiprocessing.Process(target=_worker, args=(path, 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    state = SQLiteStateBackend(path)
+    assert state.counter("tasks_processed") == 100
+    assert len(state.list_tasks()) == 100
+    state.close()
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    print("🧪 Running State Backend Tests")
+    test_task_roundtrip()
+    for make in (lambda d: InMemoryStateBackend(), lambda d: SQLiteStateBackend(os.path.join(d, "state.db"))):
+        with tempfile.TemporaryDirectory() as directory:
+            test_tasks_sessions_counters_and_evaluations(make(directory))
+        with tempfile.TemporaryDirectory() as directory:
+            test_agents_keep_history_and_evaluations_in_state(make(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_sqlite_state_is_shared_across_processes(Path(directory))
+    print("✅ All state backend tests passed!")
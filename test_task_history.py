@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded task history and its maintained counters.
+"""
+import json
+import uuid
+
+import pytest
+
+from agents.base import Task, TaskStatus
+from agents.history import TaskHistory, JsonlArchive
+from agents.reflection import ReflectionAgent
+from agents.state import InMemoryStateBackend, SQLiteStateBackend
+
+def _task(task_type, status):
+    return Task(id=str(uuid.uuid4()), description=task_type, task_type=task_type, payload={}, status=status)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def state(request, tmp_path):
+    backend = InMemoryStateBackend() if request.param == "memory" else SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+def test_ring_buffer_evicts_and_keeps_counters_in_sync(state, tmp_path):
+    """Only the last `capacity` tasks are kept; counters describe exactly that window"""
+    archive_path = tmp_path / "archive.jsonl"
+    history = TaskHistory(capacity=3, archive=JsonlArchive(str(archive_path)), state=state)
+    tasks = [
+        _task("send_email", TaskStatus.FAILED),
+        _task("send_email", TaskStatus.COMPLETED),
+        _task("create_ticket", TaskStatus.COMPLETED),
+        _task("create_ticket", TaskStatus.FAILED),
+        _task("schedule_meeting", TaskStatus.COMPLETED),
+    ]
+    for task in tasks:
+        history.record(task)
+
+    assert len(history) == 3
+    assert history.total_recorded == 5
+    assert [t.id for t in history] == [t.id for t in tasks[2:]]
+    assert [t.id for t in history.window(2)] == [t.id for t in tasks[3:]]
+    assert history.status_counts() == {"completed": 2, "failed": 1}
+    assert history.type_counts() == {"create_ticket": 2, "schedule_meeting": 1}
+    assert history.count(TaskStatus.FAILED) == 1
+
+    archived = [json.loads(line)["id"] for line in archive_path.read_text().splitlines()]
+    assert archived == [t.id for t in tasks[:2]]
+
+def test_improvement_opportunities_from_counters():
+    """Reflection reads the maintained counters and agrees with the list-based analysis"""
+    history = TaskHistory(capacity=50)
+    tasks = [_task("send_email", TaskStatus.COMPLETED) for _ in range(7)] + [_task("create_ticket", TaskStatus.FAILED)]
+    for task in tasks:
+        history.record(task)
+
+    reflection = ReflectionAgent()
+    from_counters = reflection.identify_improvement_opportunities(history)
+    assert from_counters == reflection.identify_improvement_opportunities(tasks)
+    assert [o["type"] for o in from_counters] == ["high_failure_rate", "workflow_optimization"]
+    assert reflection.identify_improvement_opportunities(TaskHistory()) == []
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    print("🧪 Running Task History Tests")
+    with tempfile.TemporaryDirectory() as directory:
+        test_ring_buffer_evicts_and_keeps_counters_in_sync(InMemoryStateBackend(), Path(directory))
+    test_improvement_opportunities_from_counters()
+    print("✅ All task history tests passed!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage tracing spans and exporters.
+"""
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agents.base import Task
+from agents.codec import encode, decode, task_to_dict, task_from_dict
+from agents.pipeline import ConversationPipeline
+from agents.personas import HRManagerAgent
+from agents.platforms import GitHubPlatformAgent, GmailPlatformAgent
+from agents.reflection import ReflectionAgent
+from agents.supervisor import HierarchicalSupervisor
+from agents.tracing import tracer, NOOP_SPAN, ChromeTraceExporter, OTLPExporter, parse_traceparent
+
+def _enable():
+    exporter = ChromeTraceExporter()
+    tracer.configure(True, [exporter])
+    return exporter
+
+def _supervisor():
+    supervisor = HierarchicalSupervisor()
+    supervisor.register_platform_agent("github", GitHubPlatformAgent())
+    supervisor.register_platform_agent("gmail", GmailPlatformAgent())
+    return supervisor
+
+def _task(task_type="send_email"):
+    return Task(id=str(uuid.uuid4()), description="Trace me", task_type=task_type, payload={})
+
+def _parents(exporter):
+    spans = exporter.spans()
+    by_id = {span.span_id: span for span in spans}
+    return {span.name: by_id[span.parent_id].name if span.parent_id in by_id else None for span in spans}
+
+def test_disabled_tracing_is_noop():
+    """With tracing off, span() is the shared no-op and tasks carry no trace context"""
+    tracer.configure(False)
+    assert tracer.span("anything") is NOOP_SPAN
+    assert _task().trace_parent is None
+    assert _supervisor().execute_task(_task()).success
+
+def test_dispatch_spans_nest_supervisor_platform_sub_agent():
+    """execute_task/delegate_task spans form one tree under the caller's span"""
+    exporter = _enable()
+    try:
+        with tracer.span("request") as root:
+            _supervisor().execute_task(_task())
+        assert _parents(exporter) == {
+            "email_sender_agent.execute_task": "gmail_platform.delegate_task",
+            "gmail_platform.delegate_task": "gmail_platform.execute_task",
+            "gmail_platform.execute_task": "hierarchical_supervisor.execute_task",
+            "hierarchical_supervisor.execute_task": "request",
+            "request": None,
+        }
+        assert {span.trace_id for span in exporter.spans()} == {root.trace_id}
+        leaf = exporter.spans()[0]
+        assert leaf.attributes["task_type"] == "send_email" and leaf.attributes["success"] is True
+    finally:
+        tracer.configure(False)
+
+def test_trace_context_flows_through_task_across_threads():
+    """A task created inside a span keeps its trace when executed on another thread"""
+    exporter = _enable()
+    try:
+        with tracer.span("request") as root:
+            task = _task()
+        assert parse_traceparent(task.trace_parent) == (root.trace_id, root.span_id)
+
+        thread = threading.Thread(target=_supervisor().execute_task, args=(task,))
+        thread.start()
+        thread.join()
+        supervisor_span = next(s for s in exporter.spans() if s.name == "hierarchical_supervisor.execute_task")
+        assert supervisor_span.trace_id == root.trace_id and supervisor_span.parent_id == root.span_id
+
+        # The context survives serialization
+        assert task_from_dict(task_to_dict(task)).trace_parent == task.trace_parent
+        assert decode(encode(task)).trace_parent == task.trace_parent
+    finally:
+        tracer.configure(False)
+
+def test_conversation_pipeline_spans():
+    """Intent extraction, generation, task execution and reflection all join the turn's trace"""
+    exporter = _enable()
+    try:
+        hr = HRManagerAgent()
+        hr.generate_response = lambda message, context=None: "Welcome aboard!"
+        pipeline = ConversationPipeline(_supervisor(), ReflectionAgent())
+        pipeline.run(hr, "I need to onboard a new hire. They need GitHub access and a welcome email.")
+        pipeline.shutdown()
+
+        parents = _parents(exporter)
+        assert parents["conversation"] is None
+        assert parents["persona.interpret_user_intent"] == "conversation"
+        assert parents["persona.generate_response"] == "conversation"
+        assert parents["hierarchical_supervisor.execute_task"] == "conversation"
+        assert parents["reflection.evaluate"] == "conversation"
+        assert len({span.trace_id for span in exporter.spans()}) == 1
+
+        events = exporter.to_chrome_trace()["traceEvents"]
+        assert {event["ph"] for event in events} == {"X"}
+        assert all(event["dur"] >= 0 for event in events)
+    finally:
+        tracer.configure(False)
+
+def test_otlp_exporter_posts_json_batches():
+    """Spans are posted to the collector as OTLP/HTTP JSON"""
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    exporter = OTLPExporter(f"http://127.0.0.1:{server.server_address[1]}/v1/traces", batch_size=2)
+    tracer.configure(True, [exporter])
+    try:
+        with tracer.span("request", route="/tasks"):
+            with tracer.span("child"):
+                pass
+        exporter.flush()
+        assert exporter.stats()["exported"] == 2
+    finally:
+        tracer.configure(False)
+        server.shutdown()
+
+    spans = received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    child, request = spans
+    assert child["parentSpanId"] == request["spanId"] and "parentSpanId" not in request
+    assert request["attributes"] == [{"key": "route", "value": {"stringValue": "/tasks"}}]
+    assert int(request["endTimeUnixNano"]) >= int(request["startTimeUnixNano"])
+
+if __name__ == "__main__":
+    print("🧪 Running Tracing Tests")
+    test_disabled_tracing_is_noop()
+    test_dispatch_spans_nest_supervisor_platform_sub_agent()
+    test_trace_context_flows_through_task_across_threads()
+    test_conversation_pipeline_spans()
+    test_otlp_exporter_posts_json_batches()
+    print("✅ All tracing tests passed!")
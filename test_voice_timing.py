@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for voice turn timing and time-to-first-audio reporting.
+"""
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+# test_integration.py leaves stub modules in sys.modules at collection time
+for name in ("tools", "dotenv"):
+    if type(sys.modules.get(name)).__name__ == "MockModule":
+        del sys.modules[name]
+
+import speech_to_text
+import text_to_speech
+from agents.voice_timing import VoiceTurn, VoiceTimingLog, voice_stage, voice_timed
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_turn_stages_and_time_to_first_audio():
+    """Tool time is split out of the LLM call; TTFA counts endpointing plus everything until playback"""
+    clock = FakeClock()
+    turn = VoiceTurn("doctor", clock=clock)
+
+    @voice_timed("llm_tools")
+    def webcam_tool():
+        clock.now += 0.4
+
+    with turn.active():
+        with voice_stage("listening"):
+            clock.now += 3.0
+        turn.mark_speech_end()
+        turn.add("endpointing", 0.8)
+        with voice_stage("audio_encode"):
+            clock.now += 0.1
+        with turn.llm():
+            clock.now += 0.5
+            webcam_tool()
+            clock.now += 0.6
+        with voice_stage("tts_synthesis"):
+            clock.now += 0.7
+        turn.mark_first_audio()
+        with voice_stage("playback"):
+            clock.now += 2.0
+
+    record = VoiceTimingLog().finish(turn)
+    assert record["stages"]["llm_tools"] == pytest.approx(0.4)
+    assert record["stages"]["llm_generation"] == pytest.approx(1.1)
+    assert record["time_to_first_audio"] == pytest.approx(0.8 + 0.1 + 1.5 + 0.7)
+    assert record["total"] == pytest.approx(7.3)
+
+    # Outside an active turn the helpers record nothing
+    webcam_tool()
+    assert turn.stages["llm_tools"] == pytest.approx(0.4)
+
+def test_transcription_splits_upload_and_inference():
+    """The server-reported processing time becomes stt_inference, the rest stt_upload"""
+    clock = FakeClock()
+
+    def create(**kwargs):
+        clock.now += 1.5
+        return SimpleNamespace(headers={"openai-processing-ms": "400"}, parse=lambda: SimpleNamespace(text="hello"))
+
+    client = SimpleNamespace(audio=SimpleNamespace(transcriptions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create))))
+    original = speech_to_text.get_groq_client
+    speech_to_text.get_groq_client = lambda: client
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".mp3") as audio:
+            turn = VoiceTurn(clock=clock)
+            with turn.active():
+                assert speech_to_text.transcribe_with_groq(audio.name) == "hello"
+    finally:
+        speech_to_text.get_groq_client = original
+    assert turn.stages == pytest.approx({"stt_upload": 1.1, "stt_inference": 0.4})
+
+def test_playback_marks_first_audio():
+    """play_audio marks time to first audio before the player starts"""
+    clock = FakeClock()
+    turn = VoiceTurn(clock=clock)
+    turn.mark_speech_end()
+    clock.now += 2.0
+    original_run = text_to_speech.subprocess.run
+    text_to_speech.subprocess.run = lambda *args, **kwargs: setattr(clock, "now", clock.now + 3.0)
+    try:
+        with turn.active():
+            text_to_speech.play_audio("final.mp3")
+    finally:
+        text_to_speech.subprocess.run = original_run
+    assert turn.time_to_first_audio == pytest.approx(2.0)
+    assert turn.stages["playback"] in (0.0, 3.0)  # 0 on platforms without a known player
+
+def test_log_summary_and_jsonl_export():
+    """The rolling log keeps the last turns and reports percentiles per stage"""
+    log = VoiceTimingLog(capacity=3)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        clock = FakeClock()
+        turn = VoiceTurn(clock=clock)
+        turn.add("stt_upload", seconds)
+        clock.now += seconds
+        log.finish(turn)
+
+    summary = log.summary()
+    assert summary["turns"] == 3
+    assert summary["stages"]["stt_upload"]["p50"] == 3.0
+    assert summary["stages"]["stt_upload"]["count"] == 3
+    assert "time_to_first_audio" not in summary["stages"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = log.export_jsonl(os.path.join(directory, "voice.jsonl"))
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+    assert [row["stages"]["stt_upload"] for row in rows] == [2.0, 3.0, 4.0]
+
+if __name__ == "__main__":
+    print("🧪 Running Voice Timing Tests")
+    test_turn_stages_and_time_to_first_audio()
+    test_transcription_splits_upload_and_inference()
+    test_playback_marks_first_audio()
+    test_log_summary_and_jsonl_export()
+    print("✅ All voice timing tests passed!")
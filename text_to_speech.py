@@ -1,38 +1,48 @@
 import os
-import elevenlabs
-from elevenlabs.client import ElevenLabs
 import subprocess
 import platform
+from io import BytesIO
+from agents.cassette import recorded
+from agents.lazy import lazy
+from agents.voice_timing import current_turn, voice_stage
 
 ELEVENLABS_API_KEY=os.environ.get("ELEVENLABS_API_KEY")
 
+@lazy("elevenlabs_client")
+def get_elevenlabs_client():
+    """ElevenLabs client, constructed on first use and reused across replies"""
+    from elevenlabs.client import ElevenLabs
+    return ElevenLabs(api_key=ELEVENLABS_API_KEY)
 
-def text_to_speech_with_elevenlabs(input_text, output_filepath):
-    client=ElevenLabs(api_key=ELEVENLABS_API_KEY)
+def connect_elevenlabs():
+    """Build the client and open its TLS connection with a cheap lookup of the reply voice"""
+    get_elevenlabs_client().voices.get("ZF6FPAbjXT4488VcRRnw")
+
+@recorded("tts", key=lambda input_text: ["elevenlabs", input_text])
+def synthesize_with_elevenlabs(input_text):
+    """MP3 bytes of input_text spoken by the ElevenLabs voice"""
+    client=get_elevenlabs_client()
     audio=client.text_to_speech.convert(
         text= input_text,
         voice_id="ZF6FPAbjXT4488VcRRnw", #"JBFqnCBsd6RMkjVDRZzb",
         model_id="eleven_multilingual_v2",
         output_format= "mp3_22050_32",
     )
-    elevenlabs.save(audio, output_filepath)
-    os_name = platform.system()
-    try:
-        if os_name == "Darwin":  # macOS
-            subprocess.run(['afplay', output_filepath])
-        elif os_name == "Windows":  # Windows
-            subprocess.run(['powershell', '-c', f'(New-Object Media.SoundPlayer "{output_filepath}").PlaySync();'])
-        elif os_name == "Linux":  # Linux
-            subprocess.run(['aplay', output_filepath])  # Alternative: use 'mpg123' or 'ffplay'
-        else:
-            raise OSError("Unsupported operating system")
-    except Exception as e:
-        print(f"An error occurred while trying to play the audio: {e}")
+    # convert() streams the audio, so collecting it is part of synthesis
+    return b"".join(audio)
 
+def text_to_speech_with_elevenlabs(input_text, output_filepath):
+    with voice_stage("tts_synthesis"):
+        audio=synthesize_with_elevenlabs(input_text)
+        with open(output_filepath, "wb") as f:
+            f.write(audio)
+    play_audio(output_filepath)
 
-from gtts import gTTS
 
-def text_to_speech_with_gtts(input_text, output_filepath):
+@recorded("tts", key=lambda input_text: ["gtts", input_text])
+def synthesize_with_gtts(input_text):
+    """MP3 bytes of input_text spoken by Google Text-to-Speech"""
+    from gtts import gTTS
     language="en"
 
     audioobj= gTTS(
@@ -40,19 +50,36 @@ def text_to_speech_with_gtts(input_text, output_filepath):
         lang=language,
         slow=False
     )
-    audioobj.save(output_filepath)
+    buffer=BytesIO()
+    audioobj.write_to_fp(buffer)
+    return buffer.getvalue()
+
+def text_to_speech_with_gtts(input_text, output_filepath):
+    with voice_stage("tts_synthesis"):
+        audio=synthesize_with_gtts(input_text)
+        with open(output_filepath, "wb") as f:
+            f.write(audio)
+    play_audio(output_filepath)
+
+
+def play_audio(output_filepath):
+    """Play an audio file with the platform's player, marking time to first audio for the active voice turn"""
+    turn = current_turn()
+    if turn is not None:
+        turn.mark_first_audio()
     os_name = platform.system()
-    try:
-        if os_name == "Darwin":  # macOS
-            subprocess.run(['afplay', output_filepath])
-        elif os_name == "Windows":  # Windows
-            subprocess.run(['powershell', '-c', f'(New-Object Media.SoundPlayer "{output_filepath}").PlaySync();'])
-        elif os_name == "Linux":  # Linux
-            subprocess.run(['aplay', output_filepath])  # Alternative: use 'mpg123' or 'ffplay'
-        else:
-            raise OSError("Unsupported operating system")
-    except Exception as e:
-        print(f"An error occurred while trying to play the audio: {e}")
+    with voice_stage("playback"):
+        try:
+            if os_name == "Darwin":  # macOS
+                subprocess.run(['afplay', output_filepath])
+            elif os_name == "Windows":  # Windows
+                subprocess.run(['powershell', '-c', f'(New-Object Media.SoundPlayer "{output_filepath}").PlaySync();'])
+            elif os_name == "Linux":  # Linux
+                subprocess.run(['aplay', output_filepath])  # Alternative: use 'mpg123' or 'ffplay'
+            else:
+                raise OSError("Unsupported operating system")
+        except Exception as e:
+            print(f"An error occurred while trying to play the audio: {e}")
 
 
 #input_text = "Hi, I am doing fine, how are you? This is a test for AI with Hassan"
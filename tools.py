@@ -1,14 +1,74 @@
-import cv2
 import base64
+import os
+import threading
+import time
+from typing import Callable, Optional
 from dotenv import load_dotenv
+from agents.cassette import recorded
+from agents.lazy import lazy
+from agents.multimodal import is_appearance_query
+from agents.providers import get_groq_client, vision_router  # get_groq_client is re-exported for speech_to_text
+from agents.tracing import traced
+from agents.voice_timing import voice_timed
 
 load_dotenv()
 
+@lazy("opencv")
+def get_cv2():
+    """OpenCV, imported on first webcam capture"""
+    import cv2
+    return cv2
+
+def _open_camera():
+    """First webcam that opens (indices 0-3), after its warm-up reads, or None"""
+    cv2 = get_cv2()
+    for idx in range(4):
+        cap = cv2.VideoCapture(idx, cv2.CAP_AVFOUNDATION)
+        if cap.isOpened():
+            for _ in range(10):  # Warm up
+                cap.read()
+            return cap
+    return None
+
+def _encode_frame(frame) -> Optional[str]:
+    cv2 = get_cv2()
+    cv2.imwrite("sample.jpg", frame)  # Optional
+    ret, buf = cv2.imencode('.jpg', frame)
+    return base64.b64encode(buf).decode('utf-8') if ret else None
+
+# Webcam kept open by warm_camera(), so captures skip opening the device and its warm-up reads
+_camera = None
+_camera_lock = threading.Lock()
+
+def warm_camera() -> bool:
+    """Open the webcam and run its warm-up reads now, keeping it open for capture_image()"""
+    global _camera
+    with _camera_lock:
+        if _camera is None:
+            _camera = _open_camera()
+        return _camera is not None
+
+def release_camera():
+    """Close the webcam opened by warm_camera(), e.g. before another capture takes the device"""
+    global _camera
+    with _camera_lock:
+        if _camera is not None:
+            _camera.release()
+            _camera = None
+
 def capture_image() -> str:
     """
     Captures one frame from the default webcam, resizes it,
     encodes it as Base64 JPEG (raw string) and returns it.
     """
+    with _camera_lock:
+        if _camera is not None:
+            _camera.read()  # drop the frame buffered since the last read
+            ret, frame = _camera.read()
+            encoded = _encode_frame(frame) if ret else None
+            if encoded:
+                return encoded
+    cv2 = get_cv2()
     for idx in range(4):
         cap = cv2.VideoCapture(idx, cv2.CAP_AVFOUNDATION)
         if cap.isOpened():
@@ -18,29 +78,71 @@ def capture_image() -> str:
             cap.release()
             if not ret:
                 continue
-            cv2.imwrite("sample.jpg", frame)  # Optional
-            ret, buf = cv2.imencode('.jpg', frame)
-            if ret:
-                return base64.b64encode(buf).decode('utf-8')
+            encoded = _encode_frame(frame)
+            if encoded:
+                return encoded
     raise RuntimeError("Could not open any webcam (tried indices 0-3)")
 
+# Latest frame of an already running capture (e.g. the UI's webcam feed), as base64 JPEG or None
+_frame_source: Optional[Callable[[], Optional[str]]] = None
 
-from groq import Groq
+def set_frame_source(source: Optional[Callable[[], Optional[str]]]):
+    """Serve current_frame() from a live capture instead of opening the webcam per call"""
+    global _frame_source
+    _frame_source = source
 
+@traced("tool.current_frame")
+def current_frame() -> str:
+    """Base64 JPEG of the current webcam frame, from the live capture when one is registered"""
+    frame = _frame_source() if _frame_source is not None else None
+    return frame or capture_image()
+
+
+# Generic first-turn analysis run by prime_vision() before the first message (see agents/prewarm.py)
+SPECULATIVE_VISION_QUERY = "Describe the person in front of the camera."
+_speculative_vision: Optional[tuple] = None  # (monotonic time, analysis)
+_speculative_lock = threading.Lock()
+
+def prime_vision(query: str = SPECULATIVE_VISION_QUERY) -> str:
+    """Analyze the current frame ahead of time; the next appearance question within its TTL is answered from it"""
+    global _speculative_vision
+    analysis = _analyze_frame(query, current_frame())
+    with _speculative_lock:
+        _speculative_vision = (time.monotonic(), analysis)
+    return analysis
+
+def take_speculative_vision(max_age: float) -> Optional[str]:
+    """The primed analysis if it is younger than max_age seconds; it is used at most once"""
+    global _speculative_vision
+    with _speculative_lock:
+        primed, _speculative_vision = _speculative_vision, None
+    if primed is None or time.monotonic() - primed[0] > max_age:
+        return None
+    return primed[1]
+
+# How long a primed analysis stays usable (the frame it describes goes stale)
+speculative_vision_ttl = float(os.getenv("SPECULATIVE_VISION_TTL", "120"))
+
+@traced("tool.analyze_image_with_query")
+@voice_timed("llm_tools")
+@recorded("vision", key=lambda query: query)
 def analyze_image_with_query(query: str) -> str:
     """
     Expects a string with 'query'.
     Captures the image and sends the query and the image to
-    to Groq's vision chat API and returns the analysis.
+    the vision backends (Groq's Llama vision model by default) and returns the analysis.
     Enhanced to provide detailed observations for compliments.
     """
-    img_b64 = capture_image()
-    model="meta-llama/llama-4-maverick-17b-128e-instruct"
-    
+    # The primed analysis describes the person generally, so it only answers appearance questions
+    if is_appearance_query(query):
+        primed = take_speculative_vision(speculative_vision_ttl)
+        if primed is not None:
+            return primed
+    return _analyze_frame(query, current_frame())
+
+def _analyze_frame(query: str, img_b64: Optional[str]) -> str:
     if not query or not img_b64:
         return "Error: both 'query' and 'image' fields required."
-
-    client=Groq()  
     
     # Enhanced prompt to encourage detailed positive observations
     enhanced_query = f"""
@@ -72,12 +174,8 @@ def analyze_image_with_query(query: str) -> str:
                 },
             ],
         }]
-    chat_completion=client.chat.completions.create(
-        messages=messages,
-        model=model
-    )
-
-    return chat_completion.choices[0].message.content
+    # Fails over to the next vision backend on errors and hedges slow calls
+    return vision_router.call(lambda backend: backend.complete(messages), query=query)
 
 #query = "How many people do you see?"
 #print(analyze_image_with_query(query))
\ No newline at end of file